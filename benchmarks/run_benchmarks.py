@@ -0,0 +1,487 @@
+"""Benchmarks of the helpers.utils functions and the analysis entry points.
+
+The benchmarks run on synthetic data generated with synthetic_data.py in a separate
+workspace, selected through the WORKSPACE_PATH, DATA_DIR, RESULTS_DIR, PLOTS_DIR and
+BUILD_CACHE_DIR environment variables, so the real data, results and plots are never
+touched. Every case is timed as the best of several runs and compared with the
+baseline stored for the same scale in baselines.json. A case is a regression when it
+is slower than its baseline by more than the threshold; the run then exits with a
+non-zero status.
+
+Baselines depend on the machine: record them with --save-baseline on the machine the
+comparisons run on.
+
+Usage:
+    python benchmarks/run_benchmarks.py                     # compare with the baselines
+    python benchmarks/run_benchmarks.py --scale 10          # run on 10x the data
+    python benchmarks/run_benchmarks.py --save-baseline     # record new baselines
+    python benchmarks/run_benchmarks.py analyze_ read_csv   # run matching cases only
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import matplotlib
+
+# Render figures without a display
+matplotlib.use("Agg")
+
+from synthetic_data import generate_dataset
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCHMARKS_DIR.parent / "src"
+BASELINES_PATH = BENCHMARKS_DIR / "baselines.json"
+
+# Relative slowdown above which a case is reported as a regression
+REGRESSION_THRESHOLD = 0.25
+
+# Slowdowns below this number of seconds are treated as noise
+MIN_REGRESSION_SECONDS = 0.01
+
+# File recording the scale and seed of the data generated in a workspace
+WORKSPACE_MARKER = "synthetic.json"
+
+
+def prepare_workspace(workspace, scale=1, seed=0):
+    """
+    Generates the synthetic data in a workspace and points the configuration at it.
+
+    The data is generated again only if the workspace holds data of another scale or
+    seed. Must be called before the project modules are imported.
+
+    Args:
+        workspace (str): Directory of the benchmark workspace.
+        scale (int, optional): Scale factor of the data. Defaults to 1.
+        seed (int, optional): Seed of the data. Defaults to 0.
+
+    Returns:
+        Path: The workspace directory.
+    """
+    workspace = Path(workspace)
+    marker = workspace / WORKSPACE_MARKER
+    settings = {"scale": scale, "seed": seed}
+    if not marker.is_file() or json.loads(marker.read_text()) != settings:
+        print(f"Generating synthetic data at scale {scale} in {workspace}")
+        generate_dataset(workspace / "data", scale=scale, seed=seed)
+        marker.write_text(json.dumps(settings))
+
+    # Point the project configuration at the workspace
+    os.environ["WORKSPACE_PATH"] = str(workspace)
+    os.environ["DATA_DIR"] = str(workspace / "data")
+    os.environ["RESULTS_DIR"] = str(workspace / "results")
+    os.environ["PLOTS_DIR"] = str(workspace / "plots")
+    os.environ["BUILD_CACHE_DIR"] = str(workspace / ".build_cache")
+    for folder in ["results", "plots"]:
+        (workspace / folder).mkdir(parents=True, exist_ok=True)
+    if str(SRC_DIR) not in sys.path:
+        sys.path.insert(0, str(SRC_DIR))
+    return workspace
+
+
+def utils_cases(workspace):
+    """
+    Builds the benchmark cases of the helpers.utils functions.
+
+    Returns:
+        dict: Mapping of case name to a (setup, function) pair. The setup returns the
+            keyword arguments of one call, so in-place functions get fresh inputs.
+    """
+    from helpers import utils
+
+    data_dir = workspace / "data"
+    output_dir = workspace / "results" / "benchmarks"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    icd_path = (
+        data_dir / "processed" / "problemy_zdrowotne_icd10_poradnia_okulistyczna.csv"
+    )
+    swiad_woj_path = data_dir / "processed" / "swiad_woj_poradnia_okulistyczna.csv"
+    teleporady_path = data_dir / "raw" / "teleporady.csv"
+    raw_paths = utils.get_files_paths(
+        data_dir / "raw", "problemy_zdrowotne_icd10", "csv"
+    )
+    filter_dict = {"Specjalność komórki": "poradnia okulistyczna", "Rok": [2022, 2023]}
+
+    # Inputs shared by the cases, loaded once
+    icd = utils.read_csv(icd_path)
+    raw = utils.load_files(raw_paths)
+    raw_index = utils.build_filter_index(raw, list(filter_dict))
+    teleporady = utils.read_csv(teleporady_path)
+    summary = utils.aggregate_sum(
+        icd, ["Rok", "Województwo"], ["Liczba porad AOS"], header=None
+    )
+    excel_path = output_dir / "sheets.xlsx"
+    utils.write_excel_sheets(
+        excel_path,
+        {
+            "Porady": icd.groupby(["Rok", "Województwo"])["Liczba porad AOS"]
+            .sum()
+            .reset_index(),
+            "Poradnie": utils.read_csv(swiad_woj_path)[
+                ["Rok", "Województwo", "Liczba poradni AOS"]
+            ],
+        },
+        index=False,
+    )
+
+    def args(**kwargs):
+        return lambda: kwargs
+
+    return {
+        "get_files_paths": (
+            args(
+                main_folder=data_dir / "raw",
+                dataset_name="problemy_zdrowotne_icd10",
+                extension="csv",
+            ),
+            utils.get_files_paths,
+        ),
+        "read_file_columns": (args(path=raw_paths[0]), utils.read_file_columns),
+        "check_files_schema": (args(file_paths=raw_paths), utils.check_files_schema),
+        "read_file": (args(path=teleporady_path), utils.read_file),
+        "read_csv[uncached]": (
+            args(file_path=icd_path, use_cache=False),
+            utils.read_csv,
+        ),
+        "read_csv[cached]": (args(file_path=icd_path), utils.read_csv),
+        "load_files": (args(file_paths=raw_paths), utils.load_files),
+        "combine_dataframes": (
+            lambda: {"dataframes": [raw.copy(), raw.copy()]},
+            utils.combine_dataframes,
+        ),
+        "build_filter_index": (
+            args(df=raw, columns=list(filter_dict)),
+            utils.build_filter_index,
+        ),
+        "filter_dataframe": (
+            args(df=raw, filter_dict=filter_dict),
+            utils.filter_dataframe,
+        ),
+        "filter_dataframe[index]": (
+            args(df=raw, filter_dict=filter_dict, index=raw_index),
+            utils.filter_dataframe,
+        ),
+        "stream_filtered_files": (
+            args(file_paths=raw_paths, filter_dict=filter_dict),
+            lambda **kwargs: sum(
+                len(chunk) for chunk in utils.stream_filtered_files(**kwargs)
+            ),
+        ),
+        "load_filtered_files": (
+            args(file_paths=raw_paths, filter_dict=filter_dict),
+            utils.load_filtered_files,
+        ),
+        "analyze_dataframe[exact]": (
+            args(dataframe=raw),
+            utils.analyze_dataframe,
+        ),
+        "analyze_dataframe[approximate]": (
+            args(dataframe=raw, approximate=True),
+            utils.analyze_dataframe,
+        ),
+        "analyze_files": (args(file_paths=raw_paths), utils.analyze_files),
+        "build_column_mappings": (
+            args(data=teleporady, target_col="Województwo", reference_cols="Powiat"),
+            utils.build_column_mappings,
+        ),
+        "fill_missing_values_based_on_column_mapping": (
+            lambda: {
+                "df": teleporady.copy(),
+                "target_col": "Województwo",
+                "reference_col": ["Powiat", "Nazwa świadczeniodawcy"],
+            },
+            utils.fill_missing_values_based_on_column_mapping,
+        ),
+        "aggregate_count": (
+            args(
+                df=raw,
+                group_columns=["Rok", "Województwo"],
+                value_columns=["Kod ICD-10 poziom 1."],
+            ),
+            utils.aggregate_count,
+        ),
+        "aggregate_sum": (
+            args(
+                df=raw,
+                group_columns=["Rok", "Województwo"],
+                value_columns=["Liczba porad AOS"],
+            ),
+            utils.aggregate_sum,
+        ),
+        "aggregate_sum[rollup]": (
+            args(
+                df=raw,
+                group_columns=["Rok", "Województwo", "Kod ICD-10 poziom 1."],
+                value_columns=["Liczba porad AOS"],
+                rollup=True,
+            ),
+            utils.aggregate_sum,
+        ),
+        "write_csv": (
+            args(data=icd, file_path=output_dir / "icd.csv", index=False),
+            utils.write_csv,
+        ),
+        "write_excel": (
+            args(file_path=output_dir / "summary.xlsx", data=summary),
+            utils.write_excel,
+        ),
+        "write_excel_sheets": (
+            args(
+                file_path=output_dir / "summary_sheets.xlsx",
+                sheets={"Lvl_1": summary, "Lvl_2": summary},
+            ),
+            utils.write_excel_sheets,
+        ),
+        "read_excel": (args(file_path=excel_path), utils.read_excel),
+        "left_join_excel_sheets": (
+            args(file_path=excel_path, on=["Rok", "Województwo"]),
+            utils.left_join_excel_sheets,
+        ),
+    }
+
+
+def analysis_cases():
+    """
+    Builds the benchmark cases of the analysis entry points.
+
+    The input datasets are loaded once through the dataset registry, as in main.py,
+    so the cases time the analyses and not the parsing of their inputs.
+
+    Returns:
+        dict: Mapping of case name to a (setup, function) pair.
+    """
+    from main import ANALYSES
+    from helpers.datasets import get_dataset
+
+    cases = {}
+    for name, spec in ANALYSES.items():
+        inputs = {
+            argument: get_dataset(dataset, copy=False)
+            for argument, dataset in spec["inputs"].items()
+        }
+        cases[spec["function"].__name__] = (
+            lambda inputs=inputs: dict(inputs),
+            spec["function"],
+        )
+
+    # The ICD-10 analyses can also stream the raw files instead of using the cube
+    for function in [
+        ANALYSES["icd10_top_problems"]["function"],
+        ANALYSES["icd10_top_problems_time"]["function"],
+    ]:
+        cases[f"{function.__name__}[stream]"] = (
+            lambda: {"backend": "stream"},
+            function,
+        )
+    return cases
+
+
+def time_case(setup, function, repeat=3):
+    """
+    Times a benchmark case.
+
+    Args:
+        setup (callable): Function returning the keyword arguments of one call.
+        function (callable): The benchmarked function.
+        repeat (int, optional): Number of timed calls. Defaults to 3.
+
+    Returns:
+        float: The best wall time in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        kwargs = setup()
+        start = time.perf_counter()
+        function(**kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def load_baselines(file_path=BASELINES_PATH):
+    """Reads the stored baselines, keyed by scale."""
+    file_path = Path(file_path)
+    if not file_path.is_file():
+        return {}
+    with open(file_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baselines(baselines, file_path=BASELINES_PATH):
+    """Writes the baselines, keyed by scale."""
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(baselines, f, indent=2, ensure_ascii=False, sort_keys=True)
+        f.write("\n")
+
+
+def compare(seconds, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    Compares the time of a case with its baseline.
+
+    Args:
+        seconds (float): Measured time in seconds.
+        baseline (float or None): Baseline time in seconds.
+        threshold (float, optional): Relative slowdown reported as a regression.
+            Defaults to REGRESSION_THRESHOLD.
+
+    Returns:
+        str: "new" without a baseline, "regression" if the case is slower than the
+            baseline by more than the threshold and MIN_REGRESSION_SECONDS, else "ok".
+    """
+    if baseline is None:
+        return "new"
+    slowdown = seconds - baseline
+    if slowdown > baseline * threshold and slowdown > MIN_REGRESSION_SECONDS:
+        return "regression"
+    return "ok"
+
+
+def print_report(results):
+    """Prints the time, baseline, change and status of every case."""
+    width = max(len(result["case"]) for result in results)
+    print(f"{'Case':<{width}}  {'Time [s]':>9}  {'Base [s]':>9}  {'Change':>8}  Status")
+    for result in results:
+        baseline = result["baseline"]
+        base_text, change_text = "-", "-"
+        if baseline is not None:
+            base_text = f"{baseline:.4f}"
+        if baseline:
+            change_text = f"{(result['seconds'] / baseline - 1) * 100:+.1f}%"
+        print(
+            f"{result['case']:<{width}}  {result['seconds']:>9.4f}  {base_text:>9}"
+            f"  {change_text:>8}  {result['status']}"
+        )
+
+
+def run_benchmarks(
+    workspace,
+    scale=1,
+    seed=0,
+    repeat=3,
+    threshold=REGRESSION_THRESHOLD,
+    patterns=None,
+    baselines_path=BASELINES_PATH,
+):
+    """
+    Runs the benchmark cases and compares them with the stored baselines.
+
+    Args:
+        workspace (str): Directory of the benchmark workspace.
+        scale (int, optional): Scale factor of the data. Defaults to 1.
+        seed (int, optional): Seed of the data. Defaults to 0.
+        repeat (int, optional): Number of timed calls per case. Defaults to 3.
+        threshold (float, optional): Relative slowdown reported as a regression.
+            Defaults to REGRESSION_THRESHOLD.
+        patterns (list, optional): Substrings of the names of the cases to run.
+            Defaults to all cases.
+        baselines_path (str, optional): Path of the baselines file.
+
+    Returns:
+        list: One dict per case with keys 'case', 'seconds', 'baseline' and 'status'.
+    """
+    workspace = prepare_workspace(workspace, scale, seed)
+    cases = {**utils_cases(workspace), **analysis_cases()}
+    if patterns:
+        cases = {
+            name: case
+            for name, case in cases.items()
+            if any(pattern in name for pattern in patterns)
+        }
+
+    baselines = load_baselines(baselines_path).get(str(scale), {}).get("cases", {})
+    results = []
+    for name, (setup, function) in cases.items():
+        # Warm up the caches and imports, so only steady-state calls are timed
+        function(**setup())
+        seconds = time_case(setup, function, repeat)
+        baseline = baselines.get(name)
+        results.append(
+            {
+                "case": name,
+                "seconds": seconds,
+                "baseline": baseline,
+                "status": compare(seconds, baseline, threshold),
+            }
+        )
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the utilities and analyses on synthetic data."
+    )
+    parser.add_argument(
+        "cases",
+        nargs="*",
+        help="Run only the cases whose name contains one of these substrings.",
+    )
+    parser.add_argument(
+        "--scale", type=int, default=1, help="Scale factor of the data (default: 1)."
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed of the data (default: 0)."
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Number of timed calls per case (default: 3).",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=REGRESSION_THRESHOLD,
+        help=f"Relative slowdown reported as a regression (default: {REGRESSION_THRESHOLD}).",
+    )
+    parser.add_argument(
+        "--workspace",
+        help="Workspace of the synthetic data (default: a folder in the temp directory).",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store the measured times as the baselines of the scale.",
+    )
+    args = parser.parse_args(argv)
+
+    workspace = args.workspace or Path(tempfile.gettempdir()) / (
+        f"mz_raport_benchmarks_{args.scale}x_seed{args.seed}"
+    )
+    results = run_benchmarks(
+        workspace,
+        scale=args.scale,
+        seed=args.seed,
+        repeat=args.repeat,
+        threshold=args.threshold,
+        patterns=args.cases,
+    )
+    print_report(results)
+
+    if args.save_baseline:
+        baselines = load_baselines()
+        entry = baselines.setdefault(str(args.scale), {"cases": {}})
+        entry["cases"].update(
+            {result["case"]: round(result["seconds"], 6) for result in results}
+        )
+        entry["machine"] = f"{platform.system()} {platform.machine()}"
+        entry["python"] = platform.python_version()
+        save_baselines(baselines)
+        print(f"Baselines of scale {args.scale} saved to {BASELINES_PATH}")
+        return 0
+
+    regressions = [result for result in results if result["status"] == "regression"]
+    if regressions:
+        print(
+            f"{len(regressions)} regression(s) above {args.threshold:.0%}: "
+            f"{', '.join(result['case'] for result in regressions)}"
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
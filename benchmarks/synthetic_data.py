@@ -0,0 +1,612 @@
+"""Seeded generator of synthetic NFZ-shaped datasets.
+
+The real NFZ data cannot be checked in, so the benchmarks run on synthetic files with
+the same columns, dtypes and file layout as the processed and raw data the analyses
+read. Dimension values have realistic cardinalities: 16 województwa, 380 powiaty split
+between them as in the TERYT register, years 2016-2023, ICD-10 categories grouped into
+blocks and chapters and drawn with a Zipf skew, so a few codes dominate each
+speciality the way they do in the real data.
+
+Row-level datasets grow linearly with the scale factor (1x to 1000x). The dimension
+tables do not: a larger scale adds rows per region, county and year instead of new
+regions or counties. Files are written chunk by chunk, so memory use does not depend
+on the scale. The same seed and scale always produce the same files.
+
+Usage:
+    python benchmarks/synthetic_data.py --output /tmp/mz_synthetic/data --scale 10
+"""
+
+import argparse
+import zlib
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+from shapely.geometry import box
+
+# Number of powiaty of every województwo, as in the TERYT register
+WOJEWODZTWA = {
+    "dolnośląskie": 30,
+    "kujawsko-pomorskie": 23,
+    "lubelskie": 24,
+    "lubuskie": 14,
+    "łódzkie": 24,
+    "małopolskie": 22,
+    "mazowieckie": 42,
+    "opolskie": 12,
+    "podkarpackie": 25,
+    "podlaskie": 17,
+    "pomorskie": 20,
+    "śląskie": 36,
+    "świętokrzyskie": 14,
+    "warmińsko-mazurskie": 21,
+    "wielkopolskie": 35,
+    "zachodniopomorskie": 21,
+}
+
+YEARS = list(range(2016, 2024))
+
+# Specialities of the raw files with the ICD-10 letter their patients concentrate on
+SPECIALITIES = {
+    "poradnia okulistyczna": "H",
+    "poradnia kardiologiczna": "I",
+    "poradnia neurologiczna": "G",
+    "poradnia dermatologiczna": "L",
+    "poradnia endokrynologiczna": "E",
+    "poradnia chirurgii ogólnej": "K",
+    "poradnia ginekologiczno-położnicza": "N",
+    "poradnia otorynolaryngologiczna": "J",
+    "poradnia onkologiczna": "C",
+    "poradnia zdrowia psychicznego": "F",
+}
+
+# Speciality of the processed files
+SPECIALITY = "poradnia okulistyczna"
+
+# ICD-10 chapters with their first and last category
+ICD_CHAPTERS = [
+    ("I", "A00", "B99"),
+    ("II", "C00", "D48"),
+    ("III", "D50", "D89"),
+    ("IV", "E00", "E90"),
+    ("V", "F00", "F99"),
+    ("VI", "G00", "G99"),
+    ("VII", "H00", "H59"),
+    ("VIII", "H60", "H95"),
+    ("IX", "I00", "I99"),
+    ("X", "J00", "J99"),
+    ("XI", "K00", "K93"),
+    ("XII", "L00", "L99"),
+    ("XIII", "M00", "M99"),
+    ("XIV", "N00", "N99"),
+    ("XV", "O00", "O99"),
+    ("XVI", "P00", "P96"),
+    ("XVII", "Q00", "Q99"),
+    ("XVIII", "R00", "R99"),
+    ("XIX", "S00", "T98"),
+    ("XX", "V01", "Y98"),
+    ("XXI", "Z00", "Z99"),
+]
+
+# Exponent of the Zipf distribution of the ICD-10 categories
+ICD_ZIPF_EXPONENT = 1.1
+
+# Number of rows of every row-level dataset at scale 1
+BASE_ROWS = {
+    "swiad_woj": len(YEARS) * len(WOJEWODZTWA),
+    "swiad_pow": len(YEARS) * sum(WOJEWODZTWA.values()),
+    "problemy_zdrowotne_icd10": 20000,
+    "problemy_zdrowotne_icd10_raw": 100000,
+    "statystyki_porad": 10000,
+    "teleporady": 20000,
+    "demografia_wojewodztwa": len(YEARS) * len(WOJEWODZTWA) * 2 * 18,
+}
+
+# Number of rows generated and written at a time
+CHUNK_ROWS = 1000000
+
+# Share of teleporady rows with a missing województwo, filled from the powiat
+TELEPORADY_MISSING_SHARE = 0.05
+
+# Side of the square of every województwo on the synthetic map, in metres (EPSG:2180)
+MAP_CELL_SIZE = 100000
+
+COUNTY_STEMS = [
+    "bol",
+    "brze",
+    "chełm",
+    "głog",
+    "gorz",
+    "jaw",
+    "kal",
+    "kęp",
+    "kłodz",
+    "kol",
+    "krośn",
+    "lub",
+    "mił",
+    "nys",
+    "ols",
+    "opat",
+    "ostr",
+    "pil",
+    "pułt",
+    "rad",
+    "siedl",
+    "sok",
+    "strzel",
+    "świd",
+    "tom",
+    "wol",
+    "zamoj",
+    "żag",
+]
+COUNTY_SUFFIXES = ["ecki", "owski", "iński", "ski", "ański", "ewski"]
+
+
+def _rng(seed, dataset, chunk=0):
+    """Returns the random generator of a chunk of a dataset, independent of the others."""
+    return np.random.default_rng([seed, zlib.crc32(dataset.encode()), chunk])
+
+
+def _chunk_sizes(rows, chunk_rows=CHUNK_ROWS):
+    """Splits a number of rows into chunks of at most `chunk_rows`."""
+    return [min(chunk_rows, rows - start) for start in range(0, rows, chunk_rows)]
+
+
+def _write_chunks(file_path, chunks):
+    """Writes DataFrame chunks to one CSV file, with the header of the first chunk."""
+    file_path = Path(file_path)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    for position, chunk in enumerate(chunks):
+        chunk.to_csv(
+            file_path,
+            mode="w" if position == 0 else "a",
+            header=position == 0,
+            index=False,
+        )
+    return file_path
+
+
+def build_dimensions(seed=0):
+    """
+    Builds the dimension tables shared by all generated datasets.
+
+    Args:
+        seed (int, optional): Seed of the generated names. Defaults to 0.
+
+    Returns:
+        dict: The "wojewodztwa" and "powiaty" tables with names and TERYT codes, and
+            the "icd" table of ICD-10 categories with their blocks and chapters.
+    """
+    wojewodztwa = pd.DataFrame(
+        {
+            "Województwo": list(WOJEWODZTWA),
+            "TERYT_WOJ": [f"{2 * (i + 1):02d}" for i in range(len(WOJEWODZTWA))],
+        }
+    )
+
+    # County names are unique within a województwo, but repeat across them as in reality
+    rng = _rng(seed, "powiaty")
+    names = np.array(
+        [stem + suffix for stem in COUNTY_STEMS for suffix in COUNTY_SUFFIXES]
+    )
+    powiaty = []
+    for woj, teryt_woj in zip(wojewodztwa["Województwo"], wojewodztwa["TERYT_WOJ"]):
+        count = WOJEWODZTWA[woj]
+        for position, name in enumerate(rng.choice(names, count, replace=False)):
+            powiaty.append((woj, teryt_woj, f"{teryt_woj}{position + 1:02d}", name))
+    powiaty = pd.DataFrame(
+        powiaty, columns=["Województwo", "TERYT_WOJ", "TERYT_POW", "Powiat"]
+    )
+
+    # ICD-10 categories of every chapter, grouped into blocks of ten
+    icd = []
+    for chapter, first, last in ICD_CHAPTERS:
+        for letter in map(chr, range(ord(first[0]), ord(last[0]) + 1)):
+            start = int(first[1:]) if letter == first[0] else 0
+            end = int(last[1:]) if letter == last[0] else 99
+            for number in range(start, end + 1):
+                block = number // 10 * 10
+                icd.append(
+                    (
+                        f"{letter}{number:02d}",
+                        f"Kategoria {letter}{number:02d}",
+                        f"{letter}{block:02d}-{letter}{block + 9:02d}",
+                        f"Blok {letter}{block:02d}-{letter}{block + 9:02d}",
+                        f"{first}-{last}",
+                        f"Rozdział {chapter}",
+                    )
+                )
+    icd = pd.DataFrame(
+        icd,
+        columns=[
+            f"{kind} ICD-10 poziom {level}."
+            for level in (3, 2, 1)
+            for kind in ("Kod", "Nazwa")
+        ],
+    )
+    return {"wojewodztwa": wojewodztwa, "powiaty": powiaty, "icd": icd}
+
+
+def icd_weights(icd, speciality, seed=0):
+    """
+    Returns the Zipf probabilities of the ICD-10 categories of a speciality.
+
+    Categories of the letter the speciality concentrates on get the highest ranks.
+
+    Args:
+        icd (pd.DataFrame): ICD-10 table of build_dimensions.
+        speciality (str): Name of the speciality.
+        seed (int, optional): Seed of the ranking. Defaults to 0.
+
+    Returns:
+        np.ndarray: Probability of every row of `icd`.
+    """
+    rng = _rng(seed, speciality)
+    codes = icd["Kod ICD-10 poziom 3."]
+    preferred = codes.str[0].eq(SPECIALITIES.get(speciality, "")).to_numpy()
+
+    # Rank the preferred categories first, in random order within both groups
+    order = np.concatenate(
+        [
+            rng.permutation(np.flatnonzero(preferred)),
+            rng.permutation(np.flatnonzero(~preferred)),
+        ]
+    )
+    weights = np.empty(len(icd))
+    weights[order] = 1 / np.arange(1, len(icd) + 1) ** ICD_ZIPF_EXPONENT
+    return weights / weights.sum()
+
+
+def _split_counts(totals, repeats, rng):
+    """Splits every total into `repeats` non-negative integer parts."""
+    if repeats == 1:
+        return totals
+    shares = rng.dirichlet(np.ones(repeats), len(totals))
+    parts = np.floor(shares * totals[:, None]).astype(np.int64)
+    parts[:, 0] += totals - parts.sum(axis=1)
+    return parts.ravel()
+
+
+def _grid_chunks(grid, measures, scale, rng):
+    """Repeats every row of a dimension grid `scale` times with measures split across them."""
+    # Generate whole grid copies per chunk, so every chunk sums to complete totals
+    per_chunk = max(1, CHUNK_ROWS // max(len(grid), 1))
+    for start in range(0, scale, per_chunk):
+        repeats = min(per_chunk, scale - start)
+        chunk = grid.loc[grid.index.repeat(repeats)].reset_index(drop=True)
+        for col, (low, high) in measures.items():
+            totals = rng.integers(low, high, len(grid))
+            chunk[col] = _split_counts(totals, repeats, rng)
+        yield chunk
+
+
+def generate_swiad_woj(output_dir, dimensions, scale=1, seed=0):
+    """
+    Generates the processed clinics data by województwo (swiad_woj).
+
+    Returns:
+        Path: Path of the written file.
+    """
+    rng = _rng(seed, "swiad_woj")
+    grid = pd.MultiIndex.from_product(
+        [YEARS, dimensions["wojewodztwa"]["Województwo"], [SPECIALITY]],
+        names=["Rok", "Województwo", "Specjalność komórki"],
+    ).to_frame(index=False)
+    measures = {
+        "Liczba poradni AOS": (50, 300),
+        "Liczba porad AOS": (100000, 1000000),
+        "Populacja": (1000000, 5500000),
+    }
+    return _write_chunks(
+        Path(output_dir) / "processed" / "swiad_woj_poradnia_okulistyczna.csv",
+        _grid_chunks(grid, measures, scale, rng),
+    )
+
+
+def generate_swiad_pow(output_dir, dimensions, scale=1, seed=0):
+    """
+    Generates the processed clinics data by powiat (swiad_pow).
+
+    Returns:
+        Path: Path of the written file.
+    """
+    rng = _rng(seed, "swiad_pow")
+    powiaty = dimensions["powiaty"][["Województwo", "Powiat"]]
+    grid = pd.merge(pd.DataFrame({"Rok": YEARS}), powiaty, how="cross")
+    grid["Specjalność komórki"] = SPECIALITY
+    return _write_chunks(
+        Path(output_dir) / "processed" / "swiad_pow_poradnia_okulistyczna.csv",
+        _grid_chunks(grid, {"Liczba poradni AOS": (1, 30)}, scale, rng),
+    )
+
+
+def _icd_chunks(dimensions, rows, specialities, dataset, seed, years=YEARS):
+    """Yields chunks of ICD-10 rows with Zipf-distributed categories."""
+    icd = dimensions["icd"]
+    weights = {
+        speciality: icd_weights(icd, speciality, seed) for speciality in specialities
+    }
+    woj = dimensions["wojewodztwa"]["Województwo"].to_numpy()
+    for chunk_id, size in enumerate(_chunk_sizes(rows)):
+        rng = _rng(seed, dataset, chunk_id)
+        speciality = rng.choice(specialities, size)
+        categories = np.empty(size, dtype=np.int64)
+        for name in specialities:
+            selected = speciality == name
+            categories[selected] = rng.choice(len(icd), selected.sum(), p=weights[name])
+
+        chunk = pd.DataFrame(
+            {
+                "Rok": rng.choice(years, size),
+                "Województwo": rng.choice(woj, size),
+                "Specjalność komórki": speciality,
+            }
+        )
+        chunk = pd.concat([chunk, icd.iloc[categories].reset_index(drop=True)], axis=1)
+        chunk["Liczba porad AOS"] = rng.integers(1, 5000, size)
+        yield chunk
+
+
+def generate_problemy_zdrowotne_icd10(output_dir, dimensions, scale=1, seed=0):
+    """
+    Generates the processed ICD-10 data of the speciality and the raw ICD-10 files of
+    all specialities, split by years as the published files.
+
+    Returns:
+        list: Paths of the written files.
+    """
+    icd_columns = ["Rok", "Województwo"] + list(dimensions["icd"].columns)
+    processed = _write_chunks(
+        Path(output_dir)
+        / "processed"
+        / "problemy_zdrowotne_icd10_poradnia_okulistyczna.csv",
+        (
+            chunk[icd_columns + ["Liczba porad AOS"]]
+            for chunk in _icd_chunks(
+                dimensions,
+                BASE_ROWS["problemy_zdrowotne_icd10"] * scale,
+                [SPECIALITY],
+                "problemy_zdrowotne_icd10",
+                seed,
+            )
+        ),
+    )
+
+    # The raw data is published in two files covering consecutive periods
+    paths = [processed]
+    rows = BASE_ROWS["problemy_zdrowotne_icd10_raw"] * scale
+    for first, last in [(2016, 2019), (2020, 2023)]:
+        chunks = _icd_chunks(
+            dimensions,
+            rows // 2,
+            list(SPECIALITIES),
+            f"problemy_zdrowotne_icd10_{first}_{last}",
+            seed,
+            years=list(range(first, last + 1)),
+        )
+        paths.append(
+            _write_chunks(
+                Path(output_dir)
+                / "raw"
+                / f"problemy_zdrowotne_icd10_{first}_{last}.csv",
+                chunks,
+            )
+        )
+    return paths
+
+
+def generate_statystyki_porad(output_dir, dimensions, scale=1, seed=0):
+    """
+    Generates the processed consultation statistics (statystyki_porad).
+
+    Returns:
+        Path: Path of the written file.
+    """
+    woj = dimensions["wojewodztwa"]["Województwo"].to_numpy()
+
+    def chunks():
+        rows = BASE_ROWS["statystyki_porad"] * scale
+        for chunk_id, size in enumerate(_chunk_sizes(rows)):
+            rng = _rng(seed, "statystyki_porad", chunk_id)
+            yield pd.DataFrame(
+                {
+                    "Rok": rng.choice(YEARS, size),
+                    "Województwo": rng.choice(woj, size),
+                    "Liczba porad AOS": rng.integers(1, 500, size),
+                }
+            )
+
+    return _write_chunks(
+        Path(output_dir) / "processed" / "statystyki_porad_poradnia_okulistyczna.csv",
+        chunks(),
+    )
+
+
+def generate_teleporady(output_dir, dimensions, scale=1, seed=0):
+    """
+    Generates the raw teleconsultation data (teleporady), with providers, powiaty and
+    a share of rows without a województwo.
+
+    Returns:
+        Path: Path of the written file.
+    """
+    powiaty = dimensions["powiaty"]
+    providers = max(100, BASE_ROWS["teleporady"] // 50)
+
+    def chunks():
+        rows = BASE_ROWS["teleporady"] * scale
+        for chunk_id, chunk in enumerate(
+            _icd_chunks(dimensions, rows, list(SPECIALITIES), "teleporady", seed)
+        ):
+            rng = _rng(seed, "teleporady_units", chunk_id)
+            size = len(chunk)
+
+            # Every provider is located in one powiat
+            provider = rng.integers(0, providers, size)
+            county = powiaty.iloc[provider % len(powiaty)].reset_index(drop=True)
+            chunk["Nazwa świadczeniodawcy"] = [
+                f"Świadczeniodawca {p:05d}" for p in provider
+            ]
+            chunk["Województwo"] = county["Województwo"].to_numpy()
+            chunk["Powiat"] = county["Powiat"].to_numpy()
+            chunk["Gmina"] = county["Powiat"].to_numpy()
+            chunk["Miesiąc"] = rng.integers(1, 13, size)
+
+            all_consultations = chunk.pop("Liczba porad AOS")
+            chunk["Liczba wszystkich porad AOS"] = all_consultations
+            chunk["Liczba teleporad AOS"] = rng.binomial(all_consultations, 0.2)
+            chunk.loc[rng.random(size) < TELEPORADY_MISSING_SHARE, "Województwo"] = None
+
+            first = [
+                "Nazwa świadczeniodawcy",
+                "Województwo",
+                "Powiat",
+                "Gmina",
+                "Specjalność komórki",
+                "Miesiąc",
+                "Rok",
+            ]
+            yield chunk[first + [col for col in chunk.columns if col not in first]]
+
+    return _write_chunks(Path(output_dir) / "raw" / "teleporady.csv", chunks())
+
+
+def generate_demografia(output_dir, dimensions, scale=1, seed=0):
+    """
+    Generates the raw demography of the województwa by sex and age group, with the
+    region names in upper case as in the published file.
+
+    Returns:
+        Path: Path of the written file.
+    """
+    rng = _rng(seed, "demografia_wojewodztwa")
+    age_groups = [f"{age}-{age + 4}" for age in range(0, 85, 5)] + ["85+"]
+    grid = pd.MultiIndex.from_product(
+        [
+            YEARS,
+            dimensions["wojewodztwa"]["Województwo"].str.upper(),
+            ["K", "M"],
+            age_groups,
+        ],
+        names=["Rok", "Województwo", "Płeć", "Grupa wiekowa"],
+    ).to_frame(index=False)
+    return _write_chunks(
+        Path(output_dir) / "raw" / "demografia_wojewodztwa.csv",
+        _grid_chunks(grid, {"Liczba pacjentów": (10000, 200000)}, scale, rng),
+    )
+
+
+def generate_geometries(output_dir, dimensions):
+    """
+    Generates województwa and powiaty boundaries on a 4 x 4 grid of squares, every
+    województwo split into vertical strips of its powiaty.
+
+    Returns:
+        list: Paths of the written GeoJSON files.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    wojewodztwa = dimensions["wojewodztwa"]
+    squares = [
+        box(
+            i % 4 * MAP_CELL_SIZE,
+            i // 4 * MAP_CELL_SIZE,
+            (i % 4 + 1) * MAP_CELL_SIZE,
+            (i // 4 + 1) * MAP_CELL_SIZE,
+        )
+        for i in range(len(wojewodztwa))
+    ]
+    woj_path = output_dir / "wojewodztwa.geojson"
+    gpd.GeoDataFrame(
+        {
+            "JPT_NAZWA_": wojewodztwa["Województwo"],
+            "JPT_KOD_JE": wojewodztwa["TERYT_WOJ"],
+        },
+        geometry=squares,
+        crs="EPSG:2180",
+    ).to_file(woj_path, driver="GeoJSON")
+
+    # Split the square of every województwo into strips of its powiaty
+    strips = []
+    for square, (woj, group) in zip(
+        squares, dimensions["powiaty"].groupby("Województwo", sort=False)
+    ):
+        min_x, min_y, max_x, max_y = square.bounds
+        width = (max_x - min_x) / len(group)
+        strips.extend(
+            box(min_x + k * width, min_y, min_x + (k + 1) * width, max_y)
+            for k in range(len(group))
+        )
+    powiaty = dimensions["powiaty"]
+    pow_path = output_dir / "powiaty_mapped.geojson"
+    gpd.GeoDataFrame(
+        {
+            "JPT_NAZWA_": "powiat " + powiaty["Powiat"],
+            "JPT_KOD_JE": powiaty["TERYT_POW"],
+            "full_name": powiaty["Powiat"] + "_" + powiaty["Województwo"],
+        },
+        geometry=strips,
+        crs="EPSG:2180",
+    ).to_file(pow_path, driver="GeoJSON")
+    return [woj_path, pow_path]
+
+
+def generate_dataset(output_dir, scale=1, seed=0):
+    """
+    Generates all synthetic datasets in the layout of the data directory.
+
+    Args:
+        output_dir (str): Data directory to write to, with "raw" and "processed"
+            subfolders created as needed.
+        scale (int, optional): Scale factor of the row-level datasets, 1 to 1000.
+            Defaults to 1.
+        seed (int, optional): Seed of the generated values. Defaults to 0.
+
+    Returns:
+        list: Paths of the written files.
+
+    Raises:
+        ValueError: If the scale is not a positive integer.
+    """
+    if not isinstance(scale, (int, np.integer)) or scale < 1:
+        raise ValueError(f"Scale must be a positive integer, got {scale}.")
+
+    dimensions = build_dimensions(seed)
+    paths = [
+        generate_swiad_woj(output_dir, dimensions, scale, seed),
+        generate_swiad_pow(output_dir, dimensions, scale, seed),
+        *generate_problemy_zdrowotne_icd10(output_dir, dimensions, scale, seed),
+        generate_statystyki_porad(output_dir, dimensions, scale, seed),
+        generate_teleporady(output_dir, dimensions, scale, seed),
+        generate_demografia(output_dir, dimensions, scale, seed),
+        *generate_geometries(output_dir, dimensions),
+    ]
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate synthetic NFZ-shaped datasets for the benchmarks."
+    )
+    parser.add_argument(
+        "--output", required=True, help="Data directory to write the files to."
+    )
+    parser.add_argument(
+        "--scale",
+        type=int,
+        default=1,
+        help="Scale factor of the row-level datasets (default: 1).",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed of the generated values (default: 0)."
+    )
+    args = parser.parse_args(argv)
+
+    for path in generate_dataset(args.output, scale=args.scale, seed=args.seed):
+        print(f"{path} ({Path(path).stat().st_size / 1024**2:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
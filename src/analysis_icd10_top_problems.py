@@ -1,9 +1,9 @@
 # analysis_icd10_top_problems.py
-import pandas as pd
 import matplotlib.pyplot as plt
-from pathlib import Path
-from helpers.config import PLOTS_DIR, DATA_DIR, RESULTS_DIR
-from helpers.utils import read_csv, write_excel
+from helpers.config import PLOTS_DIR, RESULTS_DIR
+from helpers.utils import write_excel_sheets
+from helpers.datasets import get_dataset
+from helpers.icd_cube import build_icd_cube, icd_columns, top_n, stream_top_n
 from helpers.matplotlib_utils import save_fig_matplotlib
 
 
@@ -17,64 +17,36 @@ def format_icd_labels(icd_codes, icd_names, max_length=50):
     return formatted_labels
 
 
-def analyze_icd10_top_problems():
-    # Load the processed data
-    file_path = (
-        DATA_DIR / "processed" / "problemy_zdrowotne_icd10_poradnia_okulistyczna.csv"
-    )
-    df = read_csv(file_path)
-
-    # Select relevant columns
-    df = df[
-        [
-            "Rok",
-            "Województwo",
-            "Kod ICD-10 poziom 3.",
-            "Nazwa ICD-10 poziom 3.",
-            "Kod ICD-10 poziom 2.",
-            "Nazwa ICD-10 poziom 2.",
-            "Kod ICD-10 poziom 1.",
-            "Nazwa ICD-10 poziom 1.",
-            "Liczba porad AOS",
-        ]
-    ]
+def analyze_icd10_top_problems(df=None, cube=None, backend="cube"):
+    if backend not in ("cube", "stream"):
+        raise ValueError(f"Unsupported backend '{backend}'. Use 'cube' or 'stream'.")
+
+    # Use the precomputed ICD-10 cube, building it only for data passed in by the caller
+    if backend == "cube" and cube is None:
+        cube = (
+            build_icd_cube(df)
+            if df is not None
+            else get_dataset("icd10_cube", copy=False)
+        )
 
     # Set figure size based on A4 dimensions (in inches)
     fig_width = 11.7  # A4 width in inches (297mm)
     fig_height = 8.3  # Adjusted for horizontal layout
 
     fig, axes = plt.subplots(nrows=3, ncols=1, figsize=(fig_width, fig_height))
+    sheets = {}
     for idx, level in enumerate([1, 2, 3]):
-        icd_code_col = f"Kod ICD-10 poziom {level}."
-        icd_name_col = f"Nazwa ICD-10 poziom {level}."
-
-        # Aggregate the number of consultations by ICD code
-        top_icd = (
-            df.groupby([icd_code_col, icd_name_col])["Liczba porad AOS"]
-            .sum()
-            .nlargest(10)
-            .reset_index()
-        )
+        icd_code_col, icd_name_col = icd_columns(level)
 
-        # Save data to Excel
-        file_path = RESULTS_DIR / "icd10_top_problems_by_level.xlsx"
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        if not file_path.exists():
-            write_excel(
-                file_path=file_path,
-                data=top_icd,
-                sheet_name=f"Lvl_{level}",
-                mode="w",
-                index=False,
-            )
+        # Top 10 ICD codes by the number of consultations, read from the cube
+        # or streamed from the raw files
+        if backend == "cube":
+            top_icd = top_n(cube, level, n=10)
         else:
-            write_excel(
-                file_path=file_path,
-                data=top_icd,
-                sheet_name=f"Lvl_{level}",
-                mode="a",
-                index=False,
-            )
+            top_icd = stream_top_n(level, n=10)
+
+        # Collect data for the Excel workbook
+        sheets[f"Lvl_{level}"] = top_icd
 
         formatted_labels = format_icd_labels(
             top_icd[icd_code_col], top_icd[icd_name_col]
@@ -100,6 +72,11 @@ def analyze_icd10_top_problems():
                 fontsize=8,
             )
 
+    # Save data of all levels to Excel in one pass
+    file_path = RESULTS_DIR / "icd10_top_problems_by_level.xlsx"
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    write_excel_sheets(file_path, sheets, index=False)
+
     # Add a common title to the figure
     fig.suptitle(
         "Najczęstsze problemy zdrowotne (ICD-10)",
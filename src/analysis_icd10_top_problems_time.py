@@ -1,12 +1,19 @@
 # analysis_icd10_top_problems_time.py
-import pandas as pd
-import matplotlib.pyplot as plt
 from pathlib import Path
-from helpers.config import PLOTS_DIR, DATA_DIR, RESULTS_DIR
-from helpers.utils import read_csv, write_excel
+from helpers.config import PLOTS_DIR, RESULTS_DIR
+from helpers.utils import excel_writer_session
+from helpers.datasets import get_dataset
+from helpers.icd_cube import (
+    build_icd_cube,
+    icd_columns,
+    share_by_year,
+    stream_share_by_year,
+    stream_top_n,
+    top_n,
+)
 from helpers.matplotlib_utils import (
-    save_fig_matplotlib,
     create_subplots_matplotlib,
+    render_figures_matplotlib,
 )
 
 
@@ -20,109 +27,118 @@ def format_icd_labels(icd_codes, icd_names, max_length=50):
     return formatted_labels
 
 
-def analyze_icd10_by_year():
+def plot_icd10_share_by_year(pivot_table_percentage, level):
     """
-    Analyzes the most common ICD-10 health issues at each classification level over the years.
-    Generates bar and line charts to visualize the trends in percentages.
+    Plots the yearly percentage share of the top ICD-10 problems of a level.
+
+    Args:
+        pivot_table_percentage (pd.DataFrame): Percentages with years as the index and
+            formatted ICD-10 labels as columns.
+        level (int): ICD-10 classification level.
+
+    Returns:
+        plt.Figure: The line chart.
     """
-    # Load the processed data
-    file_path = Path(
-        DATA_DIR / "processed" / "problemy_zdrowotne_icd10_poradnia_okulistyczna.csv"
+    # Plot trends over years
+    fig, ax = create_subplots_matplotlib(n_plots=1, n_cols=1, figsize=(11.7, 8.3))
+    ax = ax[0]
+    pivot_table_percentage.plot(marker="o", ax=ax)
+
+    ax.set_xlabel("Rok")
+    ax.set_ylabel("Procentowy udział porad AOS")
+    ax.grid(True, linestyle="--", alpha=0.7)
+
+    fig.suptitle(
+        f"Udział procentowy najczęstszych problemów zdrowotnych (ICD-10, poziom {level}) 2016-2023",
+        fontsize=12,
+        y=0.95,
     )
-    df = read_csv(file_path)
-
-    # Select relevant columns
-    df = df[
-        [
-            "Rok",
-            "Kod ICD-10 poziom 1.",
-            "Nazwa ICD-10 poziom 1.",
-            "Kod ICD-10 poziom 2.",
-            "Nazwa ICD-10 poziom 2.",
-            "Kod ICD-10 poziom 3.",
-            "Nazwa ICD-10 poziom 3.",
-            "Liczba porad AOS",
-        ]
-    ]
-
-    for level in [1, 2, 3]:
-        icd_code_col = f"Kod ICD-10 poziom {level}."
-        icd_name_col = f"Nazwa ICD-10 poziom {level}."
-
-        # Identify top 10 ICD-10 issues based on total number of consultations
-        top_icd = (
-            df.groupby([icd_code_col, icd_name_col])["Liczba porad AOS"]
-            .sum()
-            .nlargest(10)
-            .reset_index()
-        )
 
-        # Filter data for top 10 problems only
-        df_filtered = df[df[icd_code_col].isin(top_icd[icd_code_col])]
+    # Adjust layout to make space for legend
+    fig.subplots_adjust(bottom=0.2)
+    ax.get_legend().remove()
+    fig.legend(
+        labels=pivot_table_percentage.columns.tolist(),
+        title=f"ICD-10 Poziom {level}",
+        loc="lower center",
+        ncol=2,
+    )
 
-        # Create a pivot table for visualization
-        pivot_table = df_filtered.pivot_table(
-            index="Rok", columns=icd_name_col, values="Liczba porad AOS", aggfunc="sum"
-        )
+    return fig
 
-        # Convert to percentages
-        pivot_table_percentage = pivot_table.div(pivot_table.sum(axis=1), axis=0) * 100
 
-        # Format legend labels
-        formatted_labels = format_icd_labels(
-            top_icd[icd_code_col], top_icd[icd_name_col]
-        )
-        pivot_table_percentage.columns = formatted_labels
-
-        # Save pivot table to Excel
-        file_path = Path(RESULTS_DIR / f"icd10_top_problems_time.xlsx")
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        if not file_path.exists():
-            write_excel(
-                file_path,
-                pivot_table_percentage,
-                sheet_name=f"Lvl_{level}",
-                mode="w",
-                index=True,
-            )
-        else:
-            write_excel(
-                file_path,
-                pivot_table_percentage,
-                sheet_name=f"Lvl_{level}",
-                mode="a",
-                index=True,
-            )
+def analyze_icd10_by_year(df=None, cube=None, backend="cube"):
+    """
+    Analyzes the most common ICD-10 health issues at each classification level over the years.
+    Generates bar and line charts to visualize the trends in percentages.
 
-        # Plot trends over years
-        fig, ax = create_subplots_matplotlib(n_plots=1, n_cols=1, figsize=(11.7, 8.3))
-        ax = ax[0]
-        pivot_table_percentage.plot(marker="o", ax=ax)
+    Args:
+        df (pd.DataFrame, optional): Preloaded ICD-10 data, used to build the cube if
+            `cube` is not given.
+        cube (pd.DataFrame, optional): Precomputed ICD-10 cube. Loaded from the dataset
+            registry if neither `df` nor `cube` is given.
+        backend (str, optional): "cube" to answer from the ICD-10 cube, or "stream" to
+            stream the raw ICD-10 files chunk by chunk. Defaults to "cube".
 
-        ax.set_xlabel("Rok")
-        ax.set_ylabel("Procentowy udział porad AOS")
-        ax.grid(True, linestyle="--", alpha=0.7)
+    Returns:
+        list: Rendering status and time of every figure, see render_figures_matplotlib.
 
-        fig.suptitle(
-            f"Udział procentowy najczęstszych problemów zdrowotnych (ICD-10, poziom {level}) 2016-2023",
-            fontsize=12,
-            y=0.95,
+    Raises:
+        ValueError: If the backend is not supported.
+    """
+    if backend not in ("cube", "stream"):
+        raise ValueError(f"Unsupported backend '{backend}'. Use 'cube' or 'stream'.")
+
+    # Use the precomputed ICD-10 cube, building it only for data passed in by the caller
+    if backend == "cube" and cube is None:
+        cube = (
+            build_icd_cube(df)
+            if df is not None
+            else get_dataset("icd10_cube", copy=False)
         )
 
-        # Adjust layout to make space for legend
-        fig.subplots_adjust(bottom=0.2)
-        ax.get_legend().remove()
-        fig.legend(
-            labels=formatted_labels,
-            title=f"ICD-10 Poziom {level}",
-            loc="lower center",
-            ncol=2,
-        )
+    # Open the workbook once and write every level to its own sheet
+    file_path = Path(RESULTS_DIR / f"icd10_top_problems_time.xlsx")
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    figure_specs = []
+    with excel_writer_session(file_path) as write_sheet:
+        for level in [1, 2, 3]:
+            icd_code_col, icd_name_col = icd_columns(level)
+
+            # Identify top 10 ICD-10 issues based on total number of consultations
+            # and their yearly percentages, in the order of the ranking
+            if backend == "cube":
+                top_icd = top_n(cube, level, n=10)
+                pivot_table_percentage = share_by_year(
+                    cube, level, top_icd[icd_code_col]
+                )
+            else:
+                top_icd = stream_top_n(level, n=10)
+                pivot_table_percentage = stream_share_by_year(
+                    level, top_icd[icd_code_col]
+                )
+
+            # Format legend labels
+            formatted_labels = format_icd_labels(
+                top_icd[icd_code_col], top_icd[icd_name_col]
+            )
+            pivot_table_percentage.columns = formatted_labels
+
+            # Save pivot table to Excel
+            write_sheet(pivot_table_percentage, sheet_name=f"Lvl_{level}", index=True)
+
+            # Collect the trend chart of the level for batch rendering
+            figure_specs.append(
+                {
+                    "plot": plot_icd10_share_by_year,
+                    "args": (pivot_table_percentage, level),
+                    "file_path": Path(PLOTS_DIR)
+                    / f"icd10_top_problems_lvl{level}_time.png",
+                }
+            )
 
-        # Save the figure
-        save_fig_matplotlib(
-            fig, Path(PLOTS_DIR) / f"icd10_top_problems_lvl{level}_time.png"
-        )
+    # Render the charts of all levels in parallel, closing every figure
+    return render_figures_matplotlib(figure_specs)
 
 
 if __name__ == "__main__":
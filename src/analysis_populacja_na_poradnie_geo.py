@@ -1,20 +1,30 @@
 # analysis_populacja_na_poradnie_geo.py
-import pandas as pd
-import geopandas as gpd
 from pathlib import Path
-import matplotlib.pyplot as plt
-from helpers.config import PLOTS_DIR, DATA_DIR, RESULTS_DIR
-from helpers.utils import read_csv, write_excel, read_excel
-from helpers.matplotlib_utils import create_subplots_matplotlib
+from helpers.config import PLOTS_DIR, RESULTS_DIR
+from helpers.utils import write_excel
+from helpers.datasets import get_dataset
+from helpers.schema import apply_schema, label_key
+from helpers.geometry_store import GEOMETRY_NAME_KEY, lod_geometries, normalize_names
+from helpers.matplotlib_utils import choropleth_session_matplotlib
 
+# Size and resolution of the map, also used to pick the level of detail of the boundaries
+FIGSIZE = (12, 8)
+DPI = 300
 
-def analyze_population_to_clinic_geo():
+
+def analyze_population_to_clinic_geo(
+    df_clinics=None, df_demography=None, wojewodztwa=None
+):
     # Load the shapefile containing the boundaries of Polish regions
-    map = gpd.read_file(Path(DATA_DIR / "wojewodztwa.geojson"))
+    if wojewodztwa is None:
+        wojewodztwa = get_dataset("wojewodztwa_geo", copy=False)
+
+    # Use boundaries simplified for the size and resolution of the map
+    map = lod_geometries(wojewodztwa, figsize=FIGSIZE, dpi=DPI)
 
     # Load the processed data containing clinic information
-    file_path = DATA_DIR / "processed" / "swiad_woj_poradnia_okulistyczna.csv"
-    df_clinics = read_csv(file_path)
+    if df_clinics is None:
+        df_clinics = get_dataset("swiad_woj", copy=False)
 
     # Select only relevant columns for analysis
     df_clinics = df_clinics[["Rok", "Województwo", "Liczba poradni AOS"]]
@@ -24,12 +34,14 @@ def analyze_population_to_clinic_geo():
 
     # Aggregate the number of clinics by region (Województwo)
     df_clinics = (
-        df_clinics.groupby("Województwo")["Liczba poradni AOS"].sum().reset_index()
+        df_clinics.groupby("Województwo", observed=True)["Liczba poradni AOS"]
+        .sum()
+        .reset_index()
     )
 
     # Load demographic data
-    demography_file = DATA_DIR / "raw" / "demografia_wojewodztwa.csv"
-    df_demography = read_csv(demography_file)
+    if df_demography is None:
+        df_demography = get_dataset("demografia_woj", copy=False)
 
     # Filter dataset for the latest available year (2023)
     df_demography = df_demography[df_demography["Rok"] == 2023]
@@ -37,13 +49,17 @@ def analyze_population_to_clinic_geo():
     # Select relevant columns for analysis
     df_clinics = df_clinics[["Województwo", "Liczba poradni AOS"]]
     df_demography = df_demography[["Województwo", "Liczba pacjentów"]]
-    df_demography = df_demography.groupby("Województwo", as_index=False)[
+    df_demography = df_demography.groupby("Województwo", as_index=False, observed=True)[
         "Liczba pacjentów"
     ].sum()
 
-    # Convert the region names to lowercase to ensure consistency for merging
-    df_clinics["Województwo"] = df_clinics["Województwo"].str.lower()
-    df_demography["Województwo"] = df_demography["Województwo"].str.lower()
+    # Normalize the region names like the map keys to ensure consistency for merging
+    df_clinics["Województwo"] = normalize_names(df_clinics["Województwo"])
+    df_demography["Województwo"] = normalize_names(df_demography["Województwo"])
+
+    # Encode the region names with the shared dictionary to merge on codes
+    df_clinics = apply_schema(df_clinics, ["Województwo"])
+    df_demography = apply_schema(df_demography, ["Województwo"])
 
     # Merge clinic data with population data
     df_merged = df_clinics.merge(df_demography, on="Województwo")
@@ -53,38 +69,23 @@ def analyze_population_to_clinic_geo():
         df_merged["Liczba pacjentów"] / 1000 / df_merged["Liczba poradni AOS"]
     )
 
+    # Sort the regions by name for the output
+    df_merged = df_merged.sort_values("Województwo", key=label_key, ignore_index=True)
+
     # Write results to an Excel file
     result_file_path = Path(RESULTS_DIR / "population_to_clinic_geo_2023.xlsx")
     write_excel(result_file_path, df_merged)
 
-    # Merge with the map data
-    map["JPT_NAZWA_"] = map["JPT_NAZWA_"].str.lower()
-    map = map.merge(df_merged, left_on="JPT_NAZWA_", right_on="Województwo")
-
-    # Create visualization
-    fig, ax = create_subplots_matplotlib(1, 1, figsize=(12, 8))
-    ax = ax[0]
-
-    # Plot population to clinic
-    map.plot(
-        column="Population to clinic",
-        cmap="PuBu",
-        linewidth=0.8,
-        edgecolor="black",
-        legend=True,
-        legend_kwds={
-            "label": "Liczba pacjentów na poradnię (tys.)",
-        },
-        ax=ax,
-    )
-
-    ax.set_title("")
-    ax.set_xticks([])
-    ax.set_yticks([])
+    # Merge with the map data on the normalized region names
+    map = map.merge(df_merged, left_on=GEOMETRY_NAME_KEY, right_on="Województwo")
 
-    # Save the figure
-    plt.savefig(Path(PLOTS_DIR / "population_to_clinic_geo_2023.png"), dpi=300)
-    plt.close()
+    # Plot population to clinic using a choropleth map
+    with choropleth_session_matplotlib(map, figsize=FIGSIZE, dpi=DPI) as render:
+        render(
+            map["Population to clinic"],
+            Path(PLOTS_DIR / "population_to_clinic_geo_2023.png"),
+            label="Liczba pacjentów na poradnię (tys.)",
+        )
 
 
 if __name__ == "__main__":
@@ -1,20 +1,26 @@
-# analysis_poradnie_woj_geo.py
-import geopandas as gpd
+# analysis_poradnie_pow_geo.py
 from pathlib import Path
 import matplotlib.pyplot as plt
 import os
-from helpers.config import PLOTS_DIR, DATA_DIR, RESULTS_DIR
-from helpers.utils import read_csv, write_excel
+from helpers.config import PLOTS_DIR, RESULTS_DIR
+from helpers.utils import write_excel
+from helpers.datasets import get_dataset
+from helpers.geometry_store import lod_geometries
 from helpers.matplotlib_utils import create_subplots_matplotlib
 
+# Size and resolution of the map, also used to pick the level of detail of the boundaries
+FIGSIZE = (12, 8)
+DPI = 300
 
-def analyze_clinics_by_county_geo():
+
+def analyze_clinics_by_county_geo(df=None, powiaty=None):
     # Load the shapefile containing the boundaries of Polish regions
-    powiaty = gpd.read_file(Path(DATA_DIR / "powiaty_mapped.geojson"))
+    if powiaty is None:
+        powiaty = get_dataset("powiaty_geo", copy=False)
 
     # Load the processed data containing clinic information
-    file_path = DATA_DIR / "processed" / "swiad_pow_poradnia_okulistyczna.csv"
-    df = read_csv(file_path)
+    if df is None:
+        df = get_dataset("swiad_pow", copy=False)
 
     # Select only relevant columns for analysis
     df = df[["Rok", "Województwo", "Powiat", "Liczba poradni AOS"]]
@@ -38,6 +44,9 @@ def analyze_clinics_by_county_geo():
     file_path = Path(RESULTS_DIR / "clinics_by_county_geo_2023.xlsx")
     write_excel(file_path, df_grouped)
 
+    # Use boundaries simplified for the size and resolution of the map
+    powiaty = lod_geometries(powiaty, figsize=FIGSIZE, dpi=DPI)
+
     # Merge the clinic data with the map based on region names
     map = powiaty.merge(df_grouped, left_on="full_name", right_on="full_name")
 
@@ -46,7 +55,7 @@ def analyze_clinics_by_county_geo():
     map["Liczba poradni AOS"] = map["Liczba poradni AOS"].astype(int)
 
     # Create a figure and axis using the utility function
-    fig, ax = create_subplots_matplotlib(1, 1, figsize=(12, 8))
+    fig, ax = create_subplots_matplotlib(1, 1, figsize=FIGSIZE)
     ax = ax[0]
 
     # Plot the number of clinics by region using a choropleth map
@@ -71,7 +80,7 @@ def analyze_clinics_by_county_geo():
     file_path = Path(PLOTS_DIR / "clinics_by_county_geo_2023.png")
     if file_path.exists():
         os.remove(file_path)
-    plt.savefig(file_path, dpi=300)
+    plt.savefig(file_path, dpi=DPI)
     plt.close()
 
 
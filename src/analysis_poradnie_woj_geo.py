@@ -1,19 +1,28 @@
 # analysis_poradnie_woj_geo.py
-import geopandas as gpd
 from pathlib import Path
-import matplotlib.pyplot as plt
-from helpers.config import PLOTS_DIR, DATA_DIR, RESULTS_DIR
-from helpers.utils import read_csv, write_excel
-from helpers.matplotlib_utils import create_subplots_matplotlib
+from helpers.config import PLOTS_DIR, RESULTS_DIR
+from helpers.utils import write_excel
+from helpers.datasets import get_dataset
+from helpers.schema import label_key
+from helpers.geometry_store import GEOMETRY_NAME_KEY, lod_geometries, normalize_names
+from helpers.matplotlib_utils import choropleth_session_matplotlib
 
+# Size and resolution of the map, also used to pick the level of detail of the boundaries
+FIGSIZE = (12, 8)
+DPI = 300
 
-def analyze_clinics_by_region_geo():
+
+def analyze_clinics_by_region_geo(df=None, wojewodztwa=None):
     # Load the shapefile containing the boundaries of Polish regions
-    map = gpd.read_file(Path(DATA_DIR / "wojewodztwa.geojson"))
+    if wojewodztwa is None:
+        wojewodztwa = get_dataset("wojewodztwa_geo", copy=False)
+
+    # Use boundaries simplified for the size and resolution of the map
+    map = lod_geometries(wojewodztwa, figsize=FIGSIZE, dpi=DPI)
 
     # Load the processed data containing clinic information
-    file_path = DATA_DIR / "processed" / "swiad_woj_poradnia_okulistyczna.csv"
-    df = read_csv(file_path)
+    if df is None:
+        df = get_dataset("swiad_woj", copy=False)
 
     # Select only relevant columns for analysis
     df = df[["Rok", "Województwo", "Liczba poradni AOS"]]
@@ -25,43 +34,29 @@ def analyze_clinics_by_region_geo():
     df.drop(columns=["Rok"], inplace=True)
 
     # Aggregate the number of clinics by region (Województwo)
-    df_grouped = df.groupby("Województwo")["Liczba poradni AOS"].sum().reset_index()
+    df_grouped = (
+        df.groupby("Województwo", observed=True)["Liczba poradni AOS"]
+        .sum()
+        .sort_index(key=label_key)
+        .reset_index()
+    )
 
     # Write excel
     file_path = Path(RESULTS_DIR / "clinics_by_region_geo_2023.xlsx")
     write_excel(file_path, df_grouped)
 
-    # Convert the region names to lowercase to ensure consistency for merging
-    map["JPT_NAZWA_"] = map["JPT_NAZWA_"].str.lower()
-    df_grouped["Województwo"] = df_grouped["Województwo"].str.lower()
+    # Normalize the region names to match the map keys
+    df_grouped["Województwo"] = normalize_names(df_grouped["Województwo"])
 
     # Merge the clinic data with the map based on region names
-    map = map.merge(df_grouped, left_on="JPT_NAZWA_", right_on="Województwo")
-
-    # Create a figure and axis using the utility function
-    fig, ax = create_subplots_matplotlib(1, 1, figsize=(12, 8))
-    ax = ax[0]
+    map = map.merge(df_grouped, left_on=GEOMETRY_NAME_KEY, right_on="Województwo")
 
     # Plot the number of clinics by region using a choropleth map
-    map.plot(
-        column="Liczba poradni AOS",
-        cmap="PuBu",
-        linewidth=0.8,
-        edgecolor="black",
-        legend=True,
-        ax=ax,
-    )
-
-    # Add a title to the plot
-    ax.set_title("")
-
-    # Remove axis ticks and labels for better visualization
-    ax.set_xticks([])
-    ax.set_yticks([])
-
-    # Save the figure to a file
-    plt.savefig(Path(PLOTS_DIR / "clinics_by_region_geo_2023.png"), dpi=300)
-    plt.close()
+    with choropleth_session_matplotlib(map, figsize=FIGSIZE, dpi=DPI) as render:
+        render(
+            map["Liczba poradni AOS"],
+            Path(PLOTS_DIR / "clinics_by_region_geo_2023.png"),
+        )
 
 
 if __name__ == "__main__":
@@ -1,33 +1,28 @@
 # analysis_poradnie_woj_time.py
-import pandas as pd
-import matplotlib.pyplot as plt
 from pathlib import Path
-from helpers.config import PLOTS_DIR, DATA_DIR, RESULTS_DIR
-from helpers.utils import read_csv, write_excel
-from helpers.matplotlib_utils import save_fig_matplotlib, create_subplots_matplotlib
+from helpers.config import PLOTS_DIR, RESULTS_DIR
+from helpers.utils import write_excel
+from helpers.datasets import get_dataset
+from helpers.schema import label_key
+from helpers.measure_store import measure_table
+from helpers.timeseries import time_series_matrix
+from helpers.matplotlib_utils import (
+    create_subplots_matplotlib,
+    render_figures_matplotlib,
+)
 
 
-def analyze_clinics_by_region_time():
+def plot_clinics_by_region_time(pivot_table):
     """
-    Analyzes the number of ophthalmology clinics in different regions over the years.
-    Generates bar and line charts to visualize the trends.
-    """
-    # Load the processed data
-    file_path = Path(DATA_DIR / "processed" / "swiad_woj_poradnia_okulistyczna.csv")
-    df = read_csv(file_path)
+    Plots the number of clinics in every region over the years.
 
-    # Select relevant columns
-    df = df[["Rok", "Województwo", "Liczba poradni AOS"]]
-
-    # Create a pivot table for visualization
-    pivot_table = df.pivot_table(
-        index="Rok", columns="Województwo", values="Liczba poradni AOS", aggfunc="sum"
-    )
-
-    # Save pivot table to Excel
-    file_path = Path(RESULTS_DIR / "clinics_by_region_time.xlsx")
-    write_excel(file_path, pivot_table)
+    Args:
+        pivot_table (pd.DataFrame): Number of clinics with years as the index and
+            regions as columns.
 
+    Returns:
+        plt.Figure: The line chart.
+    """
     # Define 16 distinct colors for województwa
     colors = [
         "#1f77b4",
@@ -72,8 +67,50 @@ def analyze_clinics_by_region_time():
         ncol=4,
     )
 
-    # Save the figure
-    save_fig_matplotlib(fig, Path(PLOTS_DIR) / "clinics_by_region_time.png")
+    return fig
+
+
+def analyze_clinics_by_region_time(df=None, store=None):
+    """
+    Analyzes the number of ophthalmology clinics in different regions over the years.
+    Generates bar and line charts to visualize the trends.
+
+    Args:
+        df (pd.DataFrame, optional): Preloaded clinic data.
+        store (dict, optional): Measure store of the clinic data. Opened from the
+            dataset registry if neither `df` nor `store` is given.
+
+    Returns:
+        list: Rendering status and time of the figure, see render_figures_matplotlib.
+    """
+    if df is not None:
+        # Sum the clinics into a year × region matrix for visualization
+        pivot_table = time_series_matrix(df, "Województwo", "Liczba poradni AOS")
+    else:
+        # Sum the memory-mapped measure by year and region
+        if store is None:
+            store = get_dataset("swiad_woj_measures")
+        pivot_table = measure_table(
+            store, "Liczba poradni AOS", index="Rok", columns="Województwo"
+        )
+
+    # Sort the regions by name for the output
+    pivot_table = pivot_table.sort_index(axis=1, key=label_key)
+
+    # Save pivot table to Excel
+    file_path = Path(RESULTS_DIR / "clinics_by_region_time.xlsx")
+    write_excel(file_path, pivot_table)
+
+    # Render the line chart on the batch backend, which closes the figure
+    return render_figures_matplotlib(
+        [
+            {
+                "plot": plot_clinics_by_region_time,
+                "args": (pivot_table,),
+                "file_path": Path(PLOTS_DIR) / "clinics_by_region_time.png",
+            }
+        ]
+    )
 
 
 if __name__ == "__main__":
@@ -1,19 +1,29 @@
-import pandas as pd
-import geopandas as gpd
 from pathlib import Path
-import matplotlib.pyplot as plt
-from helpers.config import PLOTS_DIR, DATA_DIR, RESULTS_DIR
-from helpers.utils import read_csv, write_excel, read_excel
-from helpers.matplotlib_utils import create_subplots_matplotlib
+from helpers.config import PLOTS_DIR, RESULTS_DIR
+from helpers.utils import write_excel
+from helpers.datasets import get_dataset
+from helpers.schema import apply_schema, label_key
+from helpers.geometry_store import GEOMETRY_NAME_KEY, lod_geometries, normalize_names
+from helpers.matplotlib_utils import choropleth_session_matplotlib
 
+# Size and resolution of the map, also used to pick the level of detail of the boundaries
+FIGSIZE = (12, 8)
+DPI = 300
 
-def analyze_consultation_to_clinic_geo():
+
+def analyze_consultation_to_clinic_geo(
+    df_clinics=None, df_consultations=None, wojewodztwa=None
+):
     # Load the shapefile containing the boundaries of Polish regions
-    map = gpd.read_file(Path(DATA_DIR / "wojewodztwa.geojson"))
+    if wojewodztwa is None:
+        wojewodztwa = get_dataset("wojewodztwa_geo", copy=False)
+
+    # Use boundaries simplified for the size and resolution of the map
+    map = lod_geometries(wojewodztwa, figsize=FIGSIZE, dpi=DPI)
 
     # Load the processed data containing clinic information
-    file_path = DATA_DIR / "processed" / "swiad_woj_poradnia_okulistyczna.csv"
-    df_clinics = read_csv(file_path)
+    if df_clinics is None:
+        df_clinics = get_dataset("swiad_woj", copy=False)
 
     # Select only relevant columns for analysis
     df_clinics = df_clinics[["Rok", "Województwo", "Liczba poradni AOS"]]
@@ -23,23 +33,27 @@ def analyze_consultation_to_clinic_geo():
 
     # Aggregate the number of clinics by region (Województwo)
     df_clinics = (
-        df_clinics.groupby("Województwo")["Liczba poradni AOS"].sum().reset_index()
+        df_clinics.groupby("Województwo", observed=True)["Liczba poradni AOS"]
+        .sum()
+        .reset_index()
     )
 
     # Load consultation statistics
-    consultations_file = (
-        DATA_DIR / "processed" / "statystyki_porad_poradnia_okulistyczna.csv"
-    )
-    df_consultations = read_csv(consultations_file)
+    if df_consultations is None:
+        df_consultations = get_dataset("statystyki_porad", copy=False)
 
     # Aggregate consultations by region
-    df_consultations = df_consultations.groupby("Województwo", as_index=False)[
-        "Liczba porad AOS"
-    ].sum()
+    df_consultations = df_consultations.groupby(
+        "Województwo", as_index=False, observed=True
+    )["Liczba porad AOS"].sum()
 
-    # Convert the region names to lowercase to ensure consistency for merging
-    df_clinics["Województwo"] = df_clinics["Województwo"].str.lower()
-    df_consultations["Województwo"] = df_consultations["Województwo"].str.lower()
+    # Normalize the region names like the map keys to ensure consistency for merging
+    df_clinics["Województwo"] = normalize_names(df_clinics["Województwo"])
+    df_consultations["Województwo"] = normalize_names(df_consultations["Województwo"])
+
+    # Encode the region names with the shared dictionary to merge on codes
+    df_clinics = apply_schema(df_clinics, ["Województwo"])
+    df_consultations = apply_schema(df_consultations, ["Województwo"])
 
     # Merge clinic data with consultations data
     df_merged = df_clinics.merge(df_consultations, on="Województwo")
@@ -49,39 +63,25 @@ def analyze_consultation_to_clinic_geo():
         df_merged["Liczba porad AOS"] / 1000 / df_merged["Liczba poradni AOS"]
     )
 
+    # Sort the regions by name for the output
+    df_merged = df_merged.sort_values("Województwo", key=label_key, ignore_index=True)
+
     # Write results to an Excel file
     result_file_path = Path(
         RESULTS_DIR / "consultations_per_clinic_by_region_2023.xlsx"
     )
     write_excel(result_file_path, df_merged)
 
-    # Merge with the map data
-    map["JPT_NAZWA_"] = map["JPT_NAZWA_"].str.lower()
-    map = map.merge(df_merged, left_on="JPT_NAZWA_", right_on="Województwo")
-
-    # Create visualization
-    fig, ax = create_subplots_matplotlib(1, 1, figsize=(12, 8))
-    ax = ax[0]
-
-    # Plot consultations per clinic
-    map.plot(
-        column="Consultations per clinic",
-        cmap="PuBu",
-        linewidth=0.8,
-        edgecolor="black",
-        legend=True,
-        legend_kwds={
-            "label": "Liczba porad AOS na poradnię (tys.)",
-        },
-        ax=ax,
-    )
-    ax.set_title("")
-    ax.set_xticks([])
-    ax.set_yticks([])
+    # Merge with the map data on the normalized region names
+    map = map.merge(df_merged, left_on=GEOMETRY_NAME_KEY, right_on="Województwo")
 
-    # Save the figure
-    plt.savefig(Path(PLOTS_DIR / "consultations_to_clinic_geo_2023.png"), dpi=300)
-    plt.close()
+    # Plot consultations per clinic using a choropleth map
+    with choropleth_session_matplotlib(map, figsize=FIGSIZE, dpi=DPI) as render:
+        render(
+            map["Consultations per clinic"],
+            Path(PLOTS_DIR / "consultations_to_clinic_geo_2023.png"),
+            label="Liczba porad AOS na poradnię (tys.)",
+        )
 
 
 if __name__ == "__main__":
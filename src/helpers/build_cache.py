@@ -0,0 +1,252 @@
+"""Content-hash build cache for analysis outputs.
+
+Each analysis target is keyed by a hash of its input files, its parameters, the
+source of its module and the sources of the helpers package the outputs are produced
+with. When the key matches the last successful build, the analysis
+is skipped and its outputs are restored from a content-addressed store if they were
+removed or modified.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import shutil
+from pathlib import Path
+from .config import BUILD_CACHE_DIR
+
+# Version of the key and manifest format, part of every cache key
+BUILD_CACHE_VERSION = 2
+
+# Directory of the helpers package, whose sources are part of every cache key
+HELPERS_DIR = Path(__file__).resolve().parent
+
+
+def _sha256_file(file_path):
+    """Returns the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_json(file_path, default):
+    """Reads a JSON file, returning `default` if it is missing or unreadable."""
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def _write_json(file_path, data):
+    """Writes a JSON file atomically."""
+    file_path = Path(file_path)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = file_path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, file_path)
+
+
+def file_digest(file_path, cache_dir=BUILD_CACHE_DIR):
+    """
+    Returns the content hash of a file.
+
+    Digests are memoized by path, size and modification time, so unchanged files are
+    not re-read on every run.
+
+    Args:
+        file_path (str): Path of the file to hash.
+        cache_dir (str, optional): Build cache directory. Defaults to BUILD_CACHE_DIR.
+
+    Returns:
+        str: SHA-256 hex digest of the file content.
+    """
+    file_path = Path(file_path).resolve()
+    stat = file_path.stat()
+    stamp = [stat.st_size, stat.st_mtime_ns]
+
+    index_path = Path(cache_dir) / "digests.json"
+    index = _read_json(index_path, {})
+    entry = index.get(str(file_path))
+    if entry is not None and entry["stamp"] == stamp:
+        return entry["digest"]
+
+    digest = _sha256_file(file_path)
+    index[str(file_path)] = {"stamp": stamp, "digest": digest}
+    _write_json(index_path, index)
+    return digest
+
+
+def helpers_digest(cache_dir=BUILD_CACHE_DIR):
+    """
+    Returns the combined hash of the sources of the helpers package.
+
+    Args:
+        cache_dir (str, optional): Build cache directory. Defaults to BUILD_CACHE_DIR.
+
+    Returns:
+        str: SHA-256 hex digest of the names and contents of all helpers modules.
+    """
+    digest = hashlib.sha256()
+    for path in sorted(HELPERS_DIR.glob("*.py")):
+        digest.update(f"{path.name}:{file_digest(path, cache_dir)};".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def build_key(function, input_paths, params=None, cache_dir=BUILD_CACHE_DIR):
+    """
+    Computes the cache key of an analysis.
+
+    Args:
+        function (callable): The analysis function. The source of its whole module and
+            of the helpers package are hashed, so changes in module-level functions or
+            in the shared helpers (aggregation, plotting, datasets) also invalidate
+            the key.
+        input_paths (list): Paths of the input files.
+        params (dict, optional): JSON-serializable parameters of the analysis.
+        cache_dir (str, optional): Build cache directory. Defaults to BUILD_CACHE_DIR.
+
+    Returns:
+        str: SHA-256 hex digest identifying the build.
+    """
+    source = inspect.getsource(inspect.getmodule(function))
+    key_data = {
+        "version": BUILD_CACHE_VERSION,
+        "helpers": helpers_digest(cache_dir),
+        "function": f"{function.__module__}.{function.__qualname__}",
+        "source": hashlib.sha256(source.encode("utf-8")).hexdigest(),
+        "inputs": sorted(
+            [str(Path(path).resolve()), file_digest(path, cache_dir)]
+            for path in input_paths
+        ),
+        "params": params or {},
+    }
+    key_json = json.dumps(key_data, sort_keys=True, default=str)
+    return hashlib.sha256(key_json.encode("utf-8")).hexdigest()
+
+
+def _manifest_path(target, cache_dir):
+    return Path(cache_dir) / "manifests" / f"{target}.json"
+
+
+def _object_path(digest, cache_dir):
+    return Path(cache_dir) / "objects" / digest[:2] / digest
+
+
+def is_up_to_date(target, key, outputs, cache_dir=BUILD_CACHE_DIR):
+    """
+    Checks whether a target was built with the same key and restores its outputs.
+
+    Outputs that are missing or differ from the recorded build are copied back from
+    the content-addressed store.
+
+    Args:
+        target (str): Name of the build target.
+        key (str): Cache key computed with build_key.
+        outputs (list): Paths of the target's output files.
+        cache_dir (str, optional): Build cache directory. Defaults to BUILD_CACHE_DIR.
+
+    Returns:
+        bool: True if the target is up to date and all its outputs are in place.
+    """
+    manifest = _read_json(_manifest_path(target, cache_dir), None)
+    if manifest is None or manifest["key"] != key:
+        return False
+
+    recorded_outputs = manifest["outputs"]
+    if set(recorded_outputs) != {str(Path(path).resolve()) for path in outputs}:
+        return False
+
+    for output, digest in recorded_outputs.items():
+        output = Path(output)
+        if output.is_file() and _sha256_file(output) == digest:
+            continue
+
+        stored_object = _object_path(digest, cache_dir)
+        if not stored_object.is_file():
+            return False
+        output.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(stored_object, output)
+
+    return True
+
+
+def record_build(target, key, outputs, cache_dir=BUILD_CACHE_DIR):
+    """
+    Records a successful build and stores a copy of its outputs.
+
+    Args:
+        target (str): Name of the build target.
+        key (str): Cache key computed with build_key.
+        outputs (list): Paths of the target's output files.
+        cache_dir (str, optional): Build cache directory. Defaults to BUILD_CACHE_DIR.
+
+    Raises:
+        FileNotFoundError: If an output file was not produced.
+    """
+    recorded_outputs = {}
+    for output in outputs:
+        output = Path(output).resolve()
+        if not output.is_file():
+            raise FileNotFoundError(f"Output of target '{target}' not found: {output}")
+
+        digest = _sha256_file(output)
+        stored_object = _object_path(digest, cache_dir)
+        if not stored_object.is_file():
+            stored_object.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(output, stored_object)
+        recorded_outputs[str(output)] = digest
+
+    _write_json(
+        _manifest_path(target, cache_dir), {"key": key, "outputs": recorded_outputs}
+    )
+
+
+def invalidate(target=None, cache_dir=BUILD_CACHE_DIR):
+    """
+    Invalidates the cached build of a target, forcing it to run again.
+
+    Args:
+        target (str, optional): Name of the target. If None, all targets are invalidated.
+        cache_dir (str, optional): Build cache directory. Defaults to BUILD_CACHE_DIR.
+
+    Returns:
+        int: Number of invalidated targets.
+    """
+    manifests_dir = Path(cache_dir) / "manifests"
+    if target is not None:
+        manifests = [_manifest_path(target, cache_dir)]
+    else:
+        manifests = list(manifests_dir.glob("*.json"))
+
+    removed = 0
+    for manifest in manifests:
+        if manifest.is_file():
+            manifest.unlink()
+            removed += 1
+    return removed
+
+
+def prune_objects(cache_dir=BUILD_CACHE_DIR):
+    """
+    Removes stored outputs that are no longer referenced by any target.
+
+    Args:
+        cache_dir (str, optional): Build cache directory. Defaults to BUILD_CACHE_DIR.
+
+    Returns:
+        int: Number of removed objects.
+    """
+    referenced = set()
+    for manifest in (Path(cache_dir) / "manifests").glob("*.json"):
+        referenced.update(_read_json(manifest, {"outputs": {}})["outputs"].values())
+
+    removed = 0
+    for stored_object in (Path(cache_dir) / "objects").glob("*/*"):
+        if stored_object.name not in referenced:
+            stored_object.unlink()
+            removed += 1
+    return removed
@@ -4,6 +4,7 @@ This module contains basic configuration settings for the project,
 including environment variables.
 """
 
+import os
 from dotenv import dotenv_values
 from pathlib import Path
 
@@ -12,9 +13,21 @@ PROJECT_NAME = "mz_raport"
 VERSION = "0.1.0"
 AUTHOR = "Hubert Szewczyk"
 
+# Path variables that can be overridden by the process environment
+ENV_OVERRIDES = [
+    "WORKSPACE_PATH",
+    "DATA_DIR",
+    "RESULTS_DIR",
+    "PLOTS_DIR",
+    "BUILD_CACHE_DIR",
+]
+
 # Load environment variables from the .env file
 env_vars = dotenv_values()  # Load variables from the .env file
 
+# Variables set in the environment take precedence (e.g. a synthetic benchmark workspace)
+env_vars.update({key: os.environ[key] for key in ENV_OVERRIDES if os.environ.get(key)})
+
 # Get the workspace path from the environment variables
 WORKSPACE_PATH = Path(env_vars.get("WORKSPACE_PATH"))  # Fetch WORKSPACE_PATH from .env
 
@@ -24,3 +37,8 @@ if not WORKSPACE_PATH:
 DATA_DIR = Path(env_vars["DATA_DIR"])
 RESULTS_DIR = Path(env_vars["RESULTS_DIR"])
 PLOTS_DIR = Path(env_vars["PLOTS_DIR"])
+
+# Directory of the build cache used to skip unchanged analyses
+BUILD_CACHE_DIR = Path(
+    env_vars.get("BUILD_CACHE_DIR") or WORKSPACE_PATH / ".build_cache"
+)
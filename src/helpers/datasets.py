@@ -0,0 +1,239 @@
+"""Shared in-process registry of loaded datasets.
+
+Datasets are loaded by name through registered loaders and memoized, so several
+analyses running in one process parse each source only once. Cached datasets are
+evicted in least recently used order when their total size exceeds a memory budget.
+"""
+
+import threading
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+import pandas as pd
+import geopandas as gpd
+from .config import DATA_DIR
+from .utils import read_csv
+from .icd_cube import load_icd_cube
+from .geometry_store import load_geometries
+from .spatial_assign import load_teryt_lookup
+from .schema import apply_schema
+from .measure_store import load_measure_store
+
+# Total size of the cached datasets above which the least recently used are evicted
+DATASET_MEMORY_BUDGET = 4 * 1024**3
+
+DATASET_LOADERS = {}
+DATASET_SOURCES = {}
+
+_datasets = OrderedDict()
+_dataset_sizes = {}
+_registry_lock = threading.Lock()
+_load_locks = defaultdict(threading.Lock)
+_memory_budget = DATASET_MEMORY_BUDGET
+
+
+def register_dataset(name, loader, sources=None):
+    """
+    Registers a named dataset loader.
+
+    Args:
+        name (str): Name of the dataset (e.g. "swiad_woj").
+        loader (callable): Function without arguments returning the dataset.
+        sources (list, optional): Paths of the files the dataset is loaded from.
+    """
+    DATASET_LOADERS[name] = loader
+    DATASET_SOURCES[name] = [Path(path) for path in sources or []]
+    clear_datasets(name)
+
+
+def dataset_sources(name):
+    """
+    Returns the source files of a registered dataset.
+
+    Args:
+        name (str): Name of the dataset.
+
+    Returns:
+        list: Paths of the files the dataset is loaded from.
+
+    Raises:
+        KeyError: If no loader is registered under `name`.
+    """
+    if name not in DATASET_LOADERS:
+        raise KeyError(
+            f"Unknown dataset '{name}'. Registered datasets: {', '.join(DATASET_LOADERS)}."
+        )
+    return list(DATASET_SOURCES[name])
+
+
+def set_memory_budget(max_bytes):
+    """
+    Sets the memory budget of the registry and evicts datasets that no longer fit.
+
+    Args:
+        max_bytes (int): Maximum total size of the cached datasets in bytes.
+    """
+    global _memory_budget
+    with _registry_lock:
+        _memory_budget = max_bytes
+        _evict()
+
+
+def _dataset_size(data):
+    """Returns the approximate memory size of a dataset in bytes."""
+    if isinstance(data, dict):
+        # Measure stores are memory-mapped, only their dimension values are held
+        return sum(
+            int(values.memory_usage(deep=True))
+            for values in data["dimensions"].values()
+        )
+    size = int(data.memory_usage(deep=True).sum())
+    if isinstance(data, gpd.GeoDataFrame):
+        # Geometry objects are opaque to memory_usage, count their coordinates instead
+        size += sum(len(geom.wkb) for geom in data.geometry if geom is not None)
+    return size
+
+
+def _evict():
+    """Evicts least recently used datasets until the cache fits in the budget."""
+    # The most recently used dataset is always kept, even if it exceeds the budget
+    while len(_datasets) > 1 and sum(_dataset_sizes.values()) > _memory_budget:
+        name, _ = _datasets.popitem(last=False)
+        del _dataset_sizes[name]
+
+
+def copy_on_write_enabled():
+    """
+    Checks whether pandas Copy-on-Write is active.
+
+    Copy-on-Write is always enabled from pandas 3, and opt-in before that.
+
+    Returns:
+        bool: True if shallow copies never share modifications with the original.
+    """
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return True
+    return bool(pd.get_option("mode.copy_on_write"))
+
+
+def get_dataset(name, copy=True):
+    """
+    Returns a registered dataset, loading it on first use.
+
+    Args:
+        name (str): Name of the dataset.
+        copy (bool, optional): If True, returns a deep copy that can be modified freely.
+            If False, returns a shallow copy sharing the cached data: adding, replacing
+            or dropping columns is safe, but values must not be modified in place.
+            Without Copy-on-Write (pandas < 3 without the mode.copy_on_write option),
+            a deep copy is returned instead. Defaults to True.
+
+    Returns:
+        pd.DataFrame or gpd.GeoDataFrame or dict: The dataset, or the measure store
+            of a "_measures" dataset (see measure_store).
+
+    Raises:
+        KeyError: If no loader is registered under `name`.
+    """
+    if name not in DATASET_LOADERS:
+        raise KeyError(
+            f"Unknown dataset '{name}'. Registered datasets: {', '.join(DATASET_LOADERS)}."
+        )
+
+    # Load each dataset once, even if several threads request it at the same time
+    with _registry_lock:
+        load_lock = _load_locks[name]
+    with load_lock:
+        with _registry_lock:
+            data = _datasets.get(name)
+            if data is not None:
+                _datasets.move_to_end(name)
+
+        if data is None:
+            data = DATASET_LOADERS[name]()
+            with _registry_lock:
+                _datasets[name] = data
+                _dataset_sizes[name] = _dataset_size(data)
+                _evict()
+
+    if isinstance(data, dict):
+        # Measure stores are read-only and shared
+        return data
+    # Shallow copies are only isolated from the cache under Copy-on-Write
+    return data.copy(deep=copy or not copy_on_write_enabled())
+
+
+def clear_datasets(name=None):
+    """
+    Removes datasets from the registry cache.
+
+    Args:
+        name (str, optional): Dataset to remove. If None, all datasets are removed.
+    """
+    with _registry_lock:
+        if name is None:
+            _datasets.clear()
+            _dataset_sizes.clear()
+        elif name in _datasets:
+            del _datasets[name]
+            del _dataset_sizes[name]
+
+
+def cached_datasets():
+    """
+    Returns the names and sizes of the cached datasets.
+
+    Returns:
+        dict: Mapping of dataset name to its size in bytes, least recently used first.
+    """
+    with _registry_lock:
+        return {name: _dataset_sizes[name] for name in _datasets}
+
+
+def _register_csv(name, file_path):
+    """Registers a dataset read from a single CSV file, with categorical dimension columns."""
+    register_dataset(
+        name, lambda: apply_schema(read_csv(file_path)), sources=[file_path]
+    )
+
+
+def _register_geojson(name, file_path):
+    """Registers a GeoDataFrame read from a single GeoJSON file through the geometry store."""
+    register_dataset(name, lambda: load_geometries(file_path), sources=[file_path])
+
+
+_register_csv(
+    "swiad_woj", DATA_DIR / "processed" / "swiad_woj_poradnia_okulistyczna.csv"
+)
+_register_csv(
+    "swiad_pow", DATA_DIR / "processed" / "swiad_pow_poradnia_okulistyczna.csv"
+)
+_register_csv(
+    "icd10",
+    DATA_DIR / "processed" / "problemy_zdrowotne_icd10_poradnia_okulistyczna.csv",
+)
+_register_csv(
+    "statystyki_porad",
+    DATA_DIR / "processed" / "statystyki_porad_poradnia_okulistyczna.csv",
+)
+register_dataset(
+    "icd10_cube",
+    lambda: load_icd_cube(dataset_sources("icd10")[0]),
+    sources=dataset_sources("icd10"),
+)
+_register_csv("demografia_woj", DATA_DIR / "raw" / "demografia_wojewodztwa.csv")
+_register_geojson("wojewodztwa_geo", Path(DATA_DIR / "wojewodztwa.geojson"))
+_register_geojson("powiaty_geo", Path(DATA_DIR / "powiaty_mapped.geojson"))
+register_dataset(
+    "teryt_powiaty",
+    lambda: load_teryt_lookup(
+        DATA_DIR / "processed" / "teryt_powiaty.csv",
+        *dataset_sources("powiaty_geo"),
+        *dataset_sources("wojewodztwa_geo"),
+    ),
+    sources=dataset_sources("powiaty_geo") + dataset_sources("wojewodztwa_geo"),
+)
+register_dataset(
+    "swiad_woj_measures",
+    lambda: load_measure_store(dataset_sources("swiad_woj")[0]),
+    sources=dataset_sources("swiad_woj"),
+)
@@ -0,0 +1,298 @@
+"""Binary store of preprocessed boundary files.
+
+Boundary files are parsed from GeoJSON once and kept as GeoParquet (geometries as
+WKB) in the columnar cache next to the source file, together with normalized name
+keys ready to join with the tabular data. The stored copy is rebuilt when the size
+or modification time of the source file changes.
+
+Simplified levels of detail (LOD) of the boundaries are stored the same way, one per
+simplification tolerance, and picked from the size and resolution of the figure.
+Tolerances are in metres: boundaries in another CRS (e.g. EPSG:4326) are simplified
+in the UTM zone estimated from their bounds and reprojected back. Levels of detail
+are built with shapely.coverage_simplify (shapely >= 2.1 with GEOS >= 3.12), which
+simplifies every shared edge once so no gaps open between neighbours.
+"""
+
+import shapely
+import geopandas as gpd
+from pyproj import Transformer
+from .utils import (
+    PARQUET_AVAILABLE,
+    cache_artifact_path,
+    touch_cache_artifact,
+    write_cache_artifact,
+)
+
+# Column with the normalized region name (lowercased JPT_NAZWA_)
+GEOMETRY_NAME_KEY = "name_key"
+
+# Version of the preprocessing, part of the cache key of the stored geometries
+GEOMETRY_STORE_VERSION = 1
+
+# Simplification tolerances of the levels of detail, in units of the CRS (metres)
+GEOMETRY_LOD_TOLERANCES = (0, 25, 50, 100, 250, 500, 1000, 2500)
+
+# Largest simplification error allowed when rendering, as a fraction of a pixel
+GEOMETRY_LOD_PIXEL_FRACTION = 0.5
+
+# Attribute holding the source file of geometries loaded from the store
+GEOMETRY_SOURCE_ATTR = "geometry_source"
+
+
+def normalize_names(names):
+    """
+    Normalizes region names for joining: lowercased, without surrounding whitespace.
+
+    Args:
+        names (pd.Series): Region names.
+
+    Returns:
+        pd.Series: Normalized names.
+    """
+    return names.str.lower().str.strip()
+
+
+def preprocess_geometries(gdf):
+    """
+    Adds the normalized name keys to a boundary GeoDataFrame.
+
+    Args:
+        gdf (gpd.GeoDataFrame): Boundaries with a "JPT_NAZWA_" and optionally a
+            "full_name" column.
+
+    Returns:
+        gpd.GeoDataFrame: The boundaries with a GEOMETRY_NAME_KEY column and a
+            normalized "full_name" column.
+    """
+    gdf = gdf.copy()
+    if "JPT_NAZWA_" in gdf.columns:
+        gdf[GEOMETRY_NAME_KEY] = normalize_names(gdf["JPT_NAZWA_"])
+    if "full_name" in gdf.columns:
+        gdf["full_name"] = normalize_names(gdf["full_name"])
+    return gdf
+
+
+def simplify_geometries(gdf, tolerance):
+    """
+    Simplifies boundaries without opening gaps or overlaps between neighbours.
+
+    Shared edges are simplified once for the whole coverage with
+    shapely.coverage_simplify. Simplifying every geometry on its own would leave
+    slivers between neighbours, so there is no fallback.
+
+    Args:
+        gdf (gpd.GeoDataFrame): Boundaries to simplify.
+        tolerance (float): Simplification tolerance in metres, applied in the CRS
+            returned by metric_crs. Zero returns the boundaries unchanged.
+
+    Returns:
+        gpd.GeoDataFrame: The simplified boundaries, in the CRS of `gdf`.
+
+    Raises:
+        ValueError: If the boundaries have no CRS, or if coverage simplification is
+            not available (shapely < 2.1 or GEOS < 3.12) or fails for the boundaries.
+    """
+    if tolerance <= 0:
+        return gdf
+
+    crs = metric_crs(gdf)
+    if crs is None:
+        raise ValueError("Simplifying boundaries needs a CRS to measure the tolerance.")
+
+    if not hasattr(shapely, "coverage_simplify"):
+        raise ValueError(
+            "Simplified boundaries need shapely.coverage_simplify "
+            f"(shapely >= 2.1 with GEOS >= 3.12), found shapely {shapely.__version__}."
+        )
+    # Simplify in metres, reprojecting boundaries in another CRS there and back
+    geometries = gdf.geometry if crs == gdf.crs else gdf.geometry.to_crs(crs)
+    try:
+        simplified = shapely.coverage_simplify(geometries.to_numpy(), tolerance)
+    except Exception as e:
+        raise ValueError(f"Failed to simplify the boundaries as a coverage: {e}")
+
+    gdf = gdf.copy()
+    gdf[gdf.geometry.name] = gpd.GeoSeries(simplified, index=gdf.index, crs=crs).to_crs(
+        gdf.crs
+    )
+    return gdf
+
+
+def is_metric_crs(crs):
+    """
+    Checks whether a CRS is projected with coordinates in metres.
+
+    Args:
+        crs (pyproj.CRS or None): The coordinate reference system.
+
+    Returns:
+        bool: True for a projected CRS in metres, False otherwise or if it is unknown.
+    """
+    if crs is None or not crs.is_projected:
+        return False
+    return all(axis.unit_name in ("metre", "meter") for axis in crs.axis_info)
+
+
+def metric_crs(gdf):
+    """
+    Returns the CRS in metres in which boundaries are simplified.
+
+    Args:
+        gdf (gpd.GeoDataFrame): The boundaries.
+
+    Returns:
+        pyproj.CRS or None: The CRS of `gdf` if it is projected in metres, otherwise
+            the UTM zone estimated from its bounds. None if `gdf` has no CRS.
+    """
+    if gdf.crs is None:
+        return None
+    if is_metric_crs(gdf.crs):
+        return gdf.crs
+    return gdf.estimate_utm_crs()
+
+
+def select_lod(bounds, figsize, dpi, tolerances=GEOMETRY_LOD_TOLERANCES, crs=None):
+    """
+    Selects the simplification tolerance for a map rendered at a given size.
+
+    The largest tolerance whose error stays below GEOMETRY_LOD_PIXEL_FRACTION of a
+    pixel is selected, so the simplification is not visible in the output.
+
+    Args:
+        bounds (tuple): Bounds of the map (minx, miny, maxx, maxy) in metres.
+        figsize (tuple): Size of the figure in inches (width, height).
+        dpi (int): Resolution of the output in dots per inch.
+        tolerances (tuple, optional): Available tolerances in metres.
+            Defaults to GEOMETRY_LOD_TOLERANCES.
+        crs (pyproj.CRS, optional): CRS of the bounds, checked to be in metres.
+
+    Returns:
+        float: The selected tolerance.
+
+    Raises:
+        ValueError: If `crs` is given and is not a projected CRS in metres.
+    """
+    if crs is not None and not is_metric_crs(crs):
+        raise ValueError(
+            f"Levels of detail need a projected CRS in metres, got {crs.to_string()}."
+        )
+    minx, miny, maxx, maxy = bounds
+    # The map is scaled to fit the figure, the tighter axis sets the pixel size
+    pixel_size = max(
+        (maxx - minx) / (figsize[0] * dpi), (maxy - miny) / (figsize[1] * dpi)
+    )
+    max_tolerance = pixel_size * GEOMETRY_LOD_PIXEL_FRACTION
+    return max(
+        (tolerance for tolerance in tolerances if tolerance <= max_tolerance), default=0
+    )
+
+
+def load_geometries(file_path, use_cache=True, cache_dir=None, tolerance=0):
+    """
+    Loads a boundary file through the binary geometry store.
+
+    Args:
+        file_path (str): Path of the boundary file (e.g. GeoJSON).
+        use_cache (bool, optional): Whether to read and write the stored copy.
+            The store is skipped when pyarrow is not installed. Defaults to True.
+        cache_dir (str, optional): Explicit cache directory. Defaults to the `.cache`
+            folder next to the source file.
+        tolerance (float, optional): Simplification tolerance of the level of detail.
+            Defaults to 0 (full resolution).
+
+    Returns:
+        gpd.GeoDataFrame: The preprocessed boundaries.
+    """
+    use_cache = use_cache and PARQUET_AVAILABLE
+    if use_cache:
+        store_path = cache_artifact_path(
+            file_path,
+            {"geometry_store": GEOMETRY_STORE_VERSION, "tolerance": tolerance},
+            cache_dir,
+        )
+        if store_path.is_file():
+            try:
+                gdf = gpd.read_parquet(store_path)
+                touch_cache_artifact(store_path)
+                gdf.attrs[GEOMETRY_SOURCE_ATTR] = str(file_path)
+                return gdf
+            except Exception as e:
+                print(f"Ignoring unreadable geometry store {store_path.name}: {e}")
+
+    # Parse the source file, or simplify the full resolution level, and store the copy
+    if tolerance > 0:
+        gdf = load_geometries(file_path, use_cache, cache_dir)
+        gdf = simplify_geometries(gdf, tolerance)
+    else:
+        gdf = preprocess_geometries(gpd.read_file(file_path))
+    gdf.attrs.pop(GEOMETRY_SOURCE_ATTR, None)
+    if use_cache:
+        write_cache_artifact(gdf, store_path)
+    gdf.attrs[GEOMETRY_SOURCE_ATTR] = str(file_path)
+    return gdf
+
+
+def lod_geometries(gdf, figsize, dpi):
+    """
+    Returns boundaries simplified for a map rendered at a given size and resolution.
+
+    Boundaries loaded from the store are replaced by the stored level of detail,
+    matched on the index and checked against the name keys, so sorted or filtered
+    boundaries get their own geometries. Boundaries that no longer match the store
+    (e.g. merged, renamed or reprojected) are simplified in memory. Boundaries
+    without a CRS are returned at full resolution, as the tolerances are in metres.
+
+    Args:
+        gdf (gpd.GeoDataFrame): Full resolution boundaries.
+        figsize (tuple): Size of the figure in inches (width, height).
+        dpi (int): Resolution of the output in dots per inch.
+
+    Returns:
+        gpd.GeoDataFrame: The boundaries with simplified geometries.
+    """
+    crs = metric_crs(gdf)
+    if crs is None:
+        print("Boundaries without a CRS are drawn at full resolution.")
+        return gdf
+
+    # Measure the extent of the map in metres
+    bounds = gdf.total_bounds
+    if crs != gdf.crs:
+        bounds = Transformer.from_crs(gdf.crs, crs, always_xy=True).transform_bounds(
+            *bounds
+        )
+    tolerance = select_lod(bounds, figsize, dpi, crs=crs)
+    if tolerance <= 0:
+        return gdf
+
+    source = gdf.attrs.get(GEOMETRY_SOURCE_ATTR)
+    if source is None:
+        return simplify_geometries(gdf, tolerance)
+
+    simplified = load_geometries(source, tolerance=tolerance)
+    if not _matches_store(gdf, simplified):
+        return simplify_geometries(gdf, tolerance)
+    gdf = gdf.copy()
+    gdf[gdf.geometry.name] = gpd.GeoSeries(
+        simplified.geometry.loc[gdf.index].to_numpy(), index=gdf.index, crs=gdf.crs
+    )
+    return gdf
+
+
+def _matches_store(gdf, stored):
+    """
+    Checks whether boundaries are rows of a stored level of detail, by index and name.
+
+    Args:
+        gdf (gpd.GeoDataFrame): Boundaries derived from the stored boundaries.
+        stored (gpd.GeoDataFrame): A stored level of detail of the same source.
+
+    Returns:
+        bool: True if every row of `gdf` has the index and name key of a stored row.
+    """
+    if gdf.crs != stored.crs or GEOMETRY_NAME_KEY not in gdf.columns:
+        return False
+    if not gdf.index.is_unique or not gdf.index.isin(stored.index).all():
+        return False
+    names = stored[GEOMETRY_NAME_KEY].loc[gdf.index].to_numpy()
+    return bool((names == gdf[GEOMETRY_NAME_KEY].to_numpy()).all())
@@ -0,0 +1,330 @@
+"""Streaming top-N (heavy hitters) over chunked data.
+
+The most frequent keys are found in one pass over the chunks, without holding the
+data or all of its groups in memory. Three summaries are available:
+
+- "exact": sums of every key. Exact, but its memory grows with the number of keys.
+- "space_saving": Space-Saving summary with a fixed number of counters. Every key
+  whose total exceeds the smallest counter is guaranteed to be monitored.
+- "count_min": Count-Min sketch with a fixed-size candidate set. Estimates never
+  underestimate the true totals.
+
+The approximate summaries are followed by a verification pass that computes the
+exact totals of the candidates and checks that they are guaranteed to contain the
+true top-N. If they are not, the top-N is computed with the exact summary instead.
+"""
+
+import numpy as np
+import pandas as pd
+from .utils import stream_filtered_files
+
+HEAVY_HITTER_METHODS = ("exact", "space_saving", "count_min")
+
+# Size of the approximate summaries relative to the requested number of keys
+HEAVY_HITTER_CAPACITY_FACTOR = 20
+
+# Dimensions of the Count-Min sketch
+COUNT_MIN_WIDTH = 2**16
+COUNT_MIN_DEPTH = 4
+
+
+def _chunk_sums(chunk, key_columns, value_column):
+    """Returns the sums of `value_column` (or row counts) of a chunk by key."""
+    if value_column is None:
+        return chunk.groupby(key_columns).size()
+    return chunk.groupby(key_columns)[value_column].sum()
+
+
+def _key_hashes(index):
+    """Hashes the keys of an index to 64-bit integers."""
+    return pd.util.hash_pandas_object(
+        index.to_frame(index=False), index=False
+    ).to_numpy()
+
+
+def _count_min_positions(hashes, width, depth, seed):
+    """
+    Returns the sketch column of every key in every row of a Count-Min sketch.
+
+    Rows use independent multiply-shift hash functions, so the width must be a power
+    of two.
+    """
+    multipliers = np.random.default_rng(seed).integers(
+        1, 2**63, size=depth, dtype=np.uint64
+    ) * np.uint64(2) + np.uint64(1)
+    shift = np.uint64(64 - int(np.log2(width)))
+    with np.errstate(over="ignore"):
+        return (hashes[None, :] * multipliers[:, None]) >> shift
+
+
+def new_summary(
+    method="exact", capacity=None, width=COUNT_MIN_WIDTH, depth=COUNT_MIN_DEPTH, seed=0
+):
+    """
+    Creates an empty heavy-hitters summary.
+
+    Args:
+        method (str, optional): One of HEAVY_HITTER_METHODS. Defaults to "exact".
+        capacity (int, optional): Number of counters of "space_saving" or candidates of
+            "count_min". Required by the approximate methods.
+        width (int, optional): Width of the Count-Min sketch, a power of two.
+            Defaults to COUNT_MIN_WIDTH.
+        depth (int, optional): Number of rows of the Count-Min sketch.
+            Defaults to COUNT_MIN_DEPTH.
+        seed (int, optional): Seed of the Count-Min hash functions. Defaults to 0.
+
+    Returns:
+        dict: The summary, to be updated with update_summary.
+
+    Raises:
+        ValueError: If the method or the sketch dimensions are invalid.
+    """
+    if method not in HEAVY_HITTER_METHODS:
+        raise ValueError(
+            f"Unsupported method '{method}'. Use one of: {', '.join(HEAVY_HITTER_METHODS)}."
+        )
+    if method != "exact" and (capacity is None or capacity < 1):
+        raise ValueError(f"Method '{method}' requires a positive capacity.")
+
+    summary = {
+        "method": method,
+        "capacity": capacity,
+        "counts": None,
+        "errors": None,
+        # Upper bound of the total of any key that is not monitored
+        "threshold": 0,
+        # Total of all the summarized values
+        "total": 0,
+    }
+    if method == "count_min":
+        if width < 2 or width & (width - 1):
+            raise ValueError("Count-Min width must be a power of two.")
+        summary.update(
+            sketch=np.zeros((depth, width), dtype=np.float64),
+            width=width,
+            depth=depth,
+            seed=seed,
+        )
+    return summary
+
+
+def update_summary(summary, chunk_sums):
+    """
+    Adds the per-key sums of a chunk to a summary.
+
+    Args:
+        summary (dict): Summary created with new_summary. Updated in place.
+        chunk_sums (pd.Series): Sums of one chunk indexed by key.
+
+    Returns:
+        dict: The updated summary.
+    """
+    if chunk_sums.empty:
+        return summary
+
+    counts = summary["counts"]
+    method = summary["method"]
+    summary["total"] += chunk_sums.sum()
+
+    if method == "exact":
+        summary["counts"] = (
+            chunk_sums if counts is None else counts.add(chunk_sums, fill_value=0)
+        )
+        return summary
+
+    if method == "space_saving":
+        # Merge with the exact chunk sums: keys new to the summary may have been
+        # evicted before, so they inherit the smallest counter as their error
+        if counts is None:
+            counts = chunk_sums.iloc[:0]
+            errors = chunk_sums.iloc[:0]
+        else:
+            errors = summary["errors"]
+        minimum = counts.min() if len(counts) >= summary["capacity"] else 0
+        new_keys = chunk_sums.index.difference(counts.index)
+        counts = counts.add(chunk_sums, fill_value=0)
+        errors = errors.reindex(counts.index, fill_value=0)
+        counts.loc[new_keys] += minimum
+        errors.loc[new_keys] += minimum
+    else:
+        # Add the chunk to the sketch and re-estimate the old and new candidates
+        positions = _count_min_positions(
+            _key_hashes(chunk_sums.index),
+            summary["width"],
+            summary["depth"],
+            summary["seed"],
+        )
+        for row in range(summary["depth"]):
+            np.add.at(summary["sketch"][row], positions[row], chunk_sums.to_numpy())
+
+        candidates = (
+            chunk_sums.index
+            if counts is None
+            else counts.index.union(chunk_sums.index, sort=False)
+        )
+        positions = _count_min_positions(
+            _key_hashes(candidates), summary["width"], summary["depth"], summary["seed"]
+        )
+        estimates = summary["sketch"][np.arange(summary["depth"])[:, None], positions]
+        counts = pd.Series(estimates.min(axis=0), index=candidates)
+        # Collisions overestimate a key by at most e / width of the total
+        errors = pd.Series(np.e / summary["width"] * summary["total"], index=candidates)
+
+    # Keep the largest counters, the dropped ones bound the totals of unmonitored keys
+    if len(counts) > summary["capacity"]:
+        order = np.argsort(-counts.to_numpy(), kind="stable")
+        summary["threshold"] = max(
+            summary["threshold"], counts.iloc[order[summary["capacity"]]]
+        )
+        keep = order[: summary["capacity"]]
+        counts = counts.iloc[keep]
+        errors = errors.iloc[keep]
+
+    if method == "space_saving" and len(counts) >= summary["capacity"]:
+        summary["threshold"] = max(summary["threshold"], counts.min())
+
+    summary["counts"] = counts
+    summary["errors"] = errors
+    return summary
+
+
+def summary_top_n(summary, n=10):
+    """
+    Returns the top-N keys of a summary with their estimated totals.
+
+    Args:
+        summary (dict): Summary updated with update_summary.
+        n (int, optional): Number of keys to return. Defaults to 10.
+
+    Returns:
+        pd.DataFrame: Keys, estimated "Count" and its maximum overestimation "Error",
+            sorted by "Count" in descending order.
+    """
+    counts = summary["counts"]
+    if counts is None:
+        return pd.DataFrame(columns=["Count", "Error"])
+
+    errors = summary["errors"]
+    if errors is None:
+        errors = pd.Series(0, index=counts.index)
+
+    top = counts.nlargest(n)
+    return pd.DataFrame({"Count": top, "Error": errors.loc[top.index]})
+
+
+def stream_top_n(
+    chunk_factory,
+    key_columns,
+    value_column=None,
+    n=10,
+    method="exact",
+    capacity=None,
+    verify=True,
+    **summary_kwargs,
+):
+    """
+    Finds the keys with the largest totals in a stream of chunks.
+
+    Args:
+        chunk_factory (callable): Function without arguments returning an iterable of
+            DataFrame chunks. It is called once more for the verification pass, and
+            again for an exact pass if the verification fails.
+        key_columns (list): Columns identifying a key.
+        value_column (str, optional): Column to sum. If None, rows are counted.
+        n (int, optional): Number of keys to return. Defaults to 10.
+        method (str, optional): One of HEAVY_HITTER_METHODS. Defaults to "exact".
+        capacity (int, optional): Size of the approximate summaries. Defaults to
+            HEAVY_HITTER_CAPACITY_FACTOR times `n`.
+        verify (bool, optional): If True, approximate candidates are re-counted
+            exactly in a second pass, and the exact summary is used if they are not
+            guaranteed to contain the top-N. Defaults to True.
+        **summary_kwargs: Additional arguments passed to new_summary.
+
+    Returns:
+        pd.DataFrame: The key columns and the totals (`value_column`, or "Count" if
+            rows are counted), sorted in descending order. Without verification, the
+            totals of the approximate methods are estimates.
+    """
+    key_columns = list(key_columns)
+    total_column = value_column or "Count"
+    if method != "exact" and capacity is None:
+        capacity = HEAVY_HITTER_CAPACITY_FACTOR * n
+
+    # First pass: summarize the chunk sums
+    summary = new_summary(method, capacity=capacity, **summary_kwargs)
+    dtype = None
+    for chunk in chunk_factory():
+        chunk_sums = _chunk_sums(chunk, key_columns, value_column)
+        dtype = dtype or chunk_sums.dtype
+        update_summary(summary, chunk_sums)
+
+    top = summary_top_n(summary, n=capacity or n)
+    if method == "exact" or not verify:
+        top = top["Count"].nlargest(n)
+    elif top.empty:
+        top = top["Count"]
+    else:
+        # Second pass: exact totals of the candidates only
+        candidates = top.index
+        exact = None
+        for chunk in chunk_factory():
+            keys = chunk.set_index(key_columns).index
+            chunk = chunk[keys.isin(candidates)]
+            chunk_sums = _chunk_sums(chunk, key_columns, value_column)
+            exact = chunk_sums if exact is None else exact.add(chunk_sums, fill_value=0)
+        top = exact.nlargest(n)
+
+        # The top-N is exact if no unmonitored key can exceed its smallest total
+        if summary["threshold"] > 0 and (
+            len(top) < n or top.iloc[-1] < summary["threshold"]
+        ):
+            print(
+                f"Top-{n} is not guaranteed by the {method} summary: an unmonitored "
+                f"key may reach {summary['threshold']}. Falling back to exact totals."
+            )
+            return stream_top_n(
+                chunk_factory, key_columns, value_column, n=n, method="exact"
+            )
+
+    # Exact totals keep the type of the summed column
+    if (method == "exact" or verify) and dtype is not None:
+        top = top.astype(dtype)
+    return top.rename(total_column).reset_index()
+
+
+def top_n_from_files(
+    file_paths,
+    key_columns,
+    value_column=None,
+    n=10,
+    filter_dict=None,
+    chunksize=500000,
+    method="space_saving",
+    **kwargs,
+):
+    """
+    Finds the keys with the largest totals in raw files read chunk by chunk.
+
+    Args:
+        file_paths (list): List of file paths to be read.
+        key_columns (list): Columns identifying a key.
+        value_column (str, optional): Column to sum. If None, rows are counted.
+        n (int, optional): Number of keys to return. Defaults to 10.
+        filter_dict (dict, optional): Filter conditions, as accepted by filter_dataframe.
+        chunksize (int, optional): Number of CSV rows read at a time. Defaults to 500000.
+        method (str, optional): One of HEAVY_HITTER_METHODS. Defaults to "space_saving".
+        **kwargs: Additional arguments passed to stream_top_n.
+
+    Returns:
+        pd.DataFrame: The key columns and the totals, sorted in descending order.
+    """
+    columns = list(key_columns) + ([value_column] if value_column else [])
+
+    def chunk_factory():
+        return stream_filtered_files(
+            file_paths, filter_dict or {}, columns=columns, chunksize=chunksize
+        )
+
+    return stream_top_n(
+        chunk_factory, key_columns, value_column, n=n, method=method, **kwargs
+    )
@@ -0,0 +1,329 @@
+"""Precomputed ICD-10 hierarchy cube.
+
+The cube holds the number of consultations for every ICD-10 level, code and name by
+year and voivodeship. It is built once from the ICD-10 data and persisted next to the
+source file, so top-N, share-by-year and per-region questions are answered from the
+aggregated rows instead of regrouping the full frame.
+"""
+
+import pandas as pd
+from .config import DATA_DIR
+from .utils import (
+    PARQUET_AVAILABLE,
+    cache_artifact_path,
+    get_files_paths,
+    load_filtered_files,
+    read_csv,
+    touch_cache_artifact,
+    write_cache_artifact,
+)
+from .heavy_hitters import top_n_from_files
+from .schema import label_key
+from .timeseries import share_of_total, time_series_matrix
+
+ICD_LEVELS = (1, 2, 3)
+ICD_MEASURE = "Liczba porad AOS"
+CUBE_DIMENSIONS = ["Poziom", "Kod", "Nazwa", "Rok", "Województwo"]
+
+# Raw ICD-10 files and the speciality selected from them by the streaming queries
+ICD_RAW_DATASET = "problemy_zdrowotne_icd10"
+ICD_SPECIALITY = "poradnia okulistyczna"
+
+
+def icd_columns(level):
+    """
+    Returns the names of the code and name columns of an ICD-10 level.
+
+    Args:
+        level (int): ICD-10 classification level (1, 2 or 3).
+
+    Returns:
+        tuple: The code column name and the name column name.
+    """
+    return f"Kod ICD-10 poziom {level}.", f"Nazwa ICD-10 poziom {level}."
+
+
+def build_icd_cube(df, levels=ICD_LEVELS):
+    """
+    Builds the ICD-10 cube from the ICD-10 consultation data.
+
+    The data is summed once at the finest grain (all levels, year and voivodeship)
+    and every level is rolled up from that partial aggregate.
+
+    Args:
+        df (pd.DataFrame): ICD-10 data with the code and name columns of `levels`,
+            "Rok", "Województwo" and "Liczba porad AOS".
+        levels (tuple, optional): ICD-10 levels to include. Defaults to ICD_LEVELS.
+
+    Returns:
+        pd.DataFrame: Long table with the CUBE_DIMENSIONS columns and the summed
+            "Liczba porad AOS".
+
+    Raises:
+        ValueError: If required columns are missing.
+    """
+    level_columns = [col for level in levels for col in icd_columns(level)]
+    required_columns = level_columns + ["Rok", "Województwo", ICD_MEASURE]
+    missing_columns = [col for col in required_columns if col not in df.columns]
+    if missing_columns:
+        raise ValueError(f"Missing ICD-10 columns: {', '.join(missing_columns)}")
+
+    # Sum once at the finest grain shared by all levels
+    partial = (
+        df.groupby(level_columns + ["Rok", "Województwo"], dropna=False, observed=True)[
+            ICD_MEASURE
+        ]
+        .sum()
+        .reset_index()
+    )
+
+    # Roll every level up from the partial aggregate
+    cubes = []
+    for level in levels:
+        code_col, name_col = icd_columns(level)
+        level_cube = (
+            partial.groupby([code_col, name_col, "Rok", "Województwo"], observed=True)[
+                ICD_MEASURE
+            ]
+            .sum()
+            .reset_index()
+            .rename(columns={code_col: "Kod", name_col: "Nazwa"})
+        )
+        level_cube.insert(0, "Poziom", level)
+        cubes.append(level_cube)
+    cube = pd.concat(cubes, ignore_index=True)
+
+    # Compact dimension columns keep the cube small and the filters fast
+    cube["Poziom"] = cube["Poziom"].astype("int8")
+    for col in ["Kod", "Nazwa", "Województwo"]:
+        cube[col] = cube[col].astype("category")
+    return cube
+
+
+def load_icd_cube(file_path, use_cache=True, cache_dir=None):
+    """
+    Loads the ICD-10 cube of a CSV file, building and persisting it if needed.
+
+    The cube is stored in the columnar CSV cache of the source file (see read_csv)
+    and rebuilt when the source file changes.
+
+    Args:
+        file_path (str): Path of the ICD-10 CSV file.
+        use_cache (bool, optional): Whether to read and write the persisted cube.
+            Defaults to True.
+        cache_dir (str, optional): Explicit cache directory. Defaults to the CSV cache
+            directory of the source file.
+
+    Returns:
+        pd.DataFrame: The ICD-10 cube.
+    """
+    use_cache = use_cache and PARQUET_AVAILABLE
+    if use_cache:
+        cube_path = cache_artifact_path(file_path, {"icd_cube": ICD_LEVELS}, cache_dir)
+        if cube_path.is_file():
+            try:
+                cube = pd.read_parquet(cube_path)
+                touch_cache_artifact(cube_path)
+                return cube
+            except Exception as e:
+                print(f"Ignoring unreadable ICD-10 cube {cube_path.name}: {e}")
+
+    cube = build_icd_cube(read_csv(file_path, use_cache=use_cache, cache_dir=cache_dir))
+    if use_cache:
+        write_cache_artifact(cube, cube_path)
+    return cube
+
+
+def select_cube(cube, level, years=None, regions=None):
+    """
+    Selects the rows of one ICD-10 level, optionally restricted to years and regions.
+
+    Args:
+        cube (pd.DataFrame): The ICD-10 cube.
+        level (int): ICD-10 classification level.
+        years (int or list, optional): Year or years to keep. Defaults to all years.
+        regions (str or list, optional): Voivodeship or voivodeships to keep.
+            Defaults to all voivodeships.
+
+    Returns:
+        pd.DataFrame: The selected rows of the cube.
+    """
+    mask = cube["Poziom"].to_numpy() == level
+    if years is not None:
+        years = [years] if pd.api.types.is_scalar(years) else list(years)
+        mask = mask & cube["Rok"].isin(years).to_numpy()
+    if regions is not None:
+        regions = [regions] if isinstance(regions, str) else list(regions)
+        mask = mask & cube["Województwo"].isin(regions).to_numpy()
+    return cube[mask]
+
+
+def top_n(cube, level, n=10, years=None, regions=None):
+    """
+    Returns the ICD-10 codes of a level with the most consultations.
+
+    Args:
+        cube (pd.DataFrame): The ICD-10 cube.
+        level (int): ICD-10 classification level.
+        n (int, optional): Number of codes to return. Defaults to 10.
+        years (int or list, optional): Year or years to include. Defaults to all years.
+        regions (str or list, optional): Voivodeship or voivodeships to include.
+            Defaults to all voivodeships.
+
+    Returns:
+        pd.DataFrame: The code and name columns of the level and "Liczba porad AOS",
+            sorted in descending order.
+    """
+    code_col, name_col = icd_columns(level)
+    return (
+        select_cube(cube, level, years, regions)
+        .groupby(["Kod", "Nazwa"], observed=True)[ICD_MEASURE]
+        .sum()
+        .nlargest(n)
+        .reset_index()
+        .rename(columns={"Kod": code_col, "Nazwa": name_col})
+        .astype({code_col: str, name_col: str})
+    )
+
+
+def top_n_by_region(cube, level, n=10, years=None):
+    """
+    Returns the ICD-10 codes of a level with the most consultations in each voivodeship.
+
+    Args:
+        cube (pd.DataFrame): The ICD-10 cube.
+        level (int): ICD-10 classification level.
+        n (int, optional): Number of codes per voivodeship. Defaults to 10.
+        years (int or list, optional): Year or years to include. Defaults to all years.
+
+    Returns:
+        pd.DataFrame: "Województwo", the code and name columns of the level and
+            "Liczba porad AOS", with the top `n` codes of every voivodeship.
+    """
+    code_col, name_col = icd_columns(level)
+    totals = (
+        select_cube(cube, level, years)
+        .groupby(["Województwo", "Kod", "Nazwa"], observed=True)[ICD_MEASURE]
+        .sum()
+        .reset_index()
+        .sort_values(
+            ["Województwo", ICD_MEASURE], ascending=[True, False], key=label_key
+        )
+    )
+    return (
+        totals.groupby("Województwo", observed=True)
+        .head(n)
+        .rename(columns={"Kod": code_col, "Nazwa": name_col})
+        .reset_index(drop=True)
+    )
+
+
+def _yearly_shares(df, code_col, codes):
+    """Returns the yearly percentage shares of `codes` in a frame of ICD-10 sums."""
+    matrix = time_series_matrix(df, code_col, ICD_MEASURE, entities=codes)
+    matrix.columns = pd.Index(list(codes), name=None)
+    return share_of_total(matrix)
+
+
+def share_by_year(cube, level, codes, regions=None):
+    """
+    Returns the yearly percentage share of the given ICD-10 codes among themselves.
+
+    Args:
+        cube (pd.DataFrame): The ICD-10 cube.
+        level (int): ICD-10 classification level.
+        codes (list): ICD-10 codes of the level to compare.
+        regions (str or list, optional): Voivodeship or voivodeships to include.
+            Defaults to all voivodeships.
+
+    Returns:
+        pd.DataFrame: Percentages with years as the index and `codes` as columns,
+            in the order of `codes`.
+    """
+    selected = select_cube(cube, level, regions=regions)
+    selected = selected[selected["Kod"].isin(codes)]
+    return _yearly_shares(selected, "Kod", codes)
+
+
+def _raw_icd_source(file_paths, filter_dict):
+    """Returns the raw ICD-10 files and filter used by the streaming queries."""
+    if file_paths is None:
+        file_paths = get_files_paths(DATA_DIR / "raw", ICD_RAW_DATASET, "csv")
+    if filter_dict is None:
+        filter_dict = {"Specjalność komórki": ICD_SPECIALITY}
+    return file_paths, filter_dict
+
+
+def stream_top_n(
+    level,
+    n=10,
+    file_paths=None,
+    filter_dict=None,
+    method="space_saving",
+    chunksize=500000,
+    **kwargs,
+):
+    """
+    Returns the ICD-10 codes of a level with the most consultations, streaming the raw files.
+
+    Only a bounded summary of the codes is kept in memory (see heavy_hitters), so the
+    raw files of all specialities and years do not have to fit in RAM.
+
+    Args:
+        level (int): ICD-10 classification level.
+        n (int, optional): Number of codes to return. Defaults to 10.
+        file_paths (list, optional): Raw ICD-10 files. Defaults to the files of
+            ICD_RAW_DATASET in the raw data folder.
+        filter_dict (dict, optional): Filter conditions of the rows. Defaults to the
+            rows of ICD_SPECIALITY.
+        method (str, optional): Heavy-hitters method. Defaults to "space_saving".
+        chunksize (int, optional): Number of CSV rows read at a time. Defaults to 500000.
+        **kwargs: Additional arguments passed to heavy_hitters.stream_top_n.
+
+    Returns:
+        pd.DataFrame: The code and name columns of the level and "Liczba porad AOS",
+            sorted in descending order, as returned by top_n.
+    """
+    file_paths, filter_dict = _raw_icd_source(file_paths, filter_dict)
+    return top_n_from_files(
+        file_paths,
+        list(icd_columns(level)),
+        ICD_MEASURE,
+        n=n,
+        filter_dict=filter_dict,
+        chunksize=chunksize,
+        method=method,
+        **kwargs,
+    )
+
+
+def stream_share_by_year(
+    level, codes, file_paths=None, filter_dict=None, chunksize=500000
+):
+    """
+    Returns the yearly percentage share of ICD-10 codes, streaming the raw files.
+
+    Args:
+        level (int): ICD-10 classification level.
+        codes (list): ICD-10 codes of the level to compare.
+        file_paths (list, optional): Raw ICD-10 files. Defaults to the files of
+            ICD_RAW_DATASET in the raw data folder.
+        filter_dict (dict, optional): Filter conditions of the rows. Defaults to the
+            rows of ICD_SPECIALITY.
+        chunksize (int, optional): Number of CSV rows read at a time. Defaults to 500000.
+
+    Returns:
+        pd.DataFrame: Percentages with years as the index and `codes` as columns,
+            as returned by share_by_year.
+    """
+    file_paths, filter_dict = _raw_icd_source(file_paths, filter_dict)
+    code_col, _ = icd_columns(level)
+
+    # Only the rows of the compared codes are kept from each chunk
+    selected = load_filtered_files(
+        file_paths,
+        {**filter_dict, code_col: list(codes)},
+        columns=["Rok", code_col, ICD_MEASURE],
+        chunksize=chunksize,
+    )
+    return _yearly_shares(selected, code_col, codes)
@@ -1,6 +1,15 @@
 # matplotlib_utils.py
+import matplotlib
 import matplotlib.pyplot as plt
+import multiprocessing
+import numpy as np
+import os
+import time
 from pathlib import Path
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib.collections import PathCollection
+from matplotlib.path import Path as MplPath
 
 
 # %%
@@ -91,7 +100,7 @@ def customize_plot(
 
 
 # %%
-def save_fig_matplotlib(fig, file_path: str) -> None:
+def save_fig_matplotlib(fig, file_path: str, dpi=None) -> None:
     """
     Save a Matplotlib or Seaborn plot to a file in the specified format and directory.
 
@@ -101,6 +110,7 @@ def save_fig_matplotlib(fig, file_path: str) -> None:
     Parameters:
     - fig (plt.Figure): The plot object to be saved. Can be a Matplotlib or Seaborn figure.
     - file_path (str): The path where the plot will be saved, including the file name and extension.
+    - dpi (int, optional): Resolution in dots per inch. Defaults to the resolution of the figure.
 
     Raises:
     - ValueError: If the file format (extracted from file_path) is not supported.
@@ -129,13 +139,194 @@ def save_fig_matplotlib(fig, file_path: str) -> None:
     # Check if the figure is a Matplotlib or Seaborn figure
     if isinstance(fig, plt.Figure):
         # Save the Matplotlib or Seaborn figure as an image file (PNG, JPG, SVG, PDF)
-        fig.savefig(file_path, format=file_extension)
+        fig.savefig(file_path, format=file_extension, dpi=dpi or "figure")
     else:
         raise TypeError(
             "The 'fig' parameter must be a Matplotlib 'plt.Figure' or a Seaborn 'sns.Figure' object."
         )
 
 
+# %%
+def _geometry_path(geometry):
+    """Converts a Polygon or MultiPolygon to a compound Matplotlib path with its holes."""
+    if geometry is None or geometry.is_empty:
+        return MplPath(np.empty((0, 2)))
+    polygons = getattr(geometry, "geoms", [geometry])
+    rings = [
+        ring for polygon in polygons for ring in [polygon.exterior, *polygon.interiors]
+    ]
+    return MplPath.make_compound_path(
+        *[MplPath(np.asarray(ring.coords)[:, :2], closed=True) for ring in rings]
+    )
+
+
+@contextmanager
+def choropleth_session_matplotlib(
+    geometries,
+    figsize=(12, 8),
+    dpi=300,
+    cmap="PuBu",
+    linewidth=0.8,
+    edgecolor="black",
+    missing_color="lightgrey",
+):
+    """
+    Opens a choropleth map whose boundaries are drawn once and recolored for every map.
+
+    The geometries are converted to a single path collection when the session opens.
+    Every rendered map only updates the face colors, the normalization and the colorbar
+    before saving, so many metrics or years can be rendered for the cost of one
+    geometry draw. The figure is closed when the session ends.
+
+    Parameters:
+    - geometries (gpd.GeoDataFrame or gpd.GeoSeries): Polygons of the map.
+    - figsize (tuple, optional): The size of the figure in inches (width, height). Default is (12, 8).
+    - dpi (int, optional): Resolution of the saved maps. Default is 300.
+    - cmap (str, optional): Name of the colormap. Default is "PuBu".
+    - linewidth (float, optional): Width of the boundaries. Default is 0.8.
+    - edgecolor (str, optional): Color of the boundaries. Default is "black".
+    - missing_color (str, optional): Face color of polygons without a value. Default is "lightgrey".
+
+    Yields:
+    - callable: render(values, file_path, label=None, title="") coloring the polygons by
+      `values` (aligned with `geometries`) and saving the map to `file_path`.
+    """
+    geometry = getattr(geometries, "geometry", geometries)
+
+    # Create the figure and draw the boundaries once
+    fig, ax = plt.subplots(figsize=figsize)
+    colormap = plt.get_cmap(cmap).with_extremes(bad=missing_color)
+    collection = PathCollection(
+        [_geometry_path(geom) for geom in geometry],
+        cmap=colormap,
+        linewidths=linewidth,
+        edgecolors=edgecolor,
+    )
+    collection.set_array(np.ma.masked_all(len(geometry)))
+    ax.add_collection(collection, autolim=True)
+    ax.autoscale_view()
+    ax.set_aspect("equal")
+    ax.set_xticks([])
+    ax.set_yticks([])
+    colorbar = None
+
+    def render(values, file_path, label=None, title=""):
+        nonlocal colorbar
+        values = np.ma.masked_invalid(np.asarray(values, dtype=float))
+        if len(values) != len(geometry):
+            raise ValueError(
+                f"Expected {len(geometry)} values, one per geometry, got {len(values)}."
+            )
+
+        # Recolor the polygons and rescale the colormap to the new values
+        collection.set_array(values)
+        if values.count():
+            collection.set_clim(values.min(), values.max())
+
+        # Create the colorbar once, later maps only update its label
+        if colorbar is None:
+            colorbar = fig.colorbar(collection, ax=ax)
+        colorbar.set_label(label or "")
+        ax.set_title(title)
+
+        save_fig_matplotlib(fig, file_path, dpi=dpi)
+
+    try:
+        yield render
+    finally:
+        plt.close(fig)
+
+
+# %%
+def _init_batch_backend():
+    """Switches a rendering worker process to the non-interactive Agg backend."""
+    matplotlib.use("Agg")
+
+
+def _in_worker_process():
+    """Returns whether the calling process was started by a process pool."""
+    return multiprocessing.parent_process() is not None
+
+
+def _render_figure_spec(spec):
+    """
+    Renders and saves a single figure spec, always closing the figures it opened.
+
+    Returns:
+    - dict: The "file_path" of the figure, its "status" ("ok" or "failed"), the
+      rendering "time" in seconds and the "error" message if it failed.
+    """
+    start = time.perf_counter()
+    open_figures = set(plt.get_fignums())
+    result = {"file_path": Path(spec["file_path"]), "status": "ok", "error": None}
+    try:
+        fig = spec["plot"](*spec.get("args", ()), **spec.get("kwargs", {}))
+        save_fig_matplotlib(fig, spec["file_path"], dpi=spec.get("dpi"))
+    except Exception as e:
+        result.update(status="failed", error=f"{type(e).__name__}: {e}")
+    finally:
+        # Close every figure created by the plot function, even if it failed
+        for number in set(plt.get_fignums()) - open_figures:
+            plt.close(number)
+    result["time"] = time.perf_counter() - start
+    return result
+
+
+def render_figures_matplotlib(specs, max_workers=None, executor=None):
+    """
+    Renders a batch of figures on the Agg backend in worker processes.
+
+    Each spec describes one figure: a plot function building and returning the figure,
+    its arguments and the output file. Figures are saved with save_fig_matplotlib and
+    closed in the worker, whether they were rendered successfully or not.
+
+    Called from a worker process (e.g. an analysis run by main.py), the figures are
+    rendered in that process, so pools are never nested and the cores are not
+    oversubscribed. A caller owning a pool can pass it as `executor` instead.
+
+    Parameters:
+    - specs (list of dict): Figure specs with the keys:
+      - "plot" (callable): Module-level function returning a plt.Figure.
+      - "file_path" (str): Output file passed to save_fig_matplotlib.
+      - "args" (tuple, optional): Positional arguments of the plot function.
+      - "kwargs" (dict, optional): Keyword arguments of the plot function.
+      - "dpi" (int, optional): Resolution of the output.
+    - max_workers (int, optional): Number of worker processes. Defaults to the number of
+      specs, limited by the number of CPUs. With a single worker, or when called from a
+      worker process, figures are rendered in the calling process.
+    - executor (concurrent.futures.Executor, optional): Pool of the caller used to
+      render the figures. Its workers must use a non-interactive backend. Replaces
+      `max_workers`.
+
+    Returns:
+    - list of dict: For every spec, in order, the "file_path", "status" ("ok" or
+      "failed"), rendering "time" in seconds and "error" message.
+
+    Raises:
+    - RuntimeError: If any figure failed to render, after all figures were processed.
+    """
+    if max_workers is None:
+        max_workers = min(len(specs), os.cpu_count() or 1)
+
+    if executor is not None:
+        results = list(executor.map(_render_figure_spec, specs))
+    elif max_workers <= 1 or len(specs) <= 1 or _in_worker_process():
+        results = [_render_figure_spec(spec) for spec in specs]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=max_workers, initializer=_init_batch_backend
+        ) as pool:
+            results = list(pool.map(_render_figure_spec, specs))
+
+    failed = [result for result in results if result["status"] != "ok"]
+    if failed:
+        errors = "; ".join(
+            f"{result['file_path'].name}: {result['error']}" for result in failed
+        )
+        raise RuntimeError(f"Failed to render {len(failed)} figure(s): {errors}")
+    return results
+
+
 # %%
 if __name__ == "__main__":
     current_working_directory = Path.cwd()
@@ -0,0 +1,316 @@
+"""Memory-mapped store of the numeric measures of a dataset.
+
+Every measure of a dataset is written as one contiguous NumPy array (.npy) with one
+axis per dimension (year, region, county, ICD-10 code). The positions along the axes
+are the integer codes of the dimension values: the shared schema dictionaries for the
+categorical dimensions and the sorted years for "Rok". Cells without data are NaN.
+
+The arrays are opened with np.load(mmap_mode="r"), so any process slices them
+zero-copy and parallel workers share the pages of one physical copy. A store is a
+small dict holding the path and the dimension values only, which is cheap to pass
+to worker processes; the arrays are mapped when a measure is accessed.
+
+The arrays are dense over the product of all dimension values, so a store is limited
+to MEASURE_STORE_MAX_CELLS cells per measure. Larger products are refused, and the
+store has to be built over fewer dimensions.
+"""
+
+import json
+import os
+import shutil
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from .utils import (
+    cache_artifact_path,
+    evict_csv_cache,
+    read_csv,
+    remove_stale_cache_artifacts,
+    temporary_artifact_path,
+    touch_cache_artifact,
+)
+from .schema import DIMENSION_COLUMNS, apply_schema
+
+MEASURE_COLUMNS = [
+    "Liczba porad AOS",
+    "Liczba poradni AOS",
+    "Populacja",
+    "Liczba pacjentów",
+]
+
+# Dimensions of the stores, in the order of the array axes
+MEASURE_DIMENSIONS = ["Rok", "Województwo", "Powiat", "Kod ICD-10 poziom 3."]
+
+# Version of the store layout, part of the cache key of the stored arrays
+MEASURE_STORE_VERSION = 1
+
+MEASURE_STORE_INDEX = "index.json"
+
+# Largest number of cells of a measure array (800 MB as float64)
+MEASURE_STORE_MAX_CELLS = 100_000_000
+
+
+def build_measure_store(df, store_dir, dimensions=None, measures=None):
+    """
+    Writes the measures of a DataFrame as arrays aligned to the dimension codes.
+
+    Rows with the same dimension values are summed. The store is written to a
+    temporary directory first, so concurrent readers never see a partial store.
+
+    Args:
+        df (pd.DataFrame): Dataset with the dimension and measure columns.
+        store_dir (str): Directory of the store.
+        dimensions (list, optional): Dimension columns, in the order of the array
+            axes. Defaults to the MEASURE_DIMENSIONS present in `df`.
+        measures (list, optional): Measure columns. Defaults to the MEASURE_COLUMNS
+            present in `df`.
+
+    Returns:
+        dict: The store, as returned by open_measure_store.
+
+    Raises:
+        ValueError: If there are no dimension or measure columns, or if the product
+            of the dimensions exceeds MEASURE_STORE_MAX_CELLS.
+    """
+    if dimensions is None:
+        dimensions = [col for col in MEASURE_DIMENSIONS if col in df.columns]
+    if measures is None:
+        measures = [col for col in MEASURE_COLUMNS if col in df.columns]
+    if not dimensions or not measures:
+        raise ValueError(
+            "A measure store needs at least one dimension and one measure."
+        )
+
+    # Categorical dimensions are aligned to the shared schema dictionaries
+    df = df[dimensions + measures].copy()
+    schema_columns = [col for col in dimensions if col in DIMENSION_COLUMNS]
+    apply_schema(df, schema_columns)
+
+    axes = {}
+    codes = []
+    for col in dimensions:
+        if col in schema_columns:
+            axes[col] = pd.Index(df[col].cat.categories)
+            codes.append(df[col].cat.codes.to_numpy())
+        else:
+            axes[col] = pd.Index(np.sort(df[col].dropna().unique()))
+            codes.append(axes[col].get_indexer(df[col]))
+
+    # Refuse dense arrays too large for memory before allocating them
+    shape = tuple(len(axes[col]) for col in dimensions)
+    size = int(np.prod(shape, dtype=object))
+    if size > MEASURE_STORE_MAX_CELLS:
+        raise ValueError(
+            f"A measure store over {', '.join(dimensions)} would have {size} cells per "
+            f"measure (limit {MEASURE_STORE_MAX_CELLS}), use fewer dimensions."
+        )
+
+    # Rows with a missing dimension value have no cell
+    valid = np.logical_and.reduce([code >= 0 for code in codes])
+    cells = np.ravel_multi_index([code[valid] for code in codes], shape)
+
+    store_dir = Path(store_dir)
+    tmp_dir = temporary_artifact_path(store_dir)
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    index = {
+        "dimensions": {col: axes[col].tolist() for col in dimensions},
+        "measures": {},
+    }
+    for position, col in enumerate(measures):
+        values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)[valid]
+        present = ~np.isnan(values)
+
+        # Sum the rows of every cell, cells without values stay NaN
+        array = np.bincount(cells[present], weights=values[present], minlength=size)
+        counts = np.bincount(cells[present], minlength=size)
+        array[counts == 0] = np.nan
+
+        file_name = f"{position}.npy"
+        np.save(tmp_dir / file_name, array.reshape(shape))
+        index["measures"][col] = {"file": file_name, "dtype": str(df[col].dtype)}
+
+    with open(tmp_dir / MEASURE_STORE_INDEX, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+
+    try:
+        os.replace(tmp_dir, store_dir)
+    except OSError:
+        # Another process has written the same store in the meantime
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return open_measure_store(store_dir)
+
+
+def open_measure_store(store_dir):
+    """
+    Opens a measure store.
+
+    Args:
+        store_dir (str): Directory of the store.
+
+    Returns:
+        dict: The store "path", the "dimensions" (column name to pd.Index of the values
+            along its axis) and the "measures" (measure name to file and dtype).
+
+    Raises:
+        FileNotFoundError: If the directory does not hold a measure store.
+    """
+    store_dir = Path(store_dir)
+    with open(store_dir / MEASURE_STORE_INDEX, encoding="utf-8") as f:
+        index = json.load(f)
+    return {
+        "path": str(store_dir),
+        "dimensions": {
+            col: pd.Index(values) for col, values in index["dimensions"].items()
+        },
+        "measures": index["measures"],
+    }
+
+
+def load_measure_store(file_path, dimensions=None, measures=None, cache_dir=None):
+    """
+    Opens the measure store of a CSV file, building it if needed.
+
+    The store is a cache artifact of the source file (see cache_artifact_path),
+    rebuilt when the size or modification time of the source file changes and
+    evicted or cleared together with the other artifacts of the cache.
+
+    Args:
+        file_path (str): Path of the CSV file.
+        dimensions (list, optional): Dimension columns. Defaults to the
+            MEASURE_DIMENSIONS of the file.
+        measures (list, optional): Measure columns. Defaults to the MEASURE_COLUMNS
+            of the file.
+        cache_dir (str, optional): Explicit cache directory. Defaults to the `.cache`
+            folder next to the source file.
+
+    Returns:
+        dict: The store, as returned by open_measure_store.
+    """
+    key = {
+        "measure_store": MEASURE_STORE_VERSION,
+        "dimensions": dimensions,
+        "measures": measures,
+    }
+    store_dir = cache_artifact_path(file_path, key, cache_dir, suffix=".measures")
+    if (store_dir / MEASURE_STORE_INDEX).is_file():
+        touch_cache_artifact(store_dir)
+        return open_measure_store(store_dir)
+
+    # Artifacts of the same source with another size/mtime stamp are outdated
+    store_dir.parent.mkdir(parents=True, exist_ok=True)
+    remove_stale_cache_artifacts(store_dir)
+
+    df = read_csv(file_path, cache_dir=cache_dir)
+    store = build_measure_store(df, store_dir, dimensions, measures)
+    evict_csv_cache(store_dir.parent)
+    return store
+
+
+def measure_array(store, measure):
+    """
+    Maps a measure of a store into memory.
+
+    Args:
+        store (dict): The measure store.
+        measure (str): Name of the measure.
+
+    Returns:
+        np.ndarray: Read-only memory-mapped array with one axis per dimension.
+
+    Raises:
+        KeyError: If the store has no such measure.
+    """
+    if measure not in store["measures"]:
+        raise KeyError(
+            f"Unknown measure '{measure}'. Stored measures: {', '.join(store['measures'])}."
+        )
+    file_name = store["measures"][measure]["file"]
+    return np.load(Path(store["path"]) / file_name, mmap_mode="r")
+
+
+def select_measure(store, measure, selection=None):
+    """
+    Slices a measure by dimension values.
+
+    Args:
+        store (dict): The measure store.
+        measure (str): Name of the measure.
+        selection (dict, optional): Dimension values to select. A scalar drops the axis
+            of its dimension and returns a view without copying the data. A list keeps
+            the axis with the listed values, which copies the selected cells.
+
+    Returns:
+        tuple: The selected array and a dict of the dimensions of its axes, in axis
+            order, with the values along every axis.
+
+    Raises:
+        ValueError: If a selected dimension or value is not in the store.
+    """
+    selection = selection or {}
+    unknown_columns = [col for col in selection if col not in store["dimensions"]]
+    if unknown_columns:
+        raise ValueError(
+            f"Dimensions not in the measure store: {', '.join(unknown_columns)}"
+        )
+
+    array = measure_array(store, measure)
+    axes = {}
+    for col, values in store["dimensions"].items():
+        if col in selection:
+            is_scalar = pd.api.types.is_scalar(selection[col])
+            selected = [selection[col]] if is_scalar else list(selection[col])
+            positions = values.get_indexer(selected)
+            if (positions < 0).any():
+                raise ValueError(f"Values of '{col}' not found in the measure store.")
+            if is_scalar:
+                # Integer indexing of one axis is a view of the mapped array
+                array = array[(slice(None),) * len(axes) + (positions[0],)]
+                continue
+            array = np.take(array, positions, axis=len(axes))
+            values = values[positions]
+        axes[col] = values
+    return array, axes
+
+
+def measure_table(store, measure, index, columns=None, selection=None):
+    """
+    Sums a measure over all dimensions except `index` and `columns`.
+
+    Args:
+        store (dict): The measure store.
+        measure (str): Name of the measure.
+        index (str): Dimension of the rows.
+        columns (str, optional): Dimension of the columns. If None, a Series is returned.
+        selection (dict, optional): Dimension values to select, see select_measure.
+
+    Returns:
+        pd.DataFrame or pd.Series: The totals, without rows and columns that have no
+            data. Integer measures keep their dtype when no cell is missing.
+    """
+    array, axes = select_measure(store, measure, selection)
+    keep = [index] + ([columns] if columns is not None else [])
+
+    # Sum the other axes, cells without any value stay NaN
+    other_axes = tuple(axis for axis, col in enumerate(axes) if col not in keep)
+    present = (~np.isnan(array)).any(axis=other_axes)
+    totals = np.where(present, np.nansum(array, axis=other_axes), np.nan)
+    if [col for col in axes if col in keep] != keep:
+        totals = totals.T
+
+    if columns is None:
+        table = pd.Series(totals, index=axes[index].rename(index), name=measure)
+        table = table.dropna()
+    else:
+        table = pd.DataFrame(
+            totals,
+            index=axes[index].rename(index),
+            columns=axes[columns].rename(columns),
+        )
+        table = table.dropna(how="all").dropna(axis=1, how="all")
+
+    dtype = np.dtype(store["measures"][measure]["dtype"])
+    if np.issubdtype(dtype, np.integer) and not table.isna().any(axis=None):
+        table = table.astype(dtype)
+    return table
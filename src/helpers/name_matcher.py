@@ -0,0 +1,203 @@
+"""Indexed fuzzy matching of administrative unit names.
+
+Names are normalized (lowercased, transliterated to ASCII, with unit prefixes such as
+"powiat " removed) and split into character n-grams. An inverted index of the
+candidate n-grams blocks the candidates sharing at least one n-gram with a query, and
+only those are scored with the Dice coefficient of the n-gram sets. Building the
+mapping is therefore close to linear in the number of names instead of comparing
+every query with every candidate.
+"""
+
+import re
+import numpy as np
+import pandas as pd
+from unidecode import unidecode
+from .utils import read_csv, write_csv
+
+# Length of the character n-grams
+NGRAM_SIZE = 3
+
+# Minimum Dice score of an accepted match
+MATCH_THRESHOLD = 0.8
+
+# Prefixes of unit names dropped by the normalization
+NAME_PREFIXES = ("powiat ", "gmina ", "województwo ")
+
+MAPPING_COLUMNS = ["query", "match", "score", "matched"]
+
+
+def normalize_name(name):
+    """
+    Normalizes an administrative unit name for matching.
+
+    Args:
+        name (str): The name to normalize.
+
+    Returns:
+        str: The lowercased ASCII name without unit prefixes and repeated whitespace.
+    """
+    name = unidecode(str(name)).lower()
+    name = re.sub(r"\s+", " ", name).strip()
+    for prefix in NAME_PREFIXES:
+        name = name.removeprefix(unidecode(prefix))
+    return name.strip()
+
+
+def _ngrams(name, n=NGRAM_SIZE):
+    """Returns the set of character n-grams of a normalized name, padded with spaces."""
+    padded = f"{' ' * (n - 1)}{name} "
+    return {padded[i : i + n] for i in range(len(padded) - n + 1)}
+
+
+def build_ngram_index(candidates, n=NGRAM_SIZE):
+    """
+    Builds an inverted index of the character n-grams of candidate names.
+
+    Args:
+        candidates (list): Candidate names.
+        n (int, optional): Length of the n-grams. Defaults to NGRAM_SIZE.
+
+    Returns:
+        dict: The "names" of the candidates, their "normalized" forms, the number of
+            n-grams of every candidate ("sizes"), the "postings" mapping every n-gram
+            to the positions of the candidates containing it, and the n-gram length "n".
+    """
+    names = pd.Index(pd.unique(pd.Series(list(candidates), dtype=object)))
+    normalized = [normalize_name(name) for name in names]
+
+    postings = {}
+    sizes = np.empty(len(names), dtype=np.int64)
+    for position, name in enumerate(normalized):
+        grams = _ngrams(name, n)
+        sizes[position] = len(grams)
+        for gram in grams:
+            postings.setdefault(gram, []).append(position)
+
+    return {
+        "names": names,
+        "normalized": normalized,
+        "sizes": sizes,
+        "postings": {gram: np.array(ids) for gram, ids in postings.items()},
+        "n": n,
+    }
+
+
+def _score_candidates(query, index, top_k):
+    """
+    Scores the candidates blocked by the n-grams of a query.
+
+    Returns:
+        tuple: Positions of the best `top_k` candidates and their Dice scores.
+    """
+    grams = _ngrams(normalize_name(query), index["n"])
+    blocked = [index["postings"][gram] for gram in grams if gram in index["postings"]]
+    if not blocked:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+
+    # Count the n-grams shared with every blocked candidate in one pass
+    positions, shared = np.unique(np.concatenate(blocked), return_counts=True)
+    scores = 2 * shared / (len(grams) + index["sizes"][positions])
+
+    best = np.argsort(-scores, kind="stable")[:top_k]
+    return positions[best], scores[best]
+
+
+def match_names(
+    queries, candidates, threshold=MATCH_THRESHOLD, unique=True, top_k=5, n=NGRAM_SIZE
+):
+    """
+    Matches every query name to the most similar candidate name.
+
+    Args:
+        queries (list): Names to match.
+        candidates (list or dict): Candidate names, or an index built with
+            build_ngram_index.
+        threshold (float, optional): Minimum Dice score of an accepted match.
+            Defaults to MATCH_THRESHOLD.
+        unique (bool, optional): If True, every candidate is assigned to at most one
+            query, the best scoring pairs first, and queries left without a candidate
+            above the threshold are unmatched. Defaults to True.
+        top_k (int, optional): Number of best candidates kept per query for the unique
+            assignment. Defaults to 5.
+        n (int, optional): Length of the n-grams. Defaults to NGRAM_SIZE.
+
+    Returns:
+        pd.DataFrame: Mapping table with the "query", its best "match", the Dice
+            "score" (confidence between 0 and 1) and whether the score reaches the
+            threshold ("matched"). Without `unique`, unmatched queries keep their best
+            candidate and score for review. Queries without a match or candidate have
+            a missing match and score.
+    """
+    index = (
+        candidates if isinstance(candidates, dict) else build_ngram_index(candidates, n)
+    )
+    queries = list(pd.unique(pd.Series(list(queries), dtype=object)))
+
+    # Score the blocked candidates of every query
+    pairs = []
+    for query_id, query in enumerate(queries):
+        positions, scores = _score_candidates(query, index, top_k if unique else 1)
+        pairs.extend(zip([query_id] * len(positions), positions, scores))
+    pairs = pd.DataFrame(pairs, columns=["query_id", "position", "score"])
+
+    if unique:
+        # Assign the best pairs first greedily, each query and candidate at most once
+        pairs = pairs.sort_values("score", ascending=False, kind="stable")
+        pairs = pairs[pairs["score"] >= threshold]
+        used_queries, used_positions, assigned = set(), set(), []
+        for row in pairs.itertuples(index=False):
+            if row.query_id in used_queries or row.position in used_positions:
+                continue
+            used_queries.add(row.query_id)
+            used_positions.add(row.position)
+            assigned.append(row)
+        pairs = pd.DataFrame(assigned, columns=["query_id", "position", "score"])
+
+    best = pairs.drop_duplicates("query_id").set_index("query_id")
+    best = best.reindex(range(len(queries)))
+
+    match = pd.Series(None, index=best.index, dtype=object)
+    found = best["position"].notna()
+    match[found] = index["names"][best.loc[found, "position"].astype(np.int64)]
+    scores = best["score"].to_numpy(dtype=np.float64)
+
+    return pd.DataFrame(
+        {
+            "query": queries,
+            "match": match.to_numpy(),
+            "score": scores,
+            "matched": scores >= threshold,
+        },
+        columns=MAPPING_COLUMNS,
+    )
+
+
+def save_mapping(mapping, file_path):
+    """
+    Saves a mapping table built with match_names to a CSV file.
+
+    Args:
+        mapping (pd.DataFrame): The mapping table.
+        file_path (str): Path of the CSV file.
+    """
+    write_csv(mapping[MAPPING_COLUMNS], file_path, index=False)
+
+
+def load_mapping(file_path, min_score=None):
+    """
+    Loads a mapping table as a dictionary of query names to matched names.
+
+    Args:
+        file_path (str): Path of the CSV file written by save_mapping.
+        min_score (float, optional): Minimum score of the kept pairs. Defaults to the
+            pairs marked as matched.
+
+    Returns:
+        dict: Mapping of query names to their matches.
+    """
+    mapping = read_csv(file_path, use_cache=False)
+    if min_score is None:
+        mapping = mapping[mapping["matched"]]
+    else:
+        mapping = mapping[mapping["score"] >= min_score]
+    return dict(zip(mapping["query"], mapping["match"]))
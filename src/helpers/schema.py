@@ -0,0 +1,209 @@
+"""Categorical schema of the dimension columns shared by the processed datasets.
+
+Dimension columns (regions, counties, specialities, providers and ICD-10 codes and
+names) are loaded as pandas categoricals instead of Python strings. Every dimension
+has one dictionary of values shared by all datasets and persisted next to the
+processed data, so the same value gets the same integer code in every dataset and
+merges or groupbys across datasets work on the codes. Values are encoded as they are,
+join keys that need normalizing are derived from them where the join happens.
+
+Dictionaries only grow: new values are appended after the existing ones, so a code
+never changes once assigned. Codes follow the order in which values were first seen,
+so outputs are sorted by their labels with label_key.
+"""
+
+import os
+import threading
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from .config import DATA_DIR
+from .utils import read_csv
+
+# Columns loaded as categoricals, each with its own dictionary
+DIMENSION_COLUMNS = (
+    [
+        "Województwo",
+        "Powiat",
+        "Specjalność komórki",
+        "Nazwa świadczeniodawcy",
+    ]
+    + [f"Kod ICD-10 poziom {level}." for level in (1, 2, 3)]
+    + [f"Nazwa ICD-10 poziom {level}." for level in (1, 2, 3)]
+)
+
+# File with the persisted dictionaries of all dimensions
+SCHEMA_DICTIONARIES_PATH = DATA_DIR / "processed" / "schema_dictionaries.csv"
+
+_dictionaries = None
+_dictionaries_lock = threading.Lock()
+
+
+def _reset_lock():
+    """Replaces the lock in forked worker processes, it may be held by a parent thread."""
+    global _dictionaries_lock
+    _dictionaries_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_lock)
+
+
+def _load_dictionaries(file_path=SCHEMA_DICTIONARIES_PATH):
+    """Reads the persisted dictionaries, ordered by their codes."""
+    if not Path(file_path).is_file():
+        return {}
+    table = read_csv(file_path, use_cache=False, dtype=str, keep_default_na=False)
+    table["Kod"] = table["Kod"].astype(np.int64)
+    table = table.sort_values(["Wymiar", "Kod"], kind="stable")
+    return {
+        dimension: pd.Index(group["Wartość"].to_numpy(), dtype=object)
+        for dimension, group in table.groupby("Wymiar", sort=False)
+    }
+
+
+def _save_dictionaries(file_path=SCHEMA_DICTIONARIES_PATH):
+    """Persists the dictionaries of all dimensions, merged with the persisted ones."""
+    # Other processes may have added values since the dictionaries were loaded, append
+    # them after the values of this session so that no code in use changes
+    for dimension, values in _load_dictionaries(file_path).items():
+        current = _dictionaries.get(dimension, pd.Index([], dtype=object))
+        _dictionaries[dimension] = current.append(values[~values.isin(current)])
+
+    table = pd.concat(
+        [
+            pd.DataFrame(
+                {
+                    "Wymiar": dimension,
+                    "Kod": np.arange(len(values)),
+                    "Wartość": values.to_numpy(),
+                }
+            )
+            for dimension, values in _dictionaries.items()
+        ],
+        ignore_index=True,
+    )
+    # Write to a temporary file first so that concurrent readers never see a partial file
+    file_path = Path(file_path)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = file_path.with_suffix(f".{os.getpid()}.tmp")
+    table.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, file_path)
+
+
+def _get_dictionaries():
+    """Returns the dictionaries, loading them on first use. Called with the lock held."""
+    global _dictionaries
+    if _dictionaries is None:
+        _dictionaries = _load_dictionaries()
+    return _dictionaries
+
+
+def dimension_dtype(dimension):
+    """
+    Returns the categorical dtype of a dimension.
+
+    Args:
+        dimension (str): Name of the dimension (one of DIMENSION_COLUMNS).
+
+    Returns:
+        pd.CategoricalDtype: Dtype with the current dictionary of the dimension.
+    """
+    with _dictionaries_lock:
+        values = _get_dictionaries().get(dimension, pd.Index([], dtype=object))
+    return pd.CategoricalDtype(values)
+
+
+def label_key(values):
+    """
+    Sort key ordering dimension values by their labels instead of their codes.
+
+    Args:
+        values (pd.Series or pd.Index): Values to sort, categorical or not.
+
+    Returns:
+        pd.Series or pd.Index: The labels of categorical values, other values unchanged.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.astype(object)
+    return values
+
+
+def encode_column(series, dimension=None):
+    """
+    Encodes a column as a categorical with the shared dictionary of its dimension.
+
+    Only the distinct values of the column are looked up in the dictionary. Values
+    missing from the dictionary are appended to it, in sorted order.
+
+    Args:
+        series (pd.Series): The column to encode.
+        dimension (str, optional): Name of the dimension. Defaults to the column name.
+
+    Returns:
+        tuple: The encoded pd.Series and whether the dictionary was extended.
+    """
+    dimension = dimension or series.name
+
+    # Factorize once and work on the distinct values only, missing values get code -1
+    codes, uniques = pd.factorize(series)
+    uniques = pd.Index(pd.Index(uniques).astype(str), dtype=object)
+
+    with _dictionaries_lock:
+        dictionaries = _get_dictionaries()
+        values = dictionaries.get(dimension, pd.Index([], dtype=object))
+        new_values = uniques[values.get_indexer(uniques) < 0].unique()
+        extended = len(new_values) > 0
+        if extended:
+            values = values.append(new_values.sort_values())
+            dictionaries[dimension] = values
+
+    dtype = pd.CategoricalDtype(values)
+    dictionary_codes = values.get_indexer(uniques)
+    codes = np.where(codes >= 0, dictionary_codes[codes], -1)
+    encoded = pd.Series(
+        pd.Categorical.from_codes(codes, dtype=dtype),
+        index=series.index,
+        name=series.name,
+    )
+    return encoded, extended
+
+
+def apply_schema(df, columns=None, persist=True):
+    """
+    Encodes the dimension columns of a DataFrame as shared categoricals.
+
+    Columns already encoded with the current dictionary are left unchanged, so the
+    schema can be applied again to frames coming from the dataset registry.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to encode. Modified in place.
+        columns (list, optional): Columns to encode. Defaults to the
+            DIMENSION_COLUMNS present in the DataFrame.
+        persist (bool, optional): Whether to save the dictionaries if new values were
+            added. Defaults to True.
+
+    Returns:
+        pd.DataFrame: The DataFrame with categorical dimension columns.
+
+    Raises:
+        ValueError: If a column is not a dimension of the schema.
+    """
+    if columns is None:
+        columns = [col for col in DIMENSION_COLUMNS if col in df.columns]
+    unknown_columns = [col for col in columns if col not in DIMENSION_COLUMNS]
+    if unknown_columns:
+        raise ValueError(f"Columns without a dimension: {', '.join(unknown_columns)}")
+
+    extended = False
+    for col in columns:
+        if df[col].dtype == dimension_dtype(col):
+            continue
+        df[col], col_extended = encode_column(df[col], col)
+        extended = extended or col_extended
+
+    # Persist new values so the codes stay the same in the next sessions
+    if extended and persist:
+        with _dictionaries_lock:
+            _save_dictionaries()
+    return df
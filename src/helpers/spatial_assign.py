@@ -0,0 +1,165 @@
+"""Spatial assignment of administrative units to their parent units.
+
+Units are assigned to parents with an STRtree built once over the parent boundaries.
+Each unit is tested with a representative point, which always lies inside the unit,
+so slivers along shared boundaries cannot break the match the way a full-polygon
+"within" test does. Units whose point falls outside every parent are assigned to the
+parent they overlap the most. The result is persisted as a TERYT-style lookup table.
+"""
+
+import os
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import shapely
+from .utils import read_csv, write_csv
+from .geometry_store import load_geometries, normalize_names
+
+TERYT_LOOKUP_COLUMNS = [
+    "TERYT_POW",
+    "Powiat",
+    "full_name",
+    "TERYT_WOJ",
+    "Województwo",
+    "Metoda",
+]
+
+
+def assign_to_parents(children, parents):
+    """
+    Assigns every child unit to the parent unit containing it.
+
+    Args:
+        children (gpd.GeoDataFrame): Child units (e.g. powiaty).
+        parents (gpd.GeoDataFrame): Parent units (e.g. województwa) in the same CRS.
+
+    Returns:
+        pd.DataFrame: For every child (same index), the positional index of its parent
+            in `parents` ("parent", -1 if none) and the assignment method
+            ("point", "overlap" or None).
+
+    Raises:
+        ValueError: If the two layers use different coordinate reference systems.
+    """
+    if children.crs != parents.crs:
+        raise ValueError(
+            f"Children and parents must share a CRS, got {children.crs} and {parents.crs}."
+        )
+
+    # Build the spatial index of the parents once
+    tree = shapely.STRtree(parents.geometry.to_numpy())
+    parent = np.full(len(children), -1, dtype=np.int64)
+    method = np.full(len(children), None, dtype=object)
+
+    # Locate a representative point of every child, keeping the first parent hit
+    points = shapely.point_on_surface(children.geometry.to_numpy())
+    child_ids, parent_ids = tree.query(points, predicate="within")
+    first = np.unique(child_ids, return_index=True)[1]
+    parent[child_ids[first]] = parent_ids[first]
+    method[child_ids[first]] = "point"
+
+    # Fall back to the parent with the largest overlap for the remaining children
+    missing = np.flatnonzero(parent < 0)
+    if len(missing):
+        geometries = children.geometry.to_numpy()[missing]
+        child_ids, parent_ids = tree.query(geometries, predicate="intersects")
+        if len(child_ids):
+            areas = shapely.area(
+                shapely.intersection(
+                    geometries[child_ids], parents.geometry.to_numpy()[parent_ids]
+                )
+            )
+            overlaps = pd.DataFrame(
+                {"child": missing[child_ids], "parent": parent_ids, "area": areas}
+            )
+            best = overlaps.sort_values("area", ascending=False).drop_duplicates(
+                "child"
+            )
+            best = best[best["area"] > 0]
+            parent[best["child"].to_numpy()] = best["parent"].to_numpy()
+            method[best["child"].to_numpy()] = "overlap"
+
+    return pd.DataFrame({"parent": parent, "method": method}, index=children.index)
+
+
+def build_teryt_lookup(powiaty, wojewodztwa):
+    """
+    Builds the lookup table of counties and the voivodeships they belong to.
+
+    Args:
+        powiaty (gpd.GeoDataFrame): County boundaries with "JPT_KOD_JE", the county
+            name in "JPT_NAZWA_POW" or "JPT_NAZWA_" and optionally "full_name".
+        wojewodztwa (gpd.GeoDataFrame): Voivodeship boundaries with "JPT_KOD_JE" and
+            "JPT_NAZWA_" columns.
+
+    Returns:
+        pd.DataFrame: Lookup table with the TERYT_LOOKUP_COLUMNS columns and
+            normalized names. Counties without a voivodeship have empty voivodeship
+            columns.
+
+    Raises:
+        ValueError: If the county names are missing.
+    """
+    name_column = next(
+        (col for col in ["JPT_NAZWA_POW", "JPT_NAZWA_"] if col in powiaty.columns), None
+    )
+    if name_column is None:
+        raise ValueError("Missing county name column: JPT_NAZWA_POW or JPT_NAZWA_")
+
+    powiaty = powiaty.to_crs(wojewodztwa.crs)
+    assignment = assign_to_parents(powiaty, wojewodztwa)
+
+    # Take the voivodeship columns of the assigned parents
+    parent = assignment["parent"].to_numpy()
+    found = parent >= 0
+    teryt_woj = np.full(len(powiaty), None, dtype=object)
+    nazwa_woj = np.full(len(powiaty), None, dtype=object)
+    teryt_woj[found] = wojewodztwa["JPT_KOD_JE"].to_numpy()[parent[found]]
+    nazwa_woj[found] = normalize_names(wojewodztwa["JPT_NAZWA_"]).to_numpy()[
+        parent[found]
+    ]
+
+    full_name = (
+        powiaty["full_name"].to_numpy()
+        if "full_name" in powiaty.columns
+        else np.full(len(powiaty), None, dtype=object)
+    )
+    return pd.DataFrame(
+        {
+            "TERYT_POW": powiaty["JPT_KOD_JE"].to_numpy(),
+            "Powiat": normalize_names(powiaty[name_column])
+            .str.replace(r"^powiat ", "", regex=True)
+            .to_numpy(),
+            "full_name": full_name,
+            "TERYT_WOJ": teryt_woj,
+            "Województwo": nazwa_woj,
+            "Metoda": assignment["method"].to_numpy(),
+        },
+        columns=TERYT_LOOKUP_COLUMNS,
+    )
+
+
+def load_teryt_lookup(lookup_path, powiaty_path, wojewodztwa_path):
+    """
+    Loads the county lookup table, rebuilding it if the boundary files are newer.
+
+    Args:
+        lookup_path (str): Path of the persisted lookup table (CSV).
+        powiaty_path (str): Path of the county boundary file.
+        wojewodztwa_path (str): Path of the voivodeship boundary file.
+
+    Returns:
+        pd.DataFrame: The lookup table, with TERYT codes as strings.
+    """
+    lookup_path = Path(lookup_path)
+    sources_mtime = max(
+        os.stat(powiaty_path).st_mtime_ns, os.stat(wojewodztwa_path).st_mtime_ns
+    )
+    if not lookup_path.is_file() or lookup_path.stat().st_mtime_ns < sources_mtime:
+        lookup = build_teryt_lookup(
+            load_geometries(powiaty_path), load_geometries(wojewodztwa_path)
+        )
+        lookup_path.parent.mkdir(parents=True, exist_ok=True)
+        write_csv(lookup, lookup_path, index=False)
+
+    return read_csv(lookup_path, dtype={"TERYT_POW": str, "TERYT_WOJ": str})
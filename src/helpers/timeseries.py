@@ -0,0 +1,175 @@
+"""Dense year × entity time series and their trend metrics.
+
+A measure is summed once into a dense matrix with years as rows and entities
+(regions, counties, ICD-10 codes) as columns. The trend metrics are computed on the
+whole matrix at once, so they cost the same for ten entities or for every county
+and ICD-10 code.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Number of years of the rolling means
+ROLLING_WINDOW = 3
+
+
+def time_series_matrix(
+    df, entity_column, value_column, year_column="Rok", entities=None
+):
+    """
+    Sums a measure into a dense year × entity matrix.
+
+    Args:
+        df (pd.DataFrame): Data with the year, entity and value columns.
+        entity_column (str): Column identifying the entities.
+        value_column (str): Column to sum.
+        year_column (str, optional): Column with the years. Defaults to "Rok".
+        entities (list, optional): Entities to include, in the order of the columns.
+            Defaults to all entities, sorted.
+
+    Returns:
+        pd.DataFrame: Sums with years as the index and entities as columns. Cells
+            without data are NaN. Integer measures keep their dtype when no cell is
+            missing.
+    """
+    year_codes, years = pd.factorize(df[year_column], sort=True)
+    if entities is None:
+        entity_codes, entities = pd.factorize(df[entity_column], sort=True)
+        entities = pd.Index(entities)
+    else:
+        entities = pd.Index(list(entities))
+        entity_codes = entities.get_indexer(df[entity_column])
+
+    # Sum every cell with one bincount over the flattened matrix
+    values = df[value_column].to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = (year_codes >= 0) & (entity_codes >= 0) & ~np.isnan(values)
+    cells = year_codes[valid] * len(entities) + entity_codes[valid]
+    size = len(years) * len(entities)
+    sums = np.bincount(cells, weights=values[valid], minlength=size)
+    sums[np.bincount(cells, minlength=size) == 0] = np.nan
+
+    matrix = pd.DataFrame(
+        sums.reshape(len(years), len(entities)),
+        index=pd.Index(years, name=year_column),
+        columns=pd.Index(entities, name=entity_column),
+    )
+    if pd.api.types.is_integer_dtype(df[value_column]) and not matrix.isna().any(
+        axis=None
+    ):
+        matrix = matrix.astype(df[value_column].dtype)
+    return matrix
+
+
+def share_of_total(matrix):
+    """
+    Returns the percentage share of every entity in the yearly total.
+
+    Args:
+        matrix (pd.DataFrame): Year × entity matrix.
+
+    Returns:
+        pd.DataFrame: Percentages of the row totals.
+    """
+    return matrix.div(matrix.sum(axis=1), axis=0) * 100
+
+
+def year_over_year(matrix):
+    """
+    Returns the percentage change of every entity from the previous year.
+
+    Args:
+        matrix (pd.DataFrame): Year × entity matrix.
+
+    Returns:
+        pd.DataFrame: Percentage changes. The first year, changes from zero and years
+            following a missing value are NaN.
+    """
+    values = matrix.to_numpy(dtype=np.float64)
+    change = np.full(values.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change[1:] = (values[1:] / values[:-1] - 1) * 100
+    change[~np.isfinite(change)] = np.nan
+    return pd.DataFrame(change, index=matrix.index, columns=matrix.columns)
+
+
+def cagr(matrix):
+    """
+    Returns the compound annual growth rate of every entity.
+
+    The rate is computed between the first and the last year with data of each
+    entity, over the number of years between them.
+
+    Args:
+        matrix (pd.DataFrame): Year × entity matrix with numeric years as the index.
+
+    Returns:
+        pd.Series: Growth rates in percent by entity. Entities with data in fewer than
+            two years or a non-positive first value are NaN.
+    """
+    values = matrix.to_numpy(dtype=np.float64)
+    years = matrix.index.to_numpy(dtype=np.float64)
+    present = ~np.isnan(values)
+    entity_positions = np.arange(values.shape[1])
+
+    # Positions of the first and last year with data of every entity
+    first = np.argmax(present, axis=0)
+    last = len(years) - 1 - np.argmax(present[::-1], axis=0)
+    periods = years[last] - years[first]
+    start = values[first, entity_positions]
+    end = values[last, entity_positions]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rates = ((end / start) ** (1 / periods) - 1) * 100
+    rates[~present.any(axis=0) | (periods <= 0) | (start <= 0)] = np.nan
+    return pd.Series(rates, index=matrix.columns, name="CAGR")
+
+
+def rolling_mean(matrix, window=ROLLING_WINDOW):
+    """
+    Returns the rolling mean of every entity over consecutive rows (years).
+
+    Args:
+        matrix (pd.DataFrame): Year × entity matrix.
+        window (int, optional): Number of years of the window. Defaults to
+            ROLLING_WINDOW.
+
+    Returns:
+        pd.DataFrame: Rolling means of the non-missing values, over the available
+            years at the start.
+    """
+    values = matrix.to_numpy(dtype=np.float64)
+    present = ~np.isnan(values)
+
+    # Window sums as differences of cumulative sums, for all entities at once
+    sums = np.vstack(
+        [np.zeros(values.shape[1]), np.cumsum(np.where(present, values, 0), axis=0)]
+    )
+    counts = np.vstack([np.zeros(values.shape[1]), np.cumsum(present, axis=0)])
+    starts = np.maximum(np.arange(1, len(values) + 1) - window, 0)
+    window_sums = sums[1:] - sums[starts]
+    window_counts = counts[1:] - counts[starts]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = np.where(window_counts > 0, window_sums / window_counts, np.nan)
+    return pd.DataFrame(means, index=matrix.index, columns=matrix.columns)
+
+
+def trend_metrics(matrix, window=ROLLING_WINDOW):
+    """
+    Computes all trend metrics of a year × entity matrix.
+
+    Args:
+        matrix (pd.DataFrame): Year × entity matrix.
+        window (int, optional): Number of years of the rolling means. Defaults to
+            ROLLING_WINDOW.
+
+    Returns:
+        dict: The "value" matrix, its "share" of the yearly totals, the "yoy" changes
+            and the "rolling" means as DataFrames, and the "cagr" by entity as a Series.
+    """
+    return {
+        "value": matrix,
+        "share": share_of_total(matrix),
+        "yoy": year_over_year(matrix),
+        "rolling": rolling_mean(matrix, window),
+        "cagr": cagr(matrix),
+    }
@@ -3,7 +3,44 @@ import os
 from typing import Optional, List, Dict
 from pathlib import Path
 import pandas as pd
+import numpy as np
 import glob
+import hashlib
+import json
+import shutil
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from itertools import combinations
+
+try:
+    import pyarrow  # noqa: F401
+
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+try:
+    import xlsxwriter  # noqa: F401
+
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    XLSXWRITER_AVAILABLE = False
+
+# Columnar cache for parsed CSV files (see read_csv)
+CSV_CACHE_DIRNAME = ".cache"
+CSV_CACHE_MAX_BYTES = 2 * 1024**3
+
+# Types of the cache artifacts: Parquet files and measure store directories
+CACHE_ARTIFACT_SUFFIXES = (".parquet", ".measures")
+
+# Number of index bits of the HyperLogLog sketch used by analyze_dataframe
+HLL_PRECISION = 14
+
+# Label of the grand total row produced by the empty grouping set in aggregate_sum
+GROUPING_TOTAL_LABEL = "Total"
 
 
 def get_files_paths(main_folder, dataset_name, extension):
@@ -17,37 +54,201 @@ def get_files_paths(main_folder, dataset_name, extension):
         extension (str): File extension to search for (e.g., 'csv', 'xlsx').
 
     Returns:
-        list: List of file paths that match the criteria.
+        list: Sorted list of file paths that match the criteria.
     """
     pattern = os.path.join(main_folder, "**", f"{dataset_name}*.{extension}")
-    file_list = glob.glob(pattern, recursive=True)
+    file_list = sorted(glob.glob(pattern, recursive=True))
     return file_list
 
 
-def load_files(file_paths):
+def read_file(path, **kwargs):
     """
-    Reads multiple files based on their extension and combines them into a single DataFrame.
+    Reads a single CSV or Excel file based on its extension.
 
     Args:
-        file_paths (list): List of file paths to be loaded.
+        path (str): Path of the file to read.
+        **kwargs: Additional arguments passed to read_csv or read_excel.
 
     Returns:
-        pd.DataFrame: Combined DataFrame containing data from all files.
+        pd.DataFrame: The contents of the file.
+
+    Raises:
+        ValueError: If the file format is not supported.
     """
-    dataframes = []
+    extension = os.path.splitext(path)[-1].lower()
+    if extension == ".csv":
+        return read_csv(path, **kwargs)
+    elif extension == ".xlsx":
+        return read_excel(path, **kwargs)
+    else:
+        raise ValueError(f"Unsupported file format: {extension}")
 
-    for path in file_paths:
-        extension = os.path.splitext(path)[-1].lower()
-        if extension == ".csv":
-            df = read_csv(path)
-        elif extension == ".xlsx":
-            df = read_excel(path)
+
+# Reader arguments that conflict with a header-only read
+_ROW_READ_ARGUMENTS = ("nrows", "chunksize", "iterator", "skipfooter", "use_cache")
+
+
+def read_file_columns(path, **kwargs):
+    """
+    Reads only the header of a CSV or Excel file.
+
+    Args:
+        path (str): Path of the file to inspect.
+        **kwargs: Arguments of the full read (e.g. `sep`, `encoding`, `usecols`,
+            `skiprows`), so the header is parsed the same way. Arguments that only
+            affect the rows are ignored.
+
+    Returns:
+        list: Column names of the file.
+    """
+    kwargs = {
+        key: value for key, value in kwargs.items() if key not in _ROW_READ_ARGUMENTS
+    }
+    extension = os.path.splitext(path)[-1].lower()
+    if extension == ".csv":
+        # Header-only reads are cheap and not worth a cache entry
+        return list(read_csv(path, use_cache=False, nrows=0, **kwargs).columns)
+    return list(read_file(path, nrows=0, **kwargs).columns)
+
+
+def check_files_schema(file_paths, **kwargs):
+    """
+    Checks that all files share the same set of columns, reading only their headers.
+
+    Args:
+        file_paths (list): List of file paths to check.
+        **kwargs: Reader arguments of the files, see read_file_columns.
+
+    Returns:
+        list: Column names of the first file.
+
+    Raises:
+        ValueError: If any file has a different set of columns than the first one.
+    """
+    reference_columns = read_file_columns(file_paths[0], **kwargs)
+    for path in file_paths[1:]:
+        columns = read_file_columns(path, **kwargs)
+        if set(columns) != set(reference_columns):
+            missing = sorted(set(reference_columns) - set(columns))
+            extra = sorted(set(columns) - set(reference_columns))
+            raise ValueError(
+                f"Schema mismatch in {path} compared to {file_paths[0]}. "
+                f"Missing columns: {missing}. Extra columns: {extra}."
+            )
+    return reference_columns
+
+
+def combine_dataframes(dataframes, columns=None, consume=False):
+    """
+    Combines DataFrames with the same columns into a single DataFrame.
+
+    Every column of the result is allocated once with its final length and filled
+    slice by slice. With `consume`, the copied columns are dropped from the input
+    DataFrames right away, so at peak only one extra column is held in memory.
+    Columns with differing or extension dtypes fall back to pandas concatenation.
+    DataFrames with differing columns are concatenated with pandas on the union of
+    their columns, missing values filled with NaN.
+
+    Args:
+        dataframes (list): List of DataFrames to combine.
+        columns (list, optional): Column order of the result. Defaults to the columns
+            of the first DataFrame, or the union of the columns if they differ.
+        consume (bool, optional): Whether to empty the input DataFrames in place while
+            combining them. Only for DataFrames the caller no longer needs.
+            Defaults to False.
+
+    Returns:
+        pd.DataFrame: Combined DataFrame with a fresh RangeIndex.
+
+    Raises:
+        ValueError: If the list of DataFrames is empty.
+    """
+    if not dataframes:
+        raise ValueError("No DataFrames to combine.")
+
+    # Frames with differing columns are concatenated on the union of their columns
+    first_columns = set(dataframes[0].columns)
+    if any(set(df.columns) != first_columns for df in dataframes[1:]):
+        combined_df = pd.concat(dataframes, ignore_index=True)
+        return combined_df if columns is None else combined_df.reindex(columns=columns)
+
+    if columns is None:
+        columns = list(dataframes[0].columns)
+
+    lengths = [len(df) for df in dataframes]
+    offsets = np.cumsum([0] + lengths)
+
+    combined = {}
+    for col in columns:
+        parts = [df[col] for df in dataframes]
+        dtypes = {part.dtype for part in parts}
+        dtype = next(iter(dtypes))
+
+        if len(dtypes) == 1 and isinstance(dtype, np.dtype):
+            values = np.empty(offsets[-1], dtype=dtype)
+            for part, start, stop in zip(parts, offsets[:-1], offsets[1:]):
+                values[start:stop] = part.to_numpy()
         else:
-            raise ValueError(f"Unsupported file format: {extension}")
+            values = pd.concat(parts, ignore_index=True)
+
+        combined[col] = values
+
+        # Release the source column so that only one copy of it stays alive
+        del parts
+        if consume:
+            for df in dataframes:
+                del df[col]
+
+    return pd.DataFrame(combined, columns=columns, copy=False)
+
+
+def load_files(
+    file_paths, max_workers=None, executor="thread", check_schema=True, **kwargs
+):
+    """
+    Reads multiple files in parallel and combines them into a single DataFrame.
+
+    Args:
+        file_paths (list): List of file paths to be loaded.
+        max_workers (int, optional): Number of parallel workers. Defaults to the
+            executor's default. Use 1 to read the files sequentially.
+        executor (str, optional): Pool type, 'thread' or 'process'. Defaults to 'thread'.
+        check_schema (bool, optional): Whether to check that all files share the same
+            columns before reading them. If False, the result has the union of the
+            columns of all files. Defaults to True.
+        **kwargs: Additional arguments passed to read_csv or read_excel.
+
+    Returns:
+        pd.DataFrame: Combined DataFrame containing data from all files, in the order
+            of `file_paths`.
+
+    Raises:
+        ValueError: If no files are given, the executor is unknown or the schemas differ.
+    """
+    if not file_paths:
+        raise ValueError("No files to load.")
 
-        dataframes.append(df)
+    executors = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
+    if executor not in executors:
+        raise ValueError(
+            f"Invalid executor '{executor}'. Use one of: {', '.join(executors)}."
+        )
+
+    columns = check_files_schema(file_paths, **kwargs) if check_schema else None
+
+    read = partial(read_file, **kwargs)
+    if max_workers == 1 or len(file_paths) == 1:
+        dataframes = [read(path) for path in file_paths]
+    else:
+        # Executor.map yields results in the order of the input paths
+        with executors[executor](max_workers=max_workers) as pool:
+            dataframes = list(pool.map(read, file_paths))
 
-    combined_df = pd.concat(dataframes, ignore_index=True)
+    if columns is not None:
+        columns = [col for col in columns if col in dataframes[0].columns]
+
+    # The frames read here are not shared, they can be emptied while combining
+    combined_df = combine_dataframes(dataframes, columns=columns, consume=True)
     return combined_df
 
 
@@ -104,12 +305,300 @@ def create_folder(folder_path):
         print(f"Folder {folder_path} already exists.")
 
 
-def read_csv(file_path, **kwargs):
+def get_csv_cache_dir(file_path, cache_dir=None):
+    """
+    Returns the directory holding the columnar cache of a CSV file.
+
+    Args:
+        file_path (str): The path to the source CSV file.
+        cache_dir (str, optional): Explicit cache directory. Defaults to a
+            `.cache` folder next to the source file.
+
+    Returns:
+        Path: The cache directory.
+    """
+    if cache_dir is not None:
+        return Path(cache_dir)
+    return Path(file_path).parent / CSV_CACHE_DIRNAME
+
+
+def _csv_cache_source_key(file_path):
+    """Returns a short hash identifying the source CSV file by its absolute path."""
+    source = str(Path(file_path).resolve())
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+
+
+def _cache_key_value(value):
+    """Converts a value of a cache key that JSON cannot encode to a stable form."""
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    if isinstance(value, type):
+        # Types such as `str` in a dtype mapping are identified by their name
+        return f"{value.__module__}.{value.__qualname__}"
+    if isinstance(value, (np.dtype, pd.api.extensions.ExtensionDtype, Path)):
+        return str(value)
+    raise TypeError(f"Value of type {type(value).__name__} cannot be part of a key.")
+
+
+def cache_key_digest(key):
+    """
+    Hashes the parameters identifying a cache artifact.
+
+    The key is encoded as JSON with sorted dict keys and sets, so equal parameters
+    give the same digest in every session.
+
+    Args:
+        key (dict): Parameters identifying the artifact.
+
+    Returns:
+        str: A short hash of the key.
+
+    Raises:
+        ValueError: If the key holds values without a stable representation, such
+            as functions or file handles.
+    """
+    try:
+        key_json = json.dumps(key, sort_keys=True, default=_cache_key_value)
+    except TypeError as e:
+        raise ValueError(f"Cache key is not serializable: {e}")
+    return hashlib.sha1(key_json.encode("utf-8")).hexdigest()[:16]
+
+
+def cache_artifact_path(file_path, key, cache_dir=None, suffix=".parquet"):
+    """
+    Builds the path of a cache artifact derived from a source file.
+
+    The name is made of three hashes: the source path, the source size and
+    modification time, and the key of the artifact (e.g. the read arguments), so the
+    artifact is invalidated when the source changes. Artifacts are Parquet files or
+    directories, identified by one of the CACHE_ARTIFACT_SUFFIXES.
+
+    Args:
+        file_path (str): The path to the source file.
+        key (dict): Parameters identifying the artifact among those of the source.
+        cache_dir (str, optional): Explicit cache directory. Defaults to the `.cache`
+            folder next to the source file.
+        suffix (str, optional): Type of the artifact. Defaults to ".parquet".
+
+    Returns:
+        Path: The path of the artifact.
+
+    Raises:
+        ValueError: If the suffix is not one of CACHE_ARTIFACT_SUFFIXES or the key is
+            not serializable (see cache_key_digest).
+    """
+    if suffix not in CACHE_ARTIFACT_SUFFIXES:
+        raise ValueError(
+            f"Unknown cache artifact type '{suffix}'. "
+            f"Use one of: {', '.join(CACHE_ARTIFACT_SUFFIXES)}."
+        )
+    stat = os.stat(file_path)
+    stamp = f"{stat.st_size}:{stat.st_mtime_ns}"
+    stamp_key = hashlib.sha1(stamp.encode("utf-8")).hexdigest()[:16]
+    key_hash = cache_key_digest(key)
+    file_name = f"{_csv_cache_source_key(file_path)}-{stamp_key}-{key_hash}{suffix}"
+    return get_csv_cache_dir(file_path, cache_dir) / file_name
+
+
+def _cache_artifacts(cache_dir, source_key="*"):
+    """Returns the cache artifacts of all types in a directory, optionally of one source."""
+    cache_dir = Path(cache_dir)
+    return [
+        entry
+        for suffix in CACHE_ARTIFACT_SUFFIXES
+        for entry in cache_dir.glob(f"{source_key}-*{suffix}")
+    ]
+
+
+def _cache_artifact_size(entry):
+    """Returns the size of a cache artifact file or directory in bytes."""
+    if entry.is_dir():
+        return sum(path.stat().st_size for path in entry.rglob("*") if path.is_file())
+    return entry.stat().st_size
+
+
+def _artifact_stat(entry):
+    """Returns the access time and size of a cache artifact, or None if it was removed."""
+    try:
+        return entry.stat().st_mtime, _cache_artifact_size(entry)
+    except FileNotFoundError:
+        # Another thread or process has evicted the artifact in the meantime
+        return None
+
+
+def temporary_artifact_path(artifact_path):
+    """
+    Returns a temporary path next to a cache artifact, unique to the calling thread.
+
+    Artifacts are written to the temporary path and moved in place, so concurrent
+    readers never see a partial artifact and concurrent writers never share a file.
+
+    Args:
+        artifact_path (Path): Path of the artifact.
+
+    Returns:
+        Path: The temporary path.
+    """
+    artifact_path = Path(artifact_path)
+    return artifact_path.with_name(
+        f"{artifact_path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    )
+
+
+def _remove_cache_artifact(entry):
+    """Removes a cache artifact file or directory."""
+    if entry.is_dir():
+        shutil.rmtree(entry, ignore_errors=True)
+    else:
+        entry.unlink(missing_ok=True)
+
+
+def remove_stale_cache_artifacts(artifact_path):
+    """
+    Removes the artifacts of all types built from an older version of the same source.
+
+    Args:
+        artifact_path (Path): Path of a current artifact, from cache_artifact_path.
+
+    Returns:
+        int: Number of removed artifacts.
+    """
+    artifact_path = Path(artifact_path)
+    source_key, stamp_key, _ = artifact_path.stem.split("-")
+    if not artifact_path.parent.is_dir():
+        return 0
+
+    # Artifacts of the same source with another size/mtime stamp are outdated
+    removed = 0
+    for entry in _cache_artifacts(artifact_path.parent, source_key):
+        if entry.stem.split("-")[1] != stamp_key:
+            _remove_cache_artifact(entry)
+            removed += 1
+    return removed
+
+
+def touch_cache_artifact(artifact_path):
+    """
+    Marks a cache artifact as used, refreshing the time the eviction policy uses.
+
+    Args:
+        artifact_path (Path): Path of the artifact.
+    """
+    os.utime(artifact_path)
+
+
+def write_cache_artifact(df, artifact_path):
+    """
+    Writes a DataFrame as a Parquet cache artifact and removes stale artifacts of the
+    same source.
+
+    Args:
+        df (pd.DataFrame): The DataFrame (or GeoDataFrame) to store.
+        artifact_path (Path): Path of the artifact, from cache_artifact_path.
+
+    Returns:
+        bool: True if the artifact was written.
+    """
+    artifact_path = Path(artifact_path)
+    artifact_path.parent.mkdir(parents=True, exist_ok=True)
+    remove_stale_cache_artifacts(artifact_path)
+
+    # Write to a temporary file first so that concurrent readers never see a partial file
+    tmp_path = temporary_artifact_path(artifact_path)
+    try:
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, artifact_path)
+    except Exception as e:
+        tmp_path.unlink(missing_ok=True)
+        print(f"Skipping cache artifact {artifact_path}: {e}")
+        return False
+    return True
+
+
+def evict_csv_cache(cache_dir, max_bytes=CSV_CACHE_MAX_BYTES):
+    """
+    Removes the least recently used cache artifacts until the cache fits in `max_bytes`.
+
+    Artifacts of every type count towards the size of the cache: parsed CSV files,
+    derived tables such as the ICD-10 cube or the geometry store, and measure store
+    directories.
+
+    Args:
+        cache_dir (str): The cache directory to trim.
+        max_bytes (int): Maximum total size of the cache in bytes.
+
+    Returns:
+        list: Paths of the removed cache artifacts.
+    """
+    cache_dir = Path(cache_dir)
+    if not cache_dir.is_dir():
+        return []
+
+    # Cache hits refresh the modification time, so it doubles as the access time
+    entries = []
+    for entry in _cache_artifacts(cache_dir):
+        stat = _artifact_stat(entry)
+        if stat is not None:
+            entries.append((*stat, str(entry), entry))
+    entries.sort()
+    total_bytes = sum(size for _, size, _, _ in entries)
+
+    removed = []
+    for _, size, _, entry in entries:
+        if total_bytes <= max_bytes:
+            break
+        _remove_cache_artifact(entry)
+        total_bytes -= size
+        removed.append(entry)
+    return removed
+
+
+def clear_csv_cache(file_path=None, cache_dir=None):
+    """
+    Invalidates the cache artifacts of a source file or of a whole cache directory.
+
+    Args:
+        file_path (str, optional): Source file whose cache artifacts of every type
+            should be removed. If None, the whole cache directory is cleared.
+        cache_dir (str, optional): The cache directory. Required if `file_path` is None.
+
+    Returns:
+        int: Number of removed cache artifacts.
+
+    Raises:
+        ValueError: If neither `file_path` nor `cache_dir` is given.
+    """
+    if file_path is None and cache_dir is None:
+        raise ValueError("Either file_path or cache_dir must be provided.")
+
+    cache_dir = get_csv_cache_dir(file_path, cache_dir)
+    if not cache_dir.is_dir():
+        return 0
+
+    source_key = "*" if file_path is None else _csv_cache_source_key(file_path)
+    entries = _cache_artifacts(cache_dir, source_key)
+    for entry in entries:
+        _remove_cache_artifact(entry)
+    return len(entries)
+
+
+def read_csv(file_path, use_cache=True, cache_dir=None, **kwargs):
     """
     Read a CSV file and return its content as a pandas DataFrame.
 
+    Parsed files are kept in a columnar (Parquet) cache keyed by the source path,
+    size, modification time and read arguments, so a later read of an unchanged
+    file loads typed columns directly from the cache. The cache is skipped when
+    pyarrow is not installed, when a chunked reader is requested or when the read
+    arguments cannot be serialized (e.g. converter functions).
+
     Args:
         file_path (str): The path to the CSV file.
+        use_cache (bool, optional): Whether to use the columnar cache. Defaults to True.
+        cache_dir (str, optional): Cache directory. Defaults to a `.cache` folder
+            next to the CSV file.
         **kwargs: Additional arguments to pass to pandas.read_csv.
 
     Returns:
@@ -120,11 +609,41 @@ def read_csv(file_path, **kwargs):
         ValueError: If the file cannot be read.
     """
     check_file_exists(file_path, f"CSV file not found: {file_path}")
+
+    # Chunked readers cannot be cached as a single frame
+    use_cache = (
+        use_cache
+        and PARQUET_AVAILABLE
+        and kwargs.get("chunksize") is None
+        and not kwargs.get("iterator", False)
+    )
+
+    cache_path = None
+    if use_cache:
+        try:
+            cache_path = cache_artifact_path(file_path, kwargs, cache_dir)
+        except ValueError:
+            # Arguments such as converter functions cannot identify a cached frame
+            cache_path = None
+        if cache_path is not None and cache_path.is_file():
+            try:
+                df = pd.read_parquet(cache_path)
+                # Refresh the access time used by the eviction policy
+                touch_cache_artifact(cache_path)
+                return df
+            except Exception:
+                cache_path.unlink(missing_ok=True)
+
     try:
-        return pd.read_csv(file_path, **kwargs)
+        df = pd.read_csv(file_path, **kwargs)
     except Exception as e:
         raise ValueError(f"Failed to read CSV file: {file_path}\nError: {e}")
 
+    if cache_path is not None and write_cache_artifact(df, cache_path):
+        evict_csv_cache(cache_path.parent)
+
+    return df
+
 
 def write_csv(data, file_path, **kwargs):
     """
@@ -145,47 +664,434 @@ def write_csv(data, file_path, **kwargs):
         raise ValueError(f"Failed to write CSV file: {file_path}\nError: {e}")
 
 
-def filter_dataframe(df, filter_dict):
+FILTER_OPERATORS = (
+    "eq",
+    "ne",
+    "in",
+    "not_in",
+    "gt",
+    "ge",
+    "lt",
+    "le",
+    "between",
+    "isna",
+    "notna",
+)
+
+
+def _is_collection(value):
+    """Checks whether a filter value is a collection of values rather than a scalar."""
+    return isinstance(
+        value, (list, tuple, set, frozenset, np.ndarray, pd.Index, pd.Series)
+    )
+
+
+def _condition_mask(series, condition):
+    """
+    Builds a boolean mask for a single filter condition.
+
+    Args:
+        series (pd.Series): The column to test.
+        condition: A scalar (equality), a collection of values (membership) or a dict
+            mapping operators from FILTER_OPERATORS to their arguments.
+
+    Returns:
+        np.ndarray: Boolean mask. Missing comparison results count as False.
+
+    Raises:
+        ValueError: If the condition uses an unknown operator.
+    """
+    if not isinstance(condition, dict):
+        condition = (
+            {"in": condition} if _is_collection(condition) else {"eq": condition}
+        )
+
+    mask = np.ones(len(series), dtype=bool)
+    for operator, value in condition.items():
+        if operator == "eq":
+            result = series == value
+        elif operator == "ne":
+            result = series != value
+        elif operator == "in":
+            result = series.isin(value)
+        elif operator == "not_in":
+            result = ~series.isin(value)
+        elif operator == "gt":
+            result = series > value
+        elif operator == "ge":
+            result = series >= value
+        elif operator == "lt":
+            result = series < value
+        elif operator == "le":
+            result = series <= value
+        elif operator == "between":
+            lower, upper = value
+            result = series.between(lower, upper)
+        elif operator == "isna":
+            result = series.isna() if value else series.notna()
+        elif operator == "notna":
+            result = series.notna() if value else series.isna()
+        else:
+            raise ValueError(
+                f"Unsupported filter operator '{operator}'. "
+                f"Supported operators are: {', '.join(FILTER_OPERATORS)}."
+            )
+        mask &= result.to_numpy(dtype=bool, na_value=False)
+    return mask
+
+
+def _index_lookup_values(condition):
+    """
+    Returns the values to look up in a filter index, or None if the condition
+    cannot be answered by an index lookup (e.g. ranges or null checks).
+    """
+    if isinstance(condition, dict):
+        if set(condition) == {"eq"}:
+            condition = condition["eq"]
+        elif set(condition) == {"in"}:
+            condition = condition["in"]
+        else:
+            return None
+
+    values = list(condition) if _is_collection(condition) else [condition]
+    if any(pd.isna(value) for value in values):
+        return None
+    return values
+
+
+def build_filter_index(df, columns):
+    """
+    Builds a value-to-positions index for columns that are filtered repeatedly.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to index.
+        columns (list): Columns to index (e.g. "Specjalność komórki", "Rok").
+
+    Returns:
+        dict: Mapping of column name to a dict of value -> sorted row positions.
+            It is only valid for the DataFrame it was built from.
+    """
+    return {col: df.groupby(col, sort=False).indices for col in columns}
+
+
+def filter_dataframe(df, filter_dict, index=None):
     """
     Filters the DataFrame based on conditions specified in a dictionary.
 
+    All conditions are combined into one boolean mask and the result is materialized
+    once. Conditions on columns covered by `index` are answered by position lookups,
+    so they cost O(matches) instead of O(rows).
+
     Args:
         df (pd.DataFrame): The DataFrame to be filtered.
-        filter_dict (dict): Dictionary with column names as keys and filter values as values.
+        filter_dict (dict): Dictionary with column names as keys and conditions as values.
+            A condition can be:
+            - a scalar: equality, e.g. {"Rok": 2023},
+            - a list, tuple or set: membership, e.g. {"Rok": [2022, 2023]},
+            - a dict of operators: {"eq", "ne", "in", "not_in", "gt", "ge", "lt", "le",
+              "between", "isna", "notna"}, e.g. {"Rok": {"between": (2016, 2019)}} or
+              {"Województwo": {"isna": False}}. Several operators are combined with AND.
+        index (dict, optional): Index built with build_filter_index on the same DataFrame.
 
     Returns:
         pd.DataFrame: Filtered DataFrame.
+
+    Raises:
+        ValueError: If a condition uses an unknown operator.
     """
-    for key, value in filter_dict.items():
-        df = df[df[key] == value]
-    return df
+    if not filter_dict:
+        return df
+
+    # Resolve indexed equality/membership conditions to row positions
+    indexed_positions = {}
+    for key, condition in filter_dict.items():
+        lookup_values = _index_lookup_values(condition)
+        if index is None or key not in index or lookup_values is None:
+            continue
+
+        # Positions of distinct values are disjoint, so sorting is enough to merge them
+        matches = [index[key][value] for value in lookup_values if value in index[key]]
+        if len(matches) == 1:
+            indexed_positions[key] = matches[0]
+        elif matches:
+            indexed_positions[key] = np.sort(np.concatenate(matches))
+        else:
+            indexed_positions[key] = np.empty(0, dtype=np.intp)
+
+    if not indexed_positions:
+        # Combine all conditions into one mask over the whole frame
+        mask = np.ones(len(df), dtype=bool)
+        for key, condition in filter_dict.items():
+            mask &= _condition_mask(df[key], condition)
+        return df[mask]
+
+    # Start from the most selective lookup and test the other conditions on its matches
+    start_key = min(indexed_positions, key=lambda key: len(indexed_positions[key]))
+    positions = indexed_positions[start_key]
+    for key, condition in filter_dict.items():
+        if key == start_key or len(positions) == 0:
+            continue
+        positions = positions[_condition_mask(df[key].iloc[positions], condition)]
+    return df.iloc[positions]
+
+
+def stream_filtered_files(
+    file_paths, filter_dict, columns=None, chunksize=500000, **kwargs
+):
+    """
+    Reads files chunk by chunk and yields the rows matching the filter.
 
+    Only one chunk of each file is held in memory at a time, so the raw files do not
+    have to fit in RAM. Excel files cannot be read in chunks and are filtered whole.
 
-def analyze_dataframe(dataframe):
+    Args:
+        file_paths (list): List of file paths to be read.
+        filter_dict (dict): Filter conditions, as accepted by filter_dataframe.
+        columns (list, optional): Columns to keep in the output. Filter columns are
+            read even if they are not listed. Defaults to all columns.
+        chunksize (int, optional): Number of CSV rows read at a time. Defaults to 500000.
+        **kwargs: Additional arguments passed to read_csv or read_excel.
+
+    Yields:
+        pd.DataFrame: Non-empty filtered chunks, in file order.
     """
-    Analyzes DataFrame columns by calculating missing data statistics, unique value counts, and data types.
+    usecols = None
+    if columns is not None:
+        # Read the filter columns too, they are dropped after filtering
+        usecols = list(dict.fromkeys(list(columns) + list(filter_dict)))
+
+    for path in file_paths:
+        extension = os.path.splitext(path)[-1].lower()
+        if extension == ".csv":
+            with read_csv(
+                path, usecols=usecols, chunksize=chunksize, **kwargs
+            ) as reader:
+                for chunk in reader:
+                    filtered_chunk = filter_dataframe(chunk, filter_dict=filter_dict)
+                    if columns is not None:
+                        filtered_chunk = filtered_chunk[list(columns)]
+                    if not filtered_chunk.empty:
+                        yield filtered_chunk
+        else:
+            df = read_file(path, usecols=usecols, **kwargs)
+            filtered_df = filter_dataframe(df, filter_dict=filter_dict)
+            del df
+            if columns is not None:
+                filtered_df = filtered_df[list(columns)]
+            if not filtered_df.empty:
+                yield filtered_df
+
+
+def load_filtered_files(
+    file_paths, filter_dict, columns=None, chunksize=500000, **kwargs
+):
+    """
+    Reads files in chunks, filters them and combines the matching rows into one DataFrame.
 
     Args:
-        dataframe (pd.DataFrame): Input DataFrame for analysis.
+        file_paths (list): List of file paths to be read.
+        filter_dict (dict): Filter conditions, as accepted by filter_dataframe.
+        columns (list, optional): Columns to keep in the output. Defaults to all columns.
+        chunksize (int, optional): Number of CSV rows read at a time. Defaults to 500000.
+        **kwargs: Additional arguments passed to read_csv or read_excel.
 
     Returns:
-        pd.DataFrame: Analysis results with columns:
-            - column_name: Name of each column
-            - missing_values_total: Count of missing values
-            - missing_values_percent: Percentage of missing values
-            - unique_values_count: Count of unique values
-            - data_type: Data type of each column
+        pd.DataFrame: Combined DataFrame with the filtered rows of all files.
+
+    Raises:
+        ValueError: If no files are given.
     """
-    results = []
+    if not file_paths:
+        raise ValueError("No files to load.")
+
+    filtered_dataframes = list(
+        stream_filtered_files(
+            file_paths,
+            filter_dict=filter_dict,
+            columns=columns,
+            chunksize=chunksize,
+            **kwargs,
+        )
+    )
+
+    if not filtered_dataframes:
+        if columns is None:
+            columns = read_file_columns(file_paths[0])
+        return pd.DataFrame(columns=list(columns))
+
+    return combine_dataframes(filtered_dataframes, consume=True)
+
+
+def _hash_column_values(series):
+    """
+    Hashes the non-null values of a column to 64-bit integers.
+
+    Numeric columns are hashed as floats so that a column read as int64 in one chunk
+    and as float64 (because of missing values) in another one hashes identically.
+    """
+    values = series.dropna()
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        values = values.astype("float64")
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+def _bit_length(values):
+    """Returns the bit length of each element of an uint64 array."""
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    # frexp is exact for 32-bit integers stored as floats
+    return np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1])
+
+
+def _hll_registers(hashes, precision):
+    """
+    Builds HyperLogLog registers from 64-bit hashes.
+
+    The first `precision` bits select a register and the register keeps the maximum
+    position of the leftmost set bit in the remaining bits.
+    """
+    registers = np.zeros(1 << precision, dtype=np.uint8)
+    if len(hashes) == 0:
+        return registers
+
+    shift = 64 - precision
+    register_index = (hashes >> np.uint64(shift)).astype(np.intp)
+    remainder = hashes & np.uint64((1 << shift) - 1)
+    rank = (shift - _bit_length(remainder) + 1).astype(np.uint8)
+    np.maximum.at(registers, register_index, rank)
+    return registers
+
+
+def _hll_estimate(registers):
+    """Estimates the number of distinct values from HyperLogLog registers."""
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.sum(np.exp2(-registers.astype(np.float64)))
+
+    # Small range correction (linear counting)
+    empty_registers = np.count_nonzero(registers == 0)
+    if estimate <= 2.5 * m and empty_registers:
+        estimate = m * np.log(m / empty_registers)
+    return int(round(estimate))
+
+
+def profile_dataframe(dataframe, approximate=False, precision=HLL_PRECISION):
+    """
+    Computes mergeable column statistics of a DataFrame or of one chunk of a file.
 
+    Args:
+        dataframe (pd.DataFrame): Input DataFrame or chunk.
+        approximate (bool, optional): Whether to count distinct values with a
+            HyperLogLog sketch instead of exact hash sets. Defaults to False.
+        precision (int, optional): Number of HyperLogLog index bits. The relative
+            error is about 1.04 / sqrt(2 ** precision). Defaults to HLL_PRECISION.
+
+    Returns:
+        dict: Partial profile that can be combined with merge_profiles.
+    """
+    missing_totals = dataframe.isna().sum()
+
+    columns = {}
     for col in dataframe.columns:
-        missing_total = dataframe[col].isnull().sum()
-        missing_percent = 100 * missing_total / len(dataframe)
+        hashes = _hash_column_values(dataframe[col])
+        columns[col] = {
+            "missing": int(missing_totals[col]),
+            "dtype": dataframe[col].dtype,
+            "distinct": (
+                _hll_registers(hashes, precision) if approximate else np.unique(hashes)
+            ),
+        }
+
+    return {
+        "rows": len(dataframe),
+        "approximate": approximate,
+        "precision": precision,
+        "columns": columns,
+    }
+
+
+def _merge_dtypes(left, right):
+    """Returns the dtype able to hold the values of two chunks of the same column."""
+    if left == right:
+        return left
+    if isinstance(left, np.dtype) and isinstance(right, np.dtype):
+        if pd.api.types.is_numeric_dtype(left) and pd.api.types.is_numeric_dtype(right):
+            return np.result_type(left, right)
+    return np.dtype("object")
+
+
+def merge_profiles(left, right):
+    """
+    Merges two partial profiles created by profile_dataframe.
+
+    Args:
+        left (dict): First partial profile.
+        right (dict): Second partial profile.
+
+    Returns:
+        dict: Profile describing the rows of both inputs.
+
+    Raises:
+        ValueError: If the profiles use different distinct-count modes.
+    """
+    if (left["approximate"], left["precision"]) != (
+        right["approximate"],
+        right["precision"],
+    ):
+        raise ValueError("Cannot merge profiles with different distinct-count modes.")
+
+    columns = {}
+    for col in list(dict.fromkeys(list(left["columns"]) + list(right["columns"]))):
+        left_stats = left["columns"].get(col)
+        right_stats = right["columns"].get(col)
+        if left_stats is None or right_stats is None:
+            # A column missing from one side is entirely missing there
+            stats = dict(left_stats or right_stats)
+            absent_rows = right["rows"] if left_stats is not None else left["rows"]
+            stats["missing"] += absent_rows
+            columns[col] = stats
+            continue
+
+        if left["approximate"]:
+            distinct = np.maximum(left_stats["distinct"], right_stats["distinct"])
+        else:
+            distinct = np.union1d(left_stats["distinct"], right_stats["distinct"])
 
-        unique_count = dataframe[col].nunique()
-        data_type = dataframe[col].dtype
+        columns[col] = {
+            "missing": left_stats["missing"] + right_stats["missing"],
+            "dtype": _merge_dtypes(left_stats["dtype"], right_stats["dtype"]),
+            "distinct": distinct,
+        }
 
-        results.append([col, missing_total, missing_percent, unique_count, data_type])
+    return {
+        "rows": left["rows"] + right["rows"],
+        "approximate": left["approximate"],
+        "precision": left["precision"],
+        "columns": columns,
+    }
+
+
+def profile_to_dataframe(profile):
+    """
+    Converts a profile into the analysis table returned by analyze_dataframe.
+
+    Args:
+        profile (dict): Profile created by profile_dataframe or merge_profiles.
+
+    Returns:
+        pd.DataFrame: Analysis results, one row per column.
+    """
+    rows = profile["rows"]
+    results = []
+    for col, stats in profile["columns"].items():
+        missing_percent = 100 * stats["missing"] / rows if rows else np.nan
+        if profile["approximate"]:
+            unique_count = _hll_estimate(stats["distinct"])
+        else:
+            unique_count = len(stats["distinct"])
+        results.append(
+            [col, stats["missing"], missing_percent, unique_count, stats["dtype"]]
+        )
 
     analysis_df = pd.DataFrame(
         results,
@@ -201,51 +1107,207 @@ def analyze_dataframe(dataframe):
     return analysis_df
 
 
-def fill_missing_values_based_on_column_mapping(
-    df, target_col="Województwo", reference_col="Nazwa świadczeniodawcy"
+def analyze_dataframe(dataframe, approximate=False, precision=HLL_PRECISION):
+    """
+    Analyzes DataFrame columns by calculating missing data statistics, unique value counts, and data types.
+
+    Statistics are computed per chunk and merged, so the input can also be an iterable
+    of chunks (e.g. a chunked pandas reader or stream_filtered_files) that never has
+    to be loaded at once.
+
+    Args:
+        dataframe (pd.DataFrame or iterable): Input DataFrame, or an iterable of
+            DataFrame chunks, for analysis.
+        approximate (bool, optional): Whether to estimate unique value counts with a
+            HyperLogLog sketch. Defaults to False (exact counts).
+        precision (int, optional): Number of HyperLogLog index bits. Defaults to
+            HLL_PRECISION.
+
+    Returns:
+        pd.DataFrame: Analysis results with columns:
+            - column_name: Name of each column
+            - missing_values_total: Count of missing values
+            - missing_values_percent: Percentage of missing values
+            - unique_values_count: Count of unique values
+            - data_type: Data type of each column
+
+    Raises:
+        ValueError: If the iterable yields no chunks.
+    """
+    if isinstance(dataframe, pd.DataFrame) and not approximate:
+        # A single frame needs no mergeable state, count everything column-wise
+        missing_totals = dataframe.isna().sum().to_numpy()
+        analysis_df = pd.DataFrame(
+            {
+                "column_name": list(dataframe.columns),
+                "missing_values_total": missing_totals,
+                "missing_values_percent": (
+                    100 * missing_totals / len(dataframe) if len(dataframe) else np.nan
+                ),
+                "unique_values_count": dataframe.nunique().to_numpy(),
+                "data_type": dataframe.dtypes.to_numpy(),
+            }
+        )
+        return analysis_df
+
+    chunks = [dataframe] if isinstance(dataframe, pd.DataFrame) else dataframe
+
+    profile = None
+    for chunk in chunks:
+        chunk_profile = profile_dataframe(
+            chunk, approximate=approximate, precision=precision
+        )
+        profile = (
+            chunk_profile if profile is None else merge_profiles(profile, chunk_profile)
+        )
+
+    if profile is None:
+        raise ValueError("No data to analyze.")
+
+    return profile_to_dataframe(profile)
+
+
+def analyze_files(
+    file_paths, chunksize=500000, approximate=True, precision=HLL_PRECISION, **kwargs
 ):
     """
-    Fills missing values in the target column based on unique values from the reference column.
+    Analyzes CSV files chunk by chunk without loading them into memory.
 
     Args:
-        df (pd.DataFrame): The DataFrame to process.
-        target_col (str): The column in which missing values will be filled.
-        reference_col (str): The column used to map values to the target column.
+        file_paths (list): List of CSV file paths to analyze as one dataset.
+        chunksize (int, optional): Number of rows read at a time. Defaults to 500000.
+        approximate (bool, optional): Whether to estimate unique value counts with a
+            HyperLogLog sketch. Defaults to True.
+        precision (int, optional): Number of HyperLogLog index bits. Defaults to
+            HLL_PRECISION.
+        **kwargs: Additional arguments passed to read_csv.
 
     Returns:
-        pd.DataFrame: DataFrame with filled missing values.
+        pd.DataFrame: Analysis results, as returned by analyze_dataframe.
     """
-    unique_reference_df = (
-        df[[target_col, reference_col]].dropna().drop_duplicates(keep="first")
+
+    def read_chunks():
+        for path in file_paths:
+            with read_csv(path, chunksize=chunksize, **kwargs) as reader:
+                yield from reader
+
+    return analyze_dataframe(
+        read_chunks(), approximate=approximate, precision=precision
     )
 
-    # Check for duplicates in the reference column
-    duplicate_reference_df = unique_reference_df[
-        unique_reference_df[reference_col].duplicated(keep=False)
-    ]
-    duplicate_reference_values = set(duplicate_reference_df[reference_col])
 
-    # Identify rows where target column is missing and reference column is not null
-    missing_target_condition = df[target_col].isna() & df[reference_col].notna()
+def _reference_columns(reference_col):
+    """Returns the reference columns as a list, accepting a single column name."""
+    if isinstance(reference_col, str):
+        return [reference_col]
+    return list(reference_col)
 
-    # Filter rows where reference column value is not duplicated
-    filtered_df = df[
-        missing_target_condition & ~df[reference_col].isin(duplicate_reference_values)
-    ]
 
-    # Create mapping dictionary
-    reference_to_target_mapping = dict(
-        zip(unique_reference_df[reference_col], unique_reference_df[target_col])
-    )
+def build_column_mappings(data, target_col, reference_cols):
+    """
+    Builds the lookup tables of the target column for a list of reference columns.
+
+    Only the distinct (reference, target) pairs of every chunk are kept, so the lookups
+    can be built from data read chunk by chunk (e.g. with stream_filtered_files).
+    Reference values paired with more than one target value are ambiguous and left
+    out of the lookups.
+
+    Args:
+        data (pd.DataFrame or iterable): A DataFrame or an iterable of DataFrame chunks
+            with the target and reference columns.
+        target_col (str): The column to be filled.
+        reference_cols (str or list): Reference column or ordered list of columns.
+
+    Returns:
+        dict: Mapping of every reference column to a pd.Series of target values indexed
+            by the unambiguous reference values.
+    """
+    reference_cols = _reference_columns(reference_cols)
+    chunks = [data] if isinstance(data, pd.DataFrame) else data
+
+    # Collect the distinct pairs of every reference column across the chunks
+    pairs = {col: [] for col in reference_cols}
+    for chunk in chunks:
+        for col in reference_cols:
+            chunk_pairs = chunk[[col, target_col]].dropna().drop_duplicates()
+            pairs[col].append(chunk_pairs)
+            # Merge the collected pairs regularly so they stay small
+            if len(pairs[col]) > 16:
+                pairs[col] = [pd.concat(pairs[col]).drop_duplicates()]
+
+    # Keep the reference values mapped to a single target value
+    mappings = {}
+    for col in reference_cols:
+        if pairs[col]:
+            col_pairs = pd.concat(pairs[col]).drop_duplicates()
+        else:
+            col_pairs = pd.DataFrame(columns=[col, target_col])
+        col_pairs = col_pairs[~col_pairs[col].duplicated(keep=False)]
+        mappings[col] = pd.Series(
+            col_pairs[target_col].to_numpy(), index=col_pairs[col].to_numpy()
+        )
+    return mappings
+
+
+def apply_column_mappings(df, mappings, target_col):
+    """
+    Fills missing values of the target column in place using lookup tables.
+
+    Reference columns are tried in the order of `mappings`: each one fills the rows
+    still missing after the previous ones. Rows are matched by position with a hashed
+    lookup of the reference values, without aligning on the DataFrame index.
 
-    # Fill missing values using the mapping
-    df.loc[filtered_df.index, target_col] = df.loc[
-        filtered_df.index, reference_col
-    ].map(reference_to_target_mapping)
+    Args:
+        df (pd.DataFrame): The DataFrame to fill. Modified in place.
+        mappings (dict): Lookup tables built with build_column_mappings.
+        target_col (str): The column to be filled.
 
+    Returns:
+        pd.DataFrame: The filled DataFrame.
+    """
+    target_position = df.columns.get_loc(target_col)
+    for col, mapping in mappings.items():
+        target_missing = df[target_col].isna().to_numpy()
+        if not target_missing.any():
+            break
+
+        # Rows still missing the target and having a reference value
+        missing = np.flatnonzero(target_missing & df[col].notna().to_numpy())
+        if len(missing) == 0:
+            continue
+
+        codes = pd.Index(mapping.index).get_indexer(df[col].iloc[missing])
+        found = codes >= 0
+        if found.any():
+            df.iloc[missing[found], target_position] = mapping.to_numpy()[codes[found]]
     return df
 
 
+def fill_missing_values_based_on_column_mapping(
+    df, target_col="Województwo", reference_col="Nazwa świadczeniodawcy", mappings=None
+):
+    """
+    Fills missing values in the target column based on unique values from the reference columns.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to process. Modified in place.
+        target_col (str): The column in which missing values will be filled.
+        reference_col (str or list): The column, or ordered list of columns, used to
+            map values to the target column. Later columns fill the rows left missing
+            by the earlier ones.
+        mappings (dict, optional): Lookup tables built with build_column_mappings, e.g.
+            from all chunks of the source files. Defaults to lookups built from `df`.
+
+    Returns:
+        pd.DataFrame: DataFrame with filled missing values.
+    """
+    if mappings is None:
+        mappings = build_column_mappings(df, target_col, reference_col)
+    else:
+        mappings = {col: mappings[col] for col in _reference_columns(reference_col)}
+    return apply_column_mappings(df, mappings, target_col)
+
+
 def read_excel(file_path, **kwargs):
     """
     Read an Excel file and return its content as a pandas DataFrame.
@@ -311,47 +1373,302 @@ def write_excel(file_path: str, data: pd.DataFrame, **kwargs):
         raise ValueError(f"Failed to write to Excel file: {file_path}. Error: {e}")
 
 
-def left_join_excel_sheets(file_path, base_df=None, on=None, **kwargs):
+# Number of rows converted at a time by the streaming Excel writer
+EXCEL_STREAMING_BLOCK_ROWS = 10000
+
+
+def _excel_cell_value(value):
+    """Converts missing values to None, which xlsxwriter writes as blank cells."""
+    if value is None or value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def _write_sheet_rows(workbook, data, sheet_name, index=True, header=True):
+    """
+    Writes a DataFrame to a new xlsxwriter worksheet strictly row by row.
+
+    pandas writes Excel cells column by column, which loses data when the workbook is
+    opened in xlsxwriter's constant_memory mode, where every finished row is flushed
+    to disk. Rows are converted to Python values in blocks to bound memory use.
     """
-    Iteratively left joins all sheets of an Excel file to a base DataFrame.
+    frame = data.reset_index() if index else data
+    worksheet = workbook.add_worksheet(sheet_name)
+
+    row = 0
+    if header:
+        worksheet.write_row(row, 0, [str(col) for col in frame.columns])
+        row += 1
+
+    for start in range(0, len(frame), EXCEL_STREAMING_BLOCK_ROWS):
+        block = frame.iloc[start : start + EXCEL_STREAMING_BLOCK_ROWS]
+        columns = [block[col].tolist() for col in block.columns]
+        for values in zip(*columns):
+            worksheet.write_row(row, 0, [_excel_cell_value(v) for v in values])
+            row += 1
+
+
+@contextmanager
+def excel_writer_session(file_path, engine="openpyxl", constant_memory=False):
+    """
+    Opens an Excel workbook once for writing many sheets.
+
+    The workbook is always created from scratch, so sheets from earlier runs do not
+    survive, and it is saved in a single pass when the session ends.
+
+    Example:
+        with excel_writer_session(file_path) as write_sheet:
+            write_sheet(df_1, sheet_name="Lvl_1", index=False)
+            write_sheet(df_2, sheet_name="Lvl_2", index=False)
+
+    Args:
+        file_path (str): The path to the Excel file.
+        engine (str, optional): Engine to use for writing. Defaults to 'openpyxl'.
+        constant_memory (bool, optional): Whether to stream rows to disk with
+            xlsxwriter's constant_memory mode, keeping memory use flat for large
+            frames. Implies the 'xlsxwriter' engine. Without xlsxwriter installed,
+            the sheets are written in memory with `engine` instead. Defaults to False.
+
+    Yields:
+        callable: Function `write_sheet(data, sheet_name, **kwargs)` writing a DataFrame
+            to a new sheet. In constant_memory mode only `index` and `header` are
+            supported as keyword arguments, otherwise all `DataFrame.to_excel`
+            arguments are accepted.
+
+    Raises:
+        ValueError: If the workbook or a sheet cannot be written.
+    """
+    engine_kwargs = {}
+    if constant_memory and not XLSXWRITER_AVAILABLE:
+        warnings.warn(
+            "xlsxwriter is not installed, writing the workbook without constant_memory."
+        )
+        constant_memory = False
+    if constant_memory:
+        engine = "xlsxwriter"
+        engine_kwargs = {"options": {"constant_memory": True}}
+
+    try:
+        writer = pd.ExcelWriter(
+            file_path, mode="w", engine=engine, engine_kwargs=engine_kwargs
+        )
+    except Exception as e:
+        raise ValueError(f"Failed to write to Excel file: {file_path}. Error: {e}")
+
+    sheet_names = set()
+
+    def write_sheet(data, sheet_name="Sheet1", **kwargs):
+        if sheet_name in sheet_names:
+            raise ValueError(
+                f"Sheet '{sheet_name}' was already written to {file_path}."
+            )
+        sheet_names.add(sheet_name)
+        try:
+            if constant_memory:
+                _write_sheet_rows(writer.book, data, sheet_name, **kwargs)
+            else:
+                data.to_excel(writer, sheet_name=sheet_name, **kwargs)
+        except Exception as e:
+            raise ValueError(
+                f"Failed to write sheet '{sheet_name}' to Excel file: {file_path}. Error: {e}"
+            )
+
+    with writer:
+        yield write_sheet
+
+
+def write_excel_sheets(
+    file_path, sheets, engine="openpyxl", constant_memory=False, **kwargs
+):
+    """
+    Write several DataFrames to the sheets of one Excel file in a single pass.
+
+    Args:
+        file_path (str): The path to the Excel file.
+        sheets (dict): Mapping of sheet name to the DataFrame written to it.
+        engine (str, optional): Engine to use for writing. Defaults to 'openpyxl'.
+        constant_memory (bool, optional): Whether to stream rows with xlsxwriter's
+            constant_memory mode. Defaults to False.
+        **kwargs: Additional arguments for writing every sheet (e.g. `index`).
+
+    Raises:
+        ValueError: If the file cannot be written.
+    """
+    with excel_writer_session(
+        file_path, engine=engine, constant_memory=constant_memory
+    ) as write_sheet:
+        for sheet_name, data in sheets.items():
+            write_sheet(data, sheet_name=sheet_name, **kwargs)
+
+
+def _read_excel_sheets(file_path, max_workers=None, **kwargs):
+    """
+    Reads all sheets of an Excel file.
+
+    Returns:
+        tuple: Dict of sheet name -> DataFrame, and a list of structured errors of the
+            sheets that could not be read.
+
+    Raises:
+        ValueError: If the workbook cannot be read.
+    """
+    if max_workers is None or max_workers == 1:
+        # A single parse of the workbook returns every sheet at once
+        return read_excel(file_path, sheet_name=None, **kwargs), []
+
+    try:
+        with pd.ExcelFile(file_path) as excel_file:
+            sheet_names = excel_file.sheet_names
+    except Exception as e:
+        raise ValueError(f"Failed to read Excel file: {file_path}. Error: {e}")
+
+    # Decode the sheets in parallel worker processes
+    sheets = {}
+    errors = []
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            sheet: pool.submit(read_excel, file_path, sheet_name=sheet, **kwargs)
+            for sheet in sheet_names
+        }
+        for sheet, future in futures.items():
+            try:
+                sheets[sheet] = future.result()
+            except Exception as e:
+                errors.append({"sheet": sheet, "stage": "read", "error": str(e)})
+    return sheets, errors
+
+
+def left_join_excel_sheets(
+    file_path, base_df=None, on=None, max_workers=None, return_errors=False, **kwargs
+):
+    """
+    Left joins all sheets of an Excel file to a base DataFrame.
+
+    The workbook is parsed once and every sheet is aligned on the join key index of the
+    base DataFrame, so the growing result is never re-hashed. Sheets whose join keys are
+    not unique fan out rows and are joined with a regular merge instead. Columns that
+    already exist in the result get the sheet name as a suffix.
 
     Args:
         file_path (str): Path to the Excel file.
         base_df (pd.DataFrame or None): The base DataFrame to join with. If None, starts with the first sheet.
-        on (list or str): Column(s) to join on. Passed to pd.merge.
+        on (list or str): Column(s) to join on. If None, the columns shared with each sheet are used.
+        max_workers (int, optional): Number of processes decoding sheets in parallel.
+            Defaults to None (single parse of the whole workbook).
+        return_errors (bool, optional): Whether to return the failed sheets together
+            with the result. If False, failures are reported as warnings. Defaults to False.
         **kwargs: Additional arguments for read_excel.
 
     Returns:
         pd.DataFrame: A single DataFrame after left joining all sheets.
+        list: Only if `return_errors` is True. One dict per failed sheet with keys
+            'sheet', 'stage' ('read' or 'join') and 'error'.
+
+    Raises:
+        ValueError: If the Excel file or the first sheet cannot be read.
     """
-    # Load the Excel file and get all sheet names
-    try:
-        excel_file = pd.ExcelFile(file_path)
-        sheet_names = excel_file.sheet_names
-    except Exception as e:
-        raise ValueError(f"Failed to read Excel file: {file_path}. Error: {e}")
+    sheets, errors = _read_excel_sheets(file_path, max_workers=max_workers, **kwargs)
 
     # Initialize base_df if not provided
     if base_df is None:
+        if not sheets:
+            raise ValueError(f"No readable sheets in Excel file: {file_path}")
+        first_sheet = next(iter(sheets))
+        base_df = sheets.pop(first_sheet)
+
+    base_df = base_df.reset_index(drop=True)
+    result_columns = set(base_df.columns)
+    aligned_blocks = [base_df]
+    fan_out_sheets = []
+    base_indexes = {}
+
+    for sheet, sheet_df in sheets.items():
         try:
-            base_df = read_excel(file_path, sheet_name=sheet_names[0], **kwargs)
-            sheet_names = sheet_names[1:]  # Remove the first sheet from processing
+            if on is None:
+                keys = [col for col in sheet_df.columns if col in base_df.columns]
+            else:
+                keys = [on] if isinstance(on, str) else list(on)
+            if not keys:
+                raise ValueError("No common columns to join on.")
+
+            # Columns that collide with the result are suffixed with the sheet name
+            sheet_df = sheet_df.rename(
+                columns={
+                    col: f"{col}_{sheet}"
+                    for col in sheet_df.columns
+                    if col in result_columns and col not in keys
+                }
+            )
+            result_columns.update(sheet_df.columns)
+
+            sheet_df = sheet_df.set_index(keys)
+            if not sheet_df.index.is_unique:
+                fan_out_sheets.append((sheet, keys, sheet_df.reset_index()))
+                continue
+
+            # Build the key index of the base DataFrame once per set of join keys
+            if tuple(keys) not in base_indexes:
+                base_indexes[tuple(keys)] = pd.MultiIndex.from_frame(base_df[keys])
+            base_index = base_indexes[tuple(keys)]
+            if len(keys) == 1:
+                base_index = base_index.get_level_values(0)
+
+            aligned_blocks.append(sheet_df.reindex(base_index).reset_index(drop=True))
         except Exception as e:
-            raise ValueError(f"Error processing sheet {sheet_names[0]}: {e}")
+            errors.append({"sheet": sheet, "stage": "join", "error": str(e)})
+
+    result_df = pd.concat(aligned_blocks, axis=1)
 
-    # Iteratively join each sheet
-    for sheet in sheet_names:
+    for sheet, keys, sheet_df in fan_out_sheets:
         try:
-            # Read the current sheet
-            sheet_df = read_excel(file_path, sheet_name=sheet, **kwargs)
+            result_df = result_df.merge(sheet_df, how="left", on=keys)
+        except Exception as e:
+            errors.append({"sheet": sheet, "stage": "join", "error": str(e)})
 
-            # Perform a left join with the base DataFrame
-            base_df = base_df.merge(sheet_df, how="left", on=on)
+    if return_errors:
+        return result_df, errors
 
-        except Exception as e:
-            print(f"Error processing sheet {sheet}: {e}")
+    for error in errors:
+        warnings.warn(
+            f"Error processing sheet {error['sheet']} ({error['stage']}): {error['error']}"
+        )
+    return result_df
+
+
+def _value_column_codes(df, value_columns):
+    """
+    Encodes the combinations of values of `value_columns` as integer codes.
 
-    return base_df
+    Returns:
+        tuple: Array of codes per row (-1 where any value is missing) and the column
+            index of the distinct combinations, in sorted order.
+    """
+    factorized = [pd.factorize(df[col], sort=True) for col in value_columns]
+    codes = [col_codes for col_codes, _ in factorized]
+    uniques = [col_uniques for _, col_uniques in factorized]
+
+    valid = np.logical_and.reduce([col_codes >= 0 for col_codes in codes])
+    if len(value_columns) == 1:
+        return np.where(valid, codes[0], -1), pd.Index(uniques[0])
+
+    # Combine the per-column codes and keep only the combinations that occur
+    shape = tuple(max(len(col_uniques), 1) for col_uniques in uniques)
+    combined = np.ravel_multi_index([np.where(valid, c, 0) for c in codes], shape)
+    combos, inverse = np.unique(combined[valid], return_inverse=True)
+    value_codes = np.full(len(df), -1, dtype=np.intp)
+    value_codes[valid] = inverse
+
+    combo_codes = np.unravel_index(combos, shape)
+    value_index = pd.MultiIndex.from_arrays(
+        [
+            pd.Index(col_uniques).take(col_codes)
+            for col_uniques, col_codes in zip(uniques, combo_codes)
+        ],
+        names=value_columns,
+    )
+    return value_codes, value_index
 
 
 def aggregate_count(df, group_columns=None, value_columns=None, header="Count"):
@@ -359,75 +1676,158 @@ def aggregate_count(df, group_columns=None, value_columns=None, header="Count"):
     Aggregates and counts occurrences in a DataFrame grouped by specified columns.
     Creates a hierarchical structure with `group_columns` and `value_columns`.
 
+    The value columns are factorized once for all grouping columns, and every
+    grouping column is counted against them with a single vectorized bincount
+    instead of a groupby-size-pivot per column.
+
     Parameters:
     - df (pd.DataFrame): The input DataFrame to aggregate.
     - group_columns (list): List of column names to group by.
     - value_columns (list or None): List of column names whose unique values become new columns.
+      With several value columns, the result has a multi-level column axis.
     - header (str): Header for the resulting count column.
 
     Returns:
-    - pd.DataFrame: A DataFrame with hierarchical structure and counts.
+    - pd.DataFrame: A DataFrame with a ("Column", "Value") hierarchical index and counts
+      without `value_columns`, or a ("Column", group column) index otherwise. As with a
+      pivot filled with 0, the counts of a group column are floats if any combination
+      of its values is missing.
     """
     # Validate input
     if group_columns is None or not group_columns:
         raise ValueError("group_columns cannot be None or empty.")
 
+    if value_columns is not None:
+        if not value_columns:
+            raise ValueError("value_columns cannot be empty.")
+        value_codes, value_index = _value_column_codes(df, value_columns)
+        n_values = len(value_index)
+
     # Initialize results
     results = []
 
     # Process each group column
     for group_col in group_columns:
         if value_columns is None:
-            # Count unique occurrences in the group column
-            counts = df[group_col].value_counts().reset_index()
-            counts.columns = ["Value", header]
-            counts["Column"] = group_col
-            counts.set_index(["Column", "Value"], inplace=True)
-            results.append(counts)
+            # Count unique occurrences in the group column with a single hash pass
+            counts = df[group_col].value_counts()
+            index = pd.MultiIndex.from_arrays(
+                [[group_col] * len(counts), counts.index], names=["Column", "Value"]
+            )
+            results.append(pd.DataFrame({header: counts.to_numpy()}, index=index))
         else:
-            # Group by group_col and value_columns
-            grouped = (
-                df.groupby([group_col] + value_columns).size().reset_index(name=header)
+            # Count every (group value, value combination) pair in one pass
+            group_codes, group_values = pd.factorize(df[group_col], sort=True)
+            group_values = pd.Index(group_values)
+            valid = (group_codes >= 0) & (value_codes >= 0)
+            flat_codes = group_codes[valid] * n_values + value_codes[valid]
+            counts = np.bincount(
+                flat_codes, minlength=len(group_values) * n_values
+            ).reshape(len(group_values), n_values)
+
+            # Keep only the groups that occur together with the value columns
+            present = counts.sum(axis=1) > 0
+            counts = counts[present]
+            index = pd.MultiIndex.from_arrays(
+                [[group_col] * len(counts), group_values[present]],
+                names=["Column", group_col],
             )
 
-            # Pivot value_columns into separate columns
-            pivot_table = grouped.pivot(
-                index=group_col, columns=value_columns[0], values=header
-            ).fillna(0)
-
-            # Reset index and include group_col as part of hierarchical index
-            pivot_table["Column"] = group_col
-            pivot_table.reset_index(inplace=True)
-            pivot_table.set_index(["Column", group_col], inplace=True)
-
-            results.append(pivot_table)
+            # Missing combinations are filled with 0.0, as by a pivot with fillna
+            if (counts == 0).any():
+                counts = counts.astype(float)
+            results.append(pd.DataFrame(counts, index=index, columns=value_index))
 
     # Combine results into a single DataFrame
     combined_results = pd.concat(results, axis=0)
 
     # Ensure proper column names and indices
-    if value_columns is not None:
+    if value_columns is not None and len(value_columns) == 1:
         combined_results.columns.name = None  # Remove column name for value_columns
     return combined_results
 
 
-def aggregate_sum(df, group_columns=None, value_columns=None, header=None):
+def _resolve_grouping_sets(group_columns, grouping_sets, rollup, cube):
+    """
+    Returns the list of grouping sets requested from aggregate_sum.
+
+    Parameters:
+    - group_columns (list or None): Columns for ROLLUP/CUBE, or grouped one by one by default.
+    - grouping_sets (list or None): Explicit grouping sets, each a column name or a list of names.
+    - rollup (bool): Whether to build the hierarchical prefixes of `group_columns`.
+    - cube (bool): Whether to build all combinations of `group_columns`.
+
+    Returns:
+    - list: Grouping sets as tuples of column names, the empty tuple being the grand total.
+    """
+    if sum([grouping_sets is not None, rollup, cube]) > 1:
+        raise ValueError("Only one of grouping_sets, rollup and cube can be used.")
+
+    if grouping_sets is not None:
+        if not grouping_sets:
+            raise ValueError("grouping_sets cannot be empty.")
+        return [
+            (grouping_set,) if isinstance(grouping_set, str) else tuple(grouping_set)
+            for grouping_set in grouping_sets
+        ]
+
+    if group_columns is None or not group_columns:
+        raise ValueError("group_columns cannot be None or empty.")
+    group_columns = tuple(group_columns)
+
+    if rollup:
+        # (a, b, c), (a, b), (a), ()
+        return [group_columns[:size] for size in range(len(group_columns), -1, -1)]
+    if cube:
+        # All combinations, from the finest to the grand total
+        return [
+            grouping_set
+            for size in range(len(group_columns), -1, -1)
+            for grouping_set in combinations(group_columns, size)
+        ]
+    return [(group_col,) for group_col in group_columns]
+
+
+def aggregate_sum(
+    df,
+    group_columns=None,
+    value_columns=None,
+    header=None,
+    grouping_sets=None,
+    rollup=False,
+    cube=False,
+):
     """
     Aggregates a DataFrame using the 'sum' function.
     Creates a hierarchical index for `group_columns` and aggregates numerical `value_columns`.
 
+    By default every column of `group_columns` is grouped on its own. GROUPING SETS,
+    ROLLUP and CUBE style groupings can be requested instead. All groupings are
+    derived from a single partial aggregate at the finest grain, so the frame is
+    scanned once regardless of the number of groupings. As in groupby, rows with a
+    missing value in a grouping column are left out of that grouping; the grand total
+    covers all rows.
+
+    In the ("Column", value) index, a grouping on one column is labelled with its name
+    and its values, a grouping on several columns with the names joined by ", " and
+    tuples of values, and the grand total with GROUPING_TOTAL_LABEL.
+
     Parameters:
     - df (pd.DataFrame): The input DataFrame to aggregate.
     - group_columns (list): List of column names to group by and create hierarchical index.
     - value_columns (list): List of numerical column names to aggregate.
     - header (str or None): Prefix for the resulting aggregation columns. If None, no prefix is added.
+    - grouping_sets (list or None): Explicit groupings, each a column name or a list of column
+      names; an empty list stands for the grand total. Replaces `group_columns`.
+    - rollup (bool): If True, groups by the hierarchical prefixes of `group_columns`,
+      e.g. (Rok, Województwo), (Rok) and the grand total.
+    - cube (bool): If True, groups by all combinations of `group_columns`.
 
     Returns:
     - pd.DataFrame: A DataFrame with hierarchical index and aggregated columns.
     """
     # Validate input
-    if group_columns is None or not group_columns:
-        raise ValueError("group_columns cannot be None or empty.")
+    sets = _resolve_grouping_sets(group_columns, grouping_sets, rollup, cube)
     if value_columns is None or not value_columns:
         raise ValueError("value_columns cannot be None or empty.")
 
@@ -436,25 +1836,51 @@ def aggregate_sum(df, group_columns=None, value_columns=None, header=None):
         if not pd.api.types.is_numeric_dtype(df[col]):
             raise ValueError(f"Column '{col}' must be numeric for sum aggregation.")
 
+    # Aggregate once at the finest grain needed by the grouping sets
+    finest_columns = list(dict.fromkeys(col for cols in sets for col in cols))
+    if finest_columns:
+        partial_sums = df.groupby(finest_columns, dropna=False, observed=True)[
+            value_columns
+        ].sum()
+    else:
+        partial_sums = df[value_columns]
+
     # Initialize results
     results = []
+    labels = []
+    values = []
+    names = set()
+
+    # Derive each grouping set from the partial aggregate
+    for grouping_set in sets:
+        if grouping_set:
+            grouped = partial_sums.groupby(
+                level=list(grouping_set), observed=True
+            ).sum()
+            label = ", ".join(grouping_set)
+            names.add(grouping_set[0] if len(grouping_set) == 1 else label)
+        else:
+            grouped = partial_sums.sum().to_frame().T.astype(partial_sums.dtypes)
+            grouped.index = [GROUPING_TOTAL_LABEL]
+            label = GROUPING_TOTAL_LABEL
+            names.add(GROUPING_TOTAL_LABEL)
 
-    # Process each group column
-    for group_col in group_columns:
-        # Group by the group column and aggregate the value columns
-        grouped = df.groupby(group_col)[value_columns].sum().reset_index()
-
-        # Add "Column" level to the index for hierarchical structure
-        grouped["Column"] = group_col
-        grouped.set_index(["Column", group_col], inplace=True)
+        labels.extend([label] * len(grouped))
+        values.extend(grouped.index)
+        results.append(grouped)
 
-        # Optionally rename the columns with the header prefix
-        if header:
-            grouped.columns = [f"{header}_{col}" for col in grouped.columns]
+    # Concatenate results for all grouping sets
+    result_df = pd.concat(results, ignore_index=True)
 
-        results.append(grouped)
+    # Add "Column" level to the index for hierarchical structure
+    value_name = names.pop() if len(names) == 1 else None
+    result_df.index = pd.MultiIndex.from_arrays(
+        [labels, pd.Index(values, tupleize_cols=False)],
+        names=["Column", value_name],
+    )
 
-    # Concatenate results for all group_columns
-    result_df = pd.concat(results)
+    # Optionally rename the columns with the header prefix
+    if header:
+        result_df.columns = [f"{header}_{col}" for col in result_df.columns]
 
     return result_df
@@ -0,0 +1,290 @@
+# main.py
+import argparse
+import sys
+import time
+import traceback
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+
+import matplotlib
+
+# Render figures without a display, also in the worker processes
+matplotlib.use("Agg")
+
+from helpers.config import PLOTS_DIR, RESULTS_DIR
+from helpers.datasets import get_dataset, dataset_sources
+from helpers.build_cache import build_key, is_up_to_date, record_build
+from analysis_icd10_top_problems import analyze_icd10_top_problems
+from analysis_icd10_top_problems_time import analyze_icd10_by_year
+from analysis_populacja_na_poradnie_geo import analyze_population_to_clinic_geo
+from analysis_poradnie_pow_geo import analyze_clinics_by_county_geo
+from analysis_poradnie_woj_geo import analyze_clinics_by_region_geo
+from analysis_poradnie_woj_time import analyze_clinics_by_region_time
+from analysis_porady_na_poradnie_geo import analyze_consultation_to_clinic_geo
+
+# Analyses with their inputs (function argument -> registered dataset) and outputs
+ANALYSES = {
+    "icd10_top_problems": {
+        "function": analyze_icd10_top_problems,
+        "inputs": {"cube": "icd10_cube"},
+        "outputs": [
+            RESULTS_DIR / "icd10_top_problems_by_level.xlsx",
+            PLOTS_DIR / "icd10_top_problems_all_levels.png",
+        ],
+    },
+    "icd10_top_problems_time": {
+        "function": analyze_icd10_by_year,
+        "inputs": {"cube": "icd10_cube"},
+        "outputs": [RESULTS_DIR / "icd10_top_problems_time.xlsx"]
+        + [
+            PLOTS_DIR / f"icd10_top_problems_lvl{level}_time.png" for level in [1, 2, 3]
+        ],
+    },
+    "population_to_clinic_geo": {
+        "function": analyze_population_to_clinic_geo,
+        "inputs": {
+            "df_clinics": "swiad_woj",
+            "df_demography": "demografia_woj",
+            "wojewodztwa": "wojewodztwa_geo",
+        },
+        "outputs": [
+            RESULTS_DIR / "population_to_clinic_geo_2023.xlsx",
+            PLOTS_DIR / "population_to_clinic_geo_2023.png",
+        ],
+    },
+    "clinics_by_county_geo": {
+        "function": analyze_clinics_by_county_geo,
+        "inputs": {"df": "swiad_pow", "powiaty": "powiaty_geo"},
+        "outputs": [
+            RESULTS_DIR / "clinics_by_county_geo_2023.xlsx",
+            PLOTS_DIR / "clinics_by_county_geo_2023.png",
+        ],
+    },
+    "clinics_by_region_geo": {
+        "function": analyze_clinics_by_region_geo,
+        "inputs": {"df": "swiad_woj", "wojewodztwa": "wojewodztwa_geo"},
+        "outputs": [
+            RESULTS_DIR / "clinics_by_region_geo_2023.xlsx",
+            PLOTS_DIR / "clinics_by_region_geo_2023.png",
+        ],
+    },
+    "clinics_by_region_time": {
+        "function": analyze_clinics_by_region_time,
+        "inputs": {"store": "swiad_woj_measures"},
+        "outputs": [
+            RESULTS_DIR / "clinics_by_region_time.xlsx",
+            PLOTS_DIR / "clinics_by_region_time.png",
+        ],
+    },
+    "consultation_to_clinic_geo": {
+        "function": analyze_consultation_to_clinic_geo,
+        "inputs": {
+            "df_clinics": "swiad_woj",
+            "df_consultations": "statystyki_porad",
+            "wojewodztwa": "wojewodztwa_geo",
+        },
+        "outputs": [
+            RESULTS_DIR / "consultations_per_clinic_by_region_2023.xlsx",
+            PLOTS_DIR / "consultations_to_clinic_geo_2023.png",
+        ],
+    },
+}
+
+
+def timed_call(function, **kwargs):
+    """
+    Calls a function and measures its wall time.
+
+    Returns:
+        tuple: The function result and the elapsed time in seconds.
+    """
+    start = time.perf_counter()
+    result = function(**kwargs)
+    return result, time.perf_counter() - start
+
+
+def stage_result(stage, status, seconds=float("nan"), error=""):
+    """Builds the report entry of a pipeline stage."""
+    if isinstance(error, Exception):
+        error = "".join(traceback.format_exception_only(type(error), error)).strip()
+    return {"stage": stage, "status": status, "seconds": seconds, "error": error}
+
+
+def analysis_key(name):
+    """
+    Computes the build cache key of an analysis from its input files and source.
+
+    Returns:
+        str or None: The key, or None if an input file is missing.
+    """
+    spec = ANALYSES[name]
+    input_paths = [
+        path for dataset in spec["inputs"].values() for path in dataset_sources(dataset)
+    ]
+    try:
+        return build_key(spec["function"], input_paths, params=spec["inputs"])
+    except FileNotFoundError:
+        # The load stage reports the missing input
+        return None
+
+
+def run_pipeline(analyses=None, max_workers=None, force=False):
+    """
+    Runs the analyses as a DAG: every input dataset is loaded once through the dataset
+    registry, and each analysis is submitted to a process pool as soon as all of its
+    inputs are loaded. Analyses whose inputs, parameters and source did not change
+    since their last successful run are skipped and their outputs restored from the
+    build cache.
+
+    Args:
+        analyses (list, optional): Names of the analyses to run. Defaults to all.
+        max_workers (int, optional): Number of analysis worker processes.
+        force (bool, optional): Whether to rerun analyses that are up to date in the
+            build cache. Defaults to False.
+
+    Returns:
+        list: One dict per stage with keys 'stage', 'status', 'seconds' and 'error'.
+
+    Raises:
+        ValueError: If an unknown analysis name is given.
+    """
+    names = list(ANALYSES) if not analyses else list(analyses)
+    unknown = [name for name in names if name not in ANALYSES]
+    if unknown:
+        raise ValueError(
+            f"Unknown analyses: {', '.join(unknown)}. "
+            f"Available analyses: {', '.join(ANALYSES)}."
+        )
+
+    stages = []
+    pending = {}
+    keys = {}
+    for name in names:
+        start = time.perf_counter()
+        keys[name] = analysis_key(name)
+        if (
+            not force
+            and keys[name] is not None
+            and is_up_to_date(name, keys[name], ANALYSES[name]["outputs"])
+        ):
+            seconds = time.perf_counter() - start
+            stages.append(stage_result(f"analysis:{name}", "cached", seconds))
+        else:
+            pending[name] = ANALYSES[name]
+
+    required = sorted({d for spec in pending.values() for d in spec["inputs"].values()})
+
+    loaded = {}
+    failed = set()
+
+    load_pool = ThreadPoolExecutor(max_workers=len(required) or 1)
+    analysis_pool = ProcessPoolExecutor(max_workers=max_workers)
+    with load_pool, analysis_pool:
+        running = {}
+        for dataset in required:
+            future = load_pool.submit(timed_call, get_dataset, name=dataset, copy=False)
+            running[future] = ("load", dataset)
+
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                kind, name = running.pop(future)
+                try:
+                    result, seconds = future.result()
+                except Exception as e:
+                    stages.append(stage_result(f"{kind}:{name}", "failed", error=e))
+                    if kind == "load":
+                        failed.add(name)
+                    continue
+
+                if kind == "load":
+                    loaded[name] = result
+                elif keys[name] is not None:
+                    try:
+                        record_build(name, keys[name], ANALYSES[name]["outputs"])
+                    except Exception as e:
+                        stages.append(stage_result(f"{kind}:{name}", "failed", error=e))
+                        continue
+                stages.append(stage_result(f"{kind}:{name}", "ok", seconds))
+
+            # Submit every analysis whose inputs are ready, skip those with a failed input
+            for name, spec in list(pending.items()):
+                inputs = set(spec["inputs"].values())
+                if inputs & failed:
+                    del pending[name]
+                    missing = ", ".join(sorted(inputs & failed))
+                    stages.append(
+                        stage_result(
+                            f"analysis:{name}",
+                            "skipped",
+                            error=f"Missing inputs: {missing}",
+                        )
+                    )
+                elif inputs <= loaded.keys():
+                    del pending[name]
+                    kwargs = {
+                        argument: loaded[dataset]
+                        for argument, dataset in spec["inputs"].items()
+                    }
+                    future = analysis_pool.submit(
+                        timed_call, spec["function"], **kwargs
+                    )
+                    running[future] = ("analysis", name)
+
+    return stages
+
+
+def print_report(stages):
+    """Prints the status and wall time of every pipeline stage."""
+    width = max(len(stage["stage"]) for stage in stages)
+    print(f"{'Stage':<{width}}  {'Status':<8}  {'Time [s]':>8}")
+    for stage in stages:
+        print(
+            f"{stage['stage']:<{width}}  {stage['status']:<8}  {stage['seconds']:>8.2f}"
+        )
+        if stage["error"]:
+            print(f"    {stage['error']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Regenerate all results and plots of the report."
+    )
+    parser.add_argument(
+        "analyses",
+        nargs="*",
+        help=f"Analyses to run (default: all). Available: {', '.join(ANALYSES)}.",
+    )
+    parser.add_argument(
+        "-f",
+        "--force",
+        action="store_true",
+        help="Rerun the analyses even if they are up to date in the build cache.",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (default: number of CPUs).",
+    )
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.analyses if name not in ANALYSES]
+    if unknown:
+        parser.error(f"unknown analyses: {', '.join(unknown)}")
+
+    start = time.perf_counter()
+    stages = run_pipeline(args.analyses, max_workers=args.workers, force=args.force)
+    print_report(stages)
+    print(f"Total time: {time.perf_counter() - start:.2f} s")
+
+    return 1 if any(stage["status"] not in ("ok", "cached") for stage in stages) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
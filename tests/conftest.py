@@ -0,0 +1,28 @@
+"""Shared setup of the tests.
+
+The helpers are imported as in the scripts run from `src`, with the configuration
+pointed at a temporary workspace, so the tests never read or write the real data.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import matplotlib
+
+# Render figures without a display
+matplotlib.use("Agg")
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+WORKSPACE = Path(tempfile.mkdtemp(prefix="mz_raport_tests_"))
+
+# Must be set before the first import of helpers.config
+os.environ["WORKSPACE_PATH"] = str(WORKSPACE)
+os.environ["DATA_DIR"] = str(WORKSPACE / "data")
+os.environ["RESULTS_DIR"] = str(WORKSPACE / "results")
+os.environ["PLOTS_DIR"] = str(WORKSPACE / "plots")
+os.environ["BUILD_CACHE_DIR"] = str(WORKSPACE / ".build_cache")
+
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
@@ -0,0 +1,45 @@
+from helpers import build_cache
+from helpers.build_cache import build_key, is_up_to_date, record_build
+
+
+def analysis():
+    return None
+
+
+def test_unchanged_build_is_up_to_date_and_restores_outputs(tmp_path):
+    cache_dir = tmp_path / "cache"
+    source = tmp_path / "input.csv"
+    source.write_text("a\n1\n")
+    output = tmp_path / "result.xlsx"
+    output.write_text("result")
+
+    key = build_key(analysis, [source], cache_dir=cache_dir)
+    record_build("target", key, [output], cache_dir=cache_dir)
+    output.unlink()
+
+    assert is_up_to_date("target", key, [output], cache_dir=cache_dir)
+    assert output.read_text() == "result"
+
+
+def test_key_changes_with_inputs_and_params(tmp_path):
+    cache_dir = tmp_path / "cache"
+    source = tmp_path / "input.csv"
+    source.write_text("a\n1\n")
+    key = build_key(analysis, [source], cache_dir=cache_dir)
+
+    assert build_key(analysis, [source], {"n": 10}, cache_dir=cache_dir) != key
+    source.write_text("a\n2\n")
+    assert build_key(analysis, [source], cache_dir=cache_dir) != key
+
+
+def test_key_changes_with_helpers_sources(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    helpers_dir = tmp_path / "helpers"
+    helpers_dir.mkdir()
+    module = helpers_dir / "utils.py"
+    module.write_text("VALUE = 1\n")
+    monkeypatch.setattr(build_cache, "HELPERS_DIR", helpers_dir)
+    key = build_key(analysis, [], cache_dir=cache_dir)
+
+    module.write_text("VALUE = 2  # changed\n")
+    assert build_key(analysis, [], cache_dir=cache_dir) != key
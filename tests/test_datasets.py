@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+from helpers import datasets
+from helpers.datasets import (
+    cached_datasets,
+    clear_datasets,
+    get_dataset,
+    register_dataset,
+    set_memory_budget,
+)
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    # Toy datasets in an empty registry, restored after the test
+    monkeypatch.setattr(datasets, "DATASET_LOADERS", {})
+    monkeypatch.setattr(datasets, "DATASET_SOURCES", {})
+    clear_datasets()
+    loads = []
+
+    def register(name, rows):
+        def loader():
+            loads.append(name)
+            return pd.DataFrame({"a": range(rows)})
+
+        register_dataset(name, loader)
+
+    yield register, loads
+    set_memory_budget(datasets.DATASET_MEMORY_BUDGET)
+    clear_datasets()
+
+
+def test_dataset_is_loaded_once(registry):
+    register, loads = registry
+    register("small", 10)
+
+    first = get_dataset("small")
+    first["a"] = 0
+    second = get_dataset("small", copy=False)
+    assert loads == ["small"]
+    assert second["a"].tolist() == list(range(10))
+
+
+def test_shallow_copy_only_under_copy_on_write(registry, monkeypatch):
+    register, _ = registry
+    register("small", 10)
+    get_dataset("small")
+    cached = datasets._datasets["small"]["a"].to_numpy()
+
+    assert np.shares_memory(get_dataset("small", copy=False)["a"].to_numpy(), cached)
+
+    # Without Copy-on-Write a shallow copy could modify the cache, so it is deep
+    monkeypatch.setattr(datasets, "copy_on_write_enabled", lambda: False)
+    data = get_dataset("small", copy=False)
+    assert not np.shares_memory(data["a"].to_numpy(), cached)
+
+
+def test_least_recently_used_dataset_is_evicted(registry):
+    register, loads = registry
+    for name in ["first", "second", "third"]:
+        register(name, 1000)
+        get_dataset(name)
+    size = cached_datasets()["first"]
+
+    # Using "first" again makes "second" the least recently used
+    get_dataset("first")
+    set_memory_budget(2 * size)
+    assert list(cached_datasets()) == ["third", "first"]
+
+    get_dataset("second")
+    assert loads == ["first", "second", "third", "second"]
+    assert list(cached_datasets()) == ["first", "second"]
+
+
+def test_unknown_dataset_raises(registry):
+    with pytest.raises(KeyError, match="Unknown dataset"):
+        get_dataset("missing")
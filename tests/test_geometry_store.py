@@ -0,0 +1,134 @@
+import os
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+import shapely
+from shapely.geometry import Polygon
+from helpers.geometry_store import (
+    GEOMETRY_NAME_KEY,
+    GEOMETRY_SOURCE_ATTR,
+    load_geometries,
+    lod_geometries,
+    select_lod,
+    simplify_geometries,
+)
+
+
+def jagged_neighbours(crs="EPSG:2180"):
+    # Two polygons sharing a jagged edge, with many vertices along it
+    ys = np.linspace(0, 10000, 200)
+    xs = 5000 + 30 * np.sin(ys / 50)
+    edge = list(zip(xs, ys))
+    left = Polygon([(0, 0)] + edge + [(0, 10000)])
+    right = Polygon([(10000, 0)] + edge + [(10000, 10000)])
+    return gpd.GeoDataFrame(
+        {"JPT_NAZWA_": [" Mazowieckie", "Śląskie "]}, geometry=[left, right], crs=crs
+    )
+
+
+def store_entries(tmp_path):
+    return sorted((tmp_path / ".cache").glob("*.parquet"))
+
+
+def test_simplification_keeps_neighbours_gap_free():
+    gdf = jagged_neighbours()
+    simplified = simplify_geometries(gdf, 100)
+    assert shapely.get_num_coordinates(simplified.geometry.to_numpy()).sum() < (
+        shapely.get_num_coordinates(gdf.geometry.to_numpy()).sum()
+    )
+    union = shapely.union_all(simplified.geometry.to_numpy())
+    assert union.area == pytest.approx(simplified.geometry.area.sum())
+    assert union.area == pytest.approx(1e8)
+
+
+def test_simplification_without_coverage_support_raises(monkeypatch):
+    monkeypatch.delattr(shapely, "coverage_simplify")
+    with pytest.raises(ValueError, match="coverage_simplify"):
+        simplify_geometries(jagged_neighbours(), 100)
+
+
+def test_select_lod_requires_metric_crs():
+    gdf = jagged_neighbours().to_crs("EPSG:4326")
+    with pytest.raises(ValueError, match="metres"):
+        select_lod(gdf.total_bounds, (4, 4), 100, crs=gdf.crs)
+    assert lod_geometries(gdf, (4, 4), 100) is gdf
+
+
+def test_level_of_detail_in_geographic_crs():
+    # Boundaries in degrees are simplified in metres and reprojected back
+    gdf = jagged_neighbours().to_crs("EPSG:4326")
+    lod = lod_geometries(gdf, (1, 1), 100)
+    assert lod.crs == gdf.crs
+    assert shapely.get_num_coordinates(lod.geometry.to_numpy()).sum() < (
+        shapely.get_num_coordinates(gdf.geometry.to_numpy()).sum()
+    )
+    assert lod.geometry.to_crs("EPSG:2180").area.sum() == pytest.approx(1e8, rel=1e-3)
+
+    # Without a CRS the tolerance cannot be measured
+    no_crs = gdf.set_crs(None, allow_override=True)
+    assert lod_geometries(no_crs, (1, 1), 100) is no_crs
+
+
+def test_select_lod_picks_tolerance_below_pixel():
+    # 10 km over 400 pixels: 25 m pixels, half a pixel allows 10 m
+    assert select_lod((0, 0, 10000, 10000), (4, 4), 100, tolerances=(0, 10, 25)) == 10
+
+
+def test_geometry_store_round_trip(tmp_path):
+    file_path = tmp_path / "regions.geojson"
+    jagged_neighbours().to_file(file_path, driver="GeoJSON")
+
+    gdf = load_geometries(file_path)
+    assert gdf[GEOMETRY_NAME_KEY].tolist() == ["mazowieckie", "śląskie"]
+    assert gdf.attrs[GEOMETRY_SOURCE_ATTR] == str(file_path)
+    assert len(store_entries(tmp_path)) == 1
+
+    stored = load_geometries(file_path)
+    assert stored.crs == gdf.crs
+    assert stored.geometry.geom_equals_exact(gdf.geometry, 0).all()
+    assert stored.attrs[GEOMETRY_SOURCE_ATTR] == str(file_path)
+
+    # A changed source replaces the stored copy
+    jagged_neighbours().iloc[:1].to_file(file_path, driver="GeoJSON")
+    os.utime(file_path, ns=(0, 0))
+    assert len(load_geometries(file_path)) == 1
+    assert len(store_entries(tmp_path)) == 1
+
+    load_geometries(file_path, use_cache=False)
+    assert len(store_entries(tmp_path)) == 1
+
+
+def test_stored_level_of_detail_is_used_for_maps(tmp_path):
+    file_path = tmp_path / "regions.geojson"
+    jagged_neighbours().to_file(file_path, driver="GeoJSON")
+    gdf = load_geometries(file_path)
+
+    lod = lod_geometries(gdf, (1, 1), 100)
+    assert len(store_entries(tmp_path)) == 2
+    assert shapely.get_num_coordinates(lod.geometry.to_numpy()).sum() < (
+        shapely.get_num_coordinates(gdf.geometry.to_numpy()).sum()
+    )
+    assert lod[GEOMETRY_NAME_KEY].tolist() == gdf[GEOMETRY_NAME_KEY].tolist()
+
+
+def test_stored_level_of_detail_follows_reordered_and_merged_rows(tmp_path):
+    file_path = tmp_path / "regions.geojson"
+    jagged_neighbours().to_file(file_path, driver="GeoJSON")
+    gdf = load_geometries(file_path)
+    expected = lod_geometries(gdf, (1, 1), 100).set_index(GEOMETRY_NAME_KEY).geometry
+
+    # Sorting keeps the index and the source attribute, resetting the index
+    # afterwards leaves rows whose index points at other stored geometries
+    reordered = gdf.sort_values(GEOMETRY_NAME_KEY, ascending=False)
+    renumbered = reordered.reset_index(drop=True)
+    assert renumbered.attrs[GEOMETRY_SOURCE_ATTR] == str(file_path)
+    values = pd.DataFrame({GEOMETRY_NAME_KEY: ["śląskie", "mazowieckie"], "v": [1, 2]})
+    merged = gdf.merge(values, on=GEOMETRY_NAME_KEY, how="right")
+    assert merged[GEOMETRY_NAME_KEY].tolist() == ["śląskie", "mazowieckie"]
+
+    for derived in [reordered, renumbered, merged, gdf.iloc[[1]]]:
+        lod = lod_geometries(derived, (1, 1), 100)
+        assert lod.index.tolist() == derived.index.tolist()
+        for name, geometry in zip(lod[GEOMETRY_NAME_KEY], lod.geometry):
+            assert geometry.equals(expected[name])
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+from helpers.heavy_hitters import (
+    new_summary,
+    stream_top_n,
+    summary_top_n,
+    update_summary,
+)
+
+
+def thin_key_chunks():
+    # "z" is spread thinly over every chunk and is evicted by the new keys of the
+    # next chunk, but its total is the largest
+    return [
+        pd.DataFrame({"Kod": [f"x{i}"] * 5 + [f"y{i}"] * 4 + ["z"] * 2})
+        for i in range(10)
+    ]
+
+
+def exact_top_n(chunks, n):
+    counts = pd.concat(chunks).groupby("Kod").size()
+    return counts.sort_values(ascending=False, kind="stable").head(n)
+
+
+@pytest.mark.parametrize("method", ["space_saving", "count_min"])
+def test_too_small_capacity_still_matches_exact_groupby(method):
+    chunks = thin_key_chunks()
+    result = stream_top_n(lambda: iter(chunks), ["Kod"], n=3, method=method, capacity=2)
+    expected = exact_top_n(chunks, 3)
+    assert result["Kod"].tolist()[0] == "z"
+    assert result.set_index("Kod")["Count"].to_dict() == expected.to_dict()
+
+
+@pytest.mark.parametrize("method", ["exact", "space_saving", "count_min"])
+def test_summed_values_match_exact_groupby(method):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "Kod": rng.choice(list("abcdefghij"), size=1000, p=[0.3] + [0.7 / 9] * 9),
+            "Liczba porad AOS": rng.integers(1, 10, size=1000),
+        }
+    )
+    chunks = [df.iloc[start : start + 100] for start in range(0, len(df), 100)]
+    result = stream_top_n(
+        lambda: iter(chunks), ["Kod"], "Liczba porad AOS", n=3, method=method
+    )
+    expected = df.groupby("Kod")["Liczba porad AOS"].sum().nlargest(3)
+    assert result["Kod"].tolist() == expected.index.tolist()
+    assert result["Liczba porad AOS"].tolist() == expected.tolist()
+    assert result["Liczba porad AOS"].dtype == df["Liczba porad AOS"].dtype
+
+
+def test_space_saving_monitors_every_heavy_key():
+    chunks = thin_key_chunks()
+    summary = new_summary("space_saving", capacity=3)
+    for chunk in chunks:
+        update_summary(summary, chunk.groupby("Kod").size())
+    totals = pd.concat(chunks).groupby("Kod").size()
+    counts = summary_top_n(summary, n=3)["Count"]
+
+    # Keys above the threshold are monitored and never underestimated
+    heavy = totals[totals > summary["threshold"]]
+    assert set(heavy.index) <= set(counts.index)
+    assert (counts >= totals.loc[counts.index]).all()
+    assert summary["total"] == totals.sum()
+
+
+def test_unknown_method_raises():
+    with pytest.raises(ValueError, match="Unsupported method"):
+        new_summary("top_k")
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import pytest
+from helpers.icd_cube import (
+    build_icd_cube,
+    icd_columns,
+    load_icd_cube,
+    share_by_year,
+    stream_share_by_year,
+    stream_top_n,
+    top_n,
+    top_n_by_region,
+)
+
+
+def icd_frame():
+    rng = np.random.default_rng(0)
+    size = 200
+    codes = rng.choice(["H25", "H26", "H40", "H52", "H10"], size=size)
+    return pd.DataFrame(
+        {
+            "Rok": rng.choice([2021, 2022, 2023], size=size),
+            "Województwo": rng.choice(["mazowieckie", "śląskie"], size=size),
+            "Specjalność komórki": rng.choice(
+                ["poradnia okulistyczna", "poradnia chirurgiczna"], size=size
+            ),
+            "Kod ICD-10 poziom 1.": "VII",
+            "Nazwa ICD-10 poziom 1.": "Choroby oka",
+            "Kod ICD-10 poziom 2.": [code[:2] for code in codes],
+            "Nazwa ICD-10 poziom 2.": [f"Grupa {code[:2]}" for code in codes],
+            "Kod ICD-10 poziom 3.": codes,
+            "Nazwa ICD-10 poziom 3.": [f"Choroba {code}" for code in codes],
+            "Liczba porad AOS": rng.integers(1, 100, size=size),
+        }
+    )
+
+
+def groupby_top_n(df, level, n):
+    code_col, name_col = icd_columns(level)
+    return df.groupby([code_col, name_col])["Liczba porad AOS"].sum().nlargest(n)
+
+
+@pytest.mark.parametrize("level", [1, 2, 3])
+def test_top_n_matches_groupby(level):
+    df = icd_frame()
+    cube = build_icd_cube(df)
+    result = top_n(cube, level, n=3, years=[2022, 2023], regions="śląskie")
+    selected = df[df["Rok"].isin([2022, 2023]) & (df["Województwo"] == "śląskie")]
+    expected = groupby_top_n(selected, level, 3)
+    code_col, _ = icd_columns(level)
+    assert result[code_col].tolist() == expected.index.get_level_values(0).tolist()
+    assert result["Liczba porad AOS"].tolist() == expected.tolist()
+
+
+def test_top_n_by_region_and_share_by_year():
+    df = icd_frame()
+    cube = build_icd_cube(df)
+
+    by_region = top_n_by_region(cube, 3, n=2, years=2023)
+    for region, rows in by_region.groupby("Województwo", observed=True):
+        selected = df[(df["Rok"] == 2023) & (df["Województwo"] == region)]
+        expected = groupby_top_n(selected, 3, 2)
+        assert rows["Liczba porad AOS"].tolist() == expected.tolist()
+
+    shares = share_by_year(cube, 3, ["H25", "H40"])
+    counts = (
+        df[df["Kod ICD-10 poziom 3."].isin(["H25", "H40"])]
+        .pivot_table(
+            index="Rok",
+            columns="Kod ICD-10 poziom 3.",
+            values="Liczba porad AOS",
+            aggfunc="sum",
+        )
+        .reindex(columns=["H25", "H40"])
+    )
+    expected = 100 * counts.div(counts.sum(axis=1), axis=0)
+    np.testing.assert_allclose(shares.to_numpy(), expected.to_numpy())
+    assert shares.columns.tolist() == ["H25", "H40"]
+
+
+def test_cube_is_persisted_next_to_the_source(tmp_path):
+    file_path = tmp_path / "icd.csv"
+    icd_frame().to_csv(file_path, index=False)
+
+    cube = load_icd_cube(file_path)
+    cube_entries = [
+        entry
+        for entry in (tmp_path / ".cache").glob("*.parquet")
+        if pd.read_parquet(entry).columns[0] == "Poziom"
+    ]
+    assert len(cube_entries) == 1
+    pd.testing.assert_frame_equal(load_icd_cube(file_path), cube)
+
+    with pytest.raises(ValueError, match="Missing ICD-10 columns"):
+        build_icd_cube(icd_frame().drop(columns="Rok"))
+
+
+def test_streaming_queries_match_the_cube(tmp_path):
+    df = icd_frame()
+    paths = []
+    for year, part in df.groupby("Rok"):
+        paths.append(tmp_path / f"icd_{year}.csv")
+        part.to_csv(paths[-1], index=False)
+    cube = build_icd_cube(df[df["Specjalność komórki"] == "poradnia okulistyczna"])
+
+    streamed = stream_top_n(3, n=3, file_paths=paths, chunksize=50)
+    pd.testing.assert_frame_equal(streamed, top_n(cube, 3, n=3), check_dtype=False)
+
+    shares = stream_share_by_year(3, ["H25", "H52"], file_paths=paths, chunksize=50)
+    pd.testing.assert_frame_equal(
+        shares, share_by_year(cube, 3, ["H25", "H52"]), check_names=False
+    )
@@ -0,0 +1,101 @@
+import pandas as pd
+import pytest
+import main
+from helpers import datasets
+from helpers.config import RESULTS_DIR
+from helpers.datasets import clear_datasets, register_dataset
+
+OUTPUT_PATH = RESULTS_DIR / "toy_totals.csv"
+
+
+def toy_totals(df):
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    df.sum().to_frame("Suma").to_csv(OUTPUT_PATH)
+
+
+def toy_failure(df):
+    raise RuntimeError("toy analysis failed")
+
+
+def missing_input():
+    raise FileNotFoundError("toy input not found")
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    # A registry and an analysis list made of toy datasets and analyses
+    source = tmp_path / "toy.csv"
+    pd.DataFrame({"a": [1, 2, 3]}).to_csv(source, index=False)
+    monkeypatch.setattr(datasets, "DATASET_LOADERS", {})
+    monkeypatch.setattr(datasets, "DATASET_SOURCES", {})
+    register_dataset("toy", lambda: pd.read_csv(source), sources=[source])
+    register_dataset("broken", missing_input)
+    monkeypatch.setattr(
+        main,
+        "ANALYSES",
+        {
+            "totals": {
+                "function": toy_totals,
+                "inputs": {"df": "toy"},
+                "outputs": [OUTPUT_PATH],
+            },
+            "failure": {
+                "function": toy_failure,
+                "inputs": {"df": "toy"},
+                "outputs": [],
+            },
+            "orphan": {
+                "function": toy_totals,
+                "inputs": {"df": "broken"},
+                "outputs": [],
+            },
+        },
+    )
+    yield source
+    clear_datasets()
+    OUTPUT_PATH.unlink(missing_ok=True)
+
+
+def statuses(stages):
+    return {stage["stage"]: stage["status"] for stage in stages}
+
+
+def test_pipeline_reports_every_stage(pipeline):
+    stages = main.run_pipeline(max_workers=2, force=True)
+    assert statuses(stages) == {
+        "load:toy": "ok",
+        "load:broken": "failed",
+        "analysis:totals": "ok",
+        "analysis:failure": "failed",
+        "analysis:orphan": "skipped",
+    }
+    assert pd.read_csv(OUTPUT_PATH, index_col=0)["Suma"].tolist() == [6]
+    assert "toy analysis failed" in next(
+        stage["error"] for stage in stages if stage["stage"] == "analysis:failure"
+    )
+
+
+def test_unchanged_analysis_is_restored_from_the_build_cache(pipeline):
+    main.run_pipeline(["totals"], max_workers=1, force=True)
+    OUTPUT_PATH.unlink()
+
+    stages = main.run_pipeline(["totals"], max_workers=1)
+    assert statuses(stages) == {"analysis:totals": "cached"}
+    assert OUTPUT_PATH.is_file()
+
+    # A changed input reruns the analysis
+    pd.DataFrame({"a": [10]}).to_csv(pipeline, index=False)
+    clear_datasets()
+    stages = main.run_pipeline(["totals"], max_workers=1)
+    assert statuses(stages)["analysis:totals"] == "ok"
+    assert pd.read_csv(OUTPUT_PATH, index_col=0)["Suma"].tolist() == [10]
+
+
+def test_main_exit_status(pipeline, capsys):
+    assert main.main(["totals", "-f"]) == 0
+    assert main.main(["failure", "-f"]) == 1
+    assert "Total time" in capsys.readouterr().out
+    with pytest.raises(SystemExit):
+        main.main(["unknown"])
+    with pytest.raises(ValueError, match="Unknown analyses"):
+        main.run_pipeline(["unknown"])
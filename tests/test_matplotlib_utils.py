@@ -0,0 +1,97 @@
+from concurrent.futures import ThreadPoolExecutor
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+from shapely.geometry import MultiPolygon, Polygon, box
+from helpers import matplotlib_utils
+from helpers.matplotlib_utils import (
+    choropleth_session_matplotlib,
+    render_figures_matplotlib,
+)
+
+
+def plot_line(values):
+    fig, ax = plt.subplots()
+    ax.plot(values)
+    return fig
+
+
+def plot_failing():
+    plt.figure()
+    raise ValueError("no data")
+
+
+def test_render_returns_timings_and_closes_figures(tmp_path):
+    specs = [
+        {"plot": plot_line, "args": ([1, 2, 3],), "file_path": tmp_path / f"{i}.png"}
+        for i in range(2)
+    ]
+    results = render_figures_matplotlib(specs, max_workers=1)
+    assert [result["status"] for result in results] == ["ok", "ok"]
+    assert all(result["time"] >= 0 for result in results)
+    assert all(spec["file_path"].is_file() for spec in specs)
+    assert plt.get_fignums() == []
+
+
+def test_render_in_worker_process_does_not_start_a_pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(matplotlib_utils, "_in_worker_process", lambda: True)
+    monkeypatch.setattr(matplotlib_utils, "ProcessPoolExecutor", None)
+    specs = [
+        {"plot": plot_line, "args": ([1, 2],), "file_path": tmp_path / f"{i}.png"}
+        for i in range(3)
+    ]
+    results = render_figures_matplotlib(specs)
+    assert len(results) == 3
+
+
+def test_render_uses_executor_of_the_caller(tmp_path):
+    specs = [
+        {"plot": plot_line, "args": ([1, 2],), "file_path": tmp_path / f"{i}.png"}
+        for i in range(3)
+    ]
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        results = render_figures_matplotlib(specs, executor=executor)
+    assert [result["file_path"] for result in results] == [
+        spec["file_path"] for spec in specs
+    ]
+
+
+def test_render_raises_after_failed_figure(tmp_path):
+    specs = [
+        {"plot": plot_failing, "file_path": tmp_path / "failed.png"},
+        {"plot": plot_line, "args": ([1],), "file_path": tmp_path / "ok.png"},
+    ]
+    with pytest.raises(RuntimeError, match="failed.png"):
+        render_figures_matplotlib(specs, max_workers=1)
+    assert (tmp_path / "ok.png").is_file()
+    assert plt.get_fignums() == []
+
+
+def map_geometries():
+    holed = Polygon(
+        [(0, 0), (4, 0), (4, 4), (0, 4)], holes=[[(1, 1), (2, 1), (2, 2), (1, 2)]]
+    )
+    return [holed, MultiPolygon([box(5, 0, 6, 1), box(7, 0, 8, 1)]), box(0, 5, 1, 6)]
+
+
+def test_choropleth_recolors_the_same_boundaries(tmp_path):
+    with choropleth_session_matplotlib(
+        map_geometries(), figsize=(2, 2), dpi=20
+    ) as render:
+        ax = plt.gca()
+        collection = ax.collections[0]
+        render([1, 2, np.nan], tmp_path / "first.png", label="Liczba")
+        render([10, 5, 0], tmp_path / "second.png", title="Druga")
+
+        # One collection and one colorbar are reused by every map
+        assert len(ax.collections) == 1 and ax.collections[0] is collection
+        assert collection.get_clim() == (0, 10)
+        assert len(plt.gcf().axes) == 2
+        assert len(collection.get_paths()[0].to_polygons()) == 2
+        assert len(collection.get_paths()[1].to_polygons()) == 2
+
+        with pytest.raises(ValueError, match="one per geometry"):
+            render([1, 2], tmp_path / "wrong.png")
+
+    assert (tmp_path / "first.png").is_file() and (tmp_path / "second.png").is_file()
+    assert plt.get_fignums() == []
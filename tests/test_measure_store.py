@@ -0,0 +1,87 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from helpers import measure_store
+from helpers.measure_store import load_measure_store, measure_table
+from helpers.utils import clear_csv_cache, evict_csv_cache, read_csv
+
+
+def write_source(tmp_path):
+    df = pd.DataFrame(
+        {
+            "Rok": [2020, 2020, 2021, 2021, 2021],
+            "Województwo": [
+                "mazowieckie",
+                "śląskie",
+                "mazowieckie",
+                "śląskie",
+                "śląskie",
+            ],
+            "Liczba poradni AOS": [1, 2, 3, 4, 5],
+        }
+    )
+    file_path = tmp_path / "clinics.csv"
+    df.to_csv(file_path, index=False)
+    return df, str(file_path)
+
+
+def test_measure_table_matches_pivot_table(tmp_path):
+    df, file_path = write_source(tmp_path)
+    store = load_measure_store(file_path)
+    result = measure_table(
+        store, "Liczba poradni AOS", index="Rok", columns="Województwo"
+    )
+    expected = df.pivot_table(
+        index="Rok", columns="Województwo", values="Liczba poradni AOS", aggfunc="sum"
+    )
+    np.testing.assert_array_equal(result.to_numpy(), expected.to_numpy())
+    assert result.columns.astype(str).tolist() == expected.columns.tolist()
+
+
+def test_store_larger_than_the_limit_is_refused(tmp_path, monkeypatch):
+    _, file_path = write_source(tmp_path)
+    monkeypatch.setattr(measure_store, "MEASURE_STORE_MAX_CELLS", 3)
+    with pytest.raises(ValueError, match="cells per measure"):
+        load_measure_store(file_path)
+    assert not list((tmp_path / ".cache").glob("*.measures"))
+
+
+def test_store_is_rebuilt_when_the_source_changes(tmp_path):
+    df, file_path = write_source(tmp_path)
+    store = load_measure_store(file_path)
+    df.assign(**{"Liczba poradni AOS": 10}).to_csv(file_path, index=False)
+    os.utime(file_path, ns=(0, 0))
+
+    rebuilt = load_measure_store(file_path)
+    assert rebuilt["path"] != store["path"]
+    assert not os.path.exists(store["path"])
+    assert measure_table(rebuilt, "Liczba poradni AOS", index="Rok").tolist() == [
+        20,
+        30,
+    ]
+
+
+def test_clear_removes_every_artifact_type(tmp_path):
+    _, file_path = write_source(tmp_path)
+    store = load_measure_store(file_path)
+    cache_dir = tmp_path / ".cache"
+    assert {entry.suffix for entry in cache_dir.iterdir()} == {".parquet", ".measures"}
+
+    assert clear_csv_cache(file_path) == 2
+    assert not os.path.exists(store["path"])
+    assert list(cache_dir.iterdir()) == []
+
+
+def test_eviction_counts_measure_stores(tmp_path):
+    _, file_path = write_source(tmp_path)
+    store = load_measure_store(file_path)
+    cache_dir = tmp_path / ".cache"
+    parquet_path = next(cache_dir.glob("*.parquet"))
+
+    # The store is the least recently used artifact
+    os.utime(store["path"], (0, 0))
+    removed = evict_csv_cache(cache_dir, max_bytes=parquet_path.stat().st_size)
+    assert [entry.name for entry in removed] == [os.path.basename(store["path"])]
+    assert parquet_path.is_file()
+    assert read_csv(file_path)["Liczba poradni AOS"].sum() == 15
@@ -0,0 +1,31 @@
+import pandas as pd
+from helpers.name_matcher import match_names, normalize_name
+
+
+def test_normalize_name_strips_prefix_only_at_start():
+    assert normalize_name("Powiat Bolesławiecki") == "boleslawiecki"
+    assert normalize_name("miasto gmina powiat") == "miasto gmina powiat"
+
+
+def test_unique_matching_assigns_each_candidate_once():
+    mapping = match_names(
+        ["ostrowski_x", "ostrowskie_x", "ostrowsk_x"],
+        ["ostrowski_x", "ostrowskia_x"],
+        threshold=0.6,
+    )
+    matched = mapping[mapping["matched"]]
+    assert matched["match"].is_unique
+    assert len(matched) == 2
+    assert mapping.set_index("query").loc["ostrowski_x", "match"] == "ostrowski_x"
+
+    # The query left without a candidate is unmatched
+    unmatched = mapping[~mapping["matched"]]
+    assert len(unmatched) == 1
+    assert pd.isna(unmatched["match"].iloc[0])
+    assert pd.isna(unmatched["score"].iloc[0])
+
+
+def test_non_unique_matching_keeps_best_candidate_for_review():
+    mapping = match_names(["ostrowski_x", "zzz"], ["ostrowski_x"], unique=False)
+    assert mapping["matched"].tolist() == [True, False]
+    assert mapping["match"].iloc[0] == "ostrowski_x"
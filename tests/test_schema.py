@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+from helpers.schema import apply_schema, encode_column, label_key
+
+
+def test_encode_column_keeps_labels_and_missing_values():
+    series = pd.Series(
+        [" Mazowieckie", None, "śląskie", " Mazowieckie"], name="Województwo"
+    )
+    encoded, _ = encode_column(series)
+    assert isinstance(encoded.dtype, pd.CategoricalDtype)
+    assert encoded.isna().tolist() == [False, True, False, False]
+    assert encoded.astype(object).tolist() == [
+        " Mazowieckie",
+        np.nan,
+        "śląskie",
+        " Mazowieckie",
+    ]
+
+
+def test_growing_dictionary_keeps_existing_codes():
+    first, _ = encode_column(pd.Series(["zeta", "beta"], name="Nazwa świadczeniodawcy"))
+    second, extended = encode_column(
+        pd.Series(["alfa", "zeta"], name="Nazwa świadczeniodawcy")
+    )
+    assert extended
+    again, _ = encode_column(first.astype(object))
+    assert again.cat.codes.tolist() == first.cat.codes.tolist()
+    assert second.cat.codes[1] == first.cat.codes[0]
+
+    # Outputs are sorted by label, whatever the order of the codes
+    assert second.sort_values(key=label_key).tolist() == ["alfa", "zeta"]
+
+
+def test_frames_share_the_codes_of_a_dimension():
+    first = apply_schema(pd.DataFrame({"Powiat": ["b", "a"]}), persist=False)
+    second = apply_schema(pd.DataFrame({"Powiat": ["a", "c"]}), persist=False)
+    first = apply_schema(first, persist=False)
+    assert first["Powiat"].dtype == second["Powiat"].dtype
+    assert first["Powiat"].cat.codes[1] == second["Powiat"].cat.codes[0]
+
+
+def test_apply_schema_rejects_unknown_columns():
+    with pytest.raises(ValueError, match="without a dimension"):
+        apply_schema(pd.DataFrame({"Rok": [2020]}), columns=["Rok"])
@@ -0,0 +1,95 @@
+import os
+import geopandas as gpd
+import pytest
+from shapely.geometry import box
+from helpers import spatial_assign
+from helpers.spatial_assign import (
+    TERYT_LOOKUP_COLUMNS,
+    assign_to_parents,
+    build_teryt_lookup,
+    load_teryt_lookup,
+)
+
+CRS = "EPSG:2180"
+
+
+def wojewodztwa():
+    return gpd.GeoDataFrame(
+        {"JPT_KOD_JE": ["14", "24"], "JPT_NAZWA_": ["Mazowieckie", "Śląskie"]},
+        geometry=[box(0, 0, 10, 10), box(10, 0, 20, 10)],
+        crs=CRS,
+    )
+
+
+def powiaty():
+    return gpd.GeoDataFrame(
+        {
+            "JPT_KOD_JE": ["1401", "2401", "2402", "9901"],
+            "JPT_NAZWA_": [
+                "powiat Radomski",
+                "powiat Bielski",
+                "powiat Cieszyński",
+                "Stary powiat Nowy",
+            ],
+        },
+        # Inside, along the shared border, mostly outside and far away
+        geometry=[
+            box(1, 1, 4, 4),
+            box(9.9, 1, 15, 4),
+            box(18, 0, 30, 10),
+            box(50, 50, 51, 51),
+        ],
+        crs=CRS,
+    )
+
+
+def test_assign_to_parents_by_point_then_overlap():
+    result = assign_to_parents(powiaty(), wojewodztwa())
+    assert result["parent"].tolist() == [0, 1, 1, -1]
+    assert result["method"].tolist()[:3] == ["point", "point", "overlap"]
+    assert result["method"].isna().tolist()[3]
+
+    with pytest.raises(ValueError, match="share a CRS"):
+        assign_to_parents(powiaty().to_crs("EPSG:4326"), wojewodztwa())
+
+
+def test_build_teryt_lookup_normalizes_names():
+    lookup = build_teryt_lookup(powiaty(), wojewodztwa())
+    assert list(lookup.columns) == TERYT_LOOKUP_COLUMNS
+    # Only the leading "powiat " is removed
+    assert lookup["Powiat"].tolist() == [
+        "radomski",
+        "bielski",
+        "cieszyński",
+        "stary powiat nowy",
+    ]
+    assert lookup["Województwo"].tolist()[:3] == ["mazowieckie", "śląskie", "śląskie"]
+    assert lookup["TERYT_WOJ"].tolist()[:3] == ["14", "24", "24"]
+    assert lookup["TERYT_WOJ"].isna().tolist()[3]
+
+
+def test_teryt_lookup_is_cached_until_the_boundaries_change(tmp_path, monkeypatch):
+    powiaty_path = tmp_path / "powiaty.geojson"
+    wojewodztwa_path = tmp_path / "wojewodztwa.geojson"
+    lookup_path = tmp_path / "processed" / "teryt.csv"
+    powiaty().to_file(powiaty_path, driver="GeoJSON")
+    wojewodztwa().to_file(wojewodztwa_path, driver="GeoJSON")
+
+    lookup = load_teryt_lookup(lookup_path, powiaty_path, wojewodztwa_path)
+    assert lookup["TERYT_POW"].tolist() == ["1401", "2401", "2402", "9901"]
+    assert lookup_path.is_file()
+
+    # The persisted table is read without rebuilding the assignment
+    builds = []
+    monkeypatch.setattr(
+        spatial_assign,
+        "build_teryt_lookup",
+        lambda *args: builds.append(args) or build_teryt_lookup(*args),
+    )
+    load_teryt_lookup(lookup_path, powiaty_path, wojewodztwa_path)
+    assert builds == []
+
+    stamp = lookup_path.stat().st_mtime_ns + 10**9
+    os.utime(powiaty_path, ns=(stamp, stamp))
+    load_teryt_lookup(lookup_path, powiaty_path, wojewodztwa_path)
+    assert len(builds) == 1
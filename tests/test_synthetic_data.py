@@ -0,0 +1,128 @@
+"""Checks that the synthetic benchmark data is valid input for the helpers.
+
+The benchmark suite only measures time; these tests check the generated files
+themselves and that the helpers return the results known from the generator.
+"""
+
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from synthetic_data import (  # noqa: E402
+    BASE_ROWS,
+    WOJEWODZTWA,
+    build_dimensions,
+    generate_dataset,
+    generate_statystyki_porad,
+)
+from run_benchmarks import compare  # noqa: E402
+from helpers.icd_cube import ICD_SPECIALITY, stream_top_n  # noqa: E402
+from helpers.spatial_assign import build_teryt_lookup  # noqa: E402
+from helpers.geometry_store import load_geometries  # noqa: E402
+from helpers.utils import (  # noqa: E402
+    build_column_mappings,
+    fill_missing_values_based_on_column_mapping,
+    read_csv,
+)
+
+
+@pytest.fixture(scope="module")
+def data_dir(tmp_path_factory):
+    output_dir = tmp_path_factory.mktemp("synthetic")
+    generate_dataset(output_dir, scale=1, seed=0)
+    return output_dir
+
+
+def test_generation_is_deterministic_and_scales(tmp_path):
+    dimensions = build_dimensions(seed=0)
+    first = generate_statystyki_porad(tmp_path / "a", dimensions, scale=2, seed=0)
+    second = generate_statystyki_porad(tmp_path / "b", dimensions, scale=2, seed=0)
+    other = generate_statystyki_porad(tmp_path / "c", dimensions, scale=2, seed=1)
+    assert first.read_bytes() == second.read_bytes()
+    assert first.read_bytes() != other.read_bytes()
+    assert len(pd.read_csv(first)) == 2 * BASE_ROWS["statystyki_porad"]
+
+    with pytest.raises(ValueError, match="positive integer"):
+        generate_dataset(tmp_path, scale=0)
+
+
+def test_dimensions_have_the_real_cardinalities():
+    dimensions = build_dimensions(seed=0)
+    powiaty = dimensions["powiaty"]
+    assert len(dimensions["wojewodztwa"]) == 16
+    assert len(powiaty) == sum(WOJEWODZTWA.values()) == 380
+    assert powiaty["TERYT_POW"].is_unique
+    assert not powiaty.duplicated(["Województwo", "Powiat"]).any()
+
+
+def test_icd_codes_are_skewed(data_dir):
+    df = read_csv(
+        data_dir / "processed" / "problemy_zdrowotne_icd10_poradnia_okulistyczna.csv"
+    )
+    counts = df["Kod ICD-10 poziom 3."].value_counts(normalize=True)
+    # A few categories dominate, as in the real data
+    assert counts.iloc[:10].sum() > 0.3
+    assert counts.iloc[0] > 10 * counts.median()
+
+
+def test_streaming_top_n_matches_groupby_on_raw_files(data_dir):
+    file_paths = sorted((data_dir / "raw").glob("problemy_zdrowotne_icd10_*.csv"))
+    result = stream_top_n(3, n=10, file_paths=file_paths, chunksize=20000)
+
+    raw = pd.concat(read_csv(path) for path in file_paths)
+    raw = raw[raw["Specjalność komórki"] == ICD_SPECIALITY]
+    expected = raw.groupby("Kod ICD-10 poziom 3.")["Liczba porad AOS"].sum()
+    expected = expected.nlargest(10)
+    assert result["Kod ICD-10 poziom 3."].tolist() == expected.index.tolist()
+    assert result["Liczba porad AOS"].tolist() == expected.tolist()
+
+
+def test_spatial_assignment_recovers_the_generated_regions(data_dir):
+    powiaty = load_geometries(data_dir / "powiaty_mapped.geojson", use_cache=False)
+    wojewodztwa = load_geometries(data_dir / "wojewodztwa.geojson", use_cache=False)
+    lookup = build_teryt_lookup(powiaty, wojewodztwa)
+    expected = build_dimensions(seed=0)["powiaty"]
+    assert (lookup["Metoda"] == "point").all()
+    assert lookup["TERYT_WOJ"].tolist() == expected["TERYT_WOJ"].tolist()
+    assert lookup["Województwo"].tolist() == expected["Województwo"].tolist()
+
+
+def test_missing_regions_are_filled_from_the_counties(data_dir):
+    df = read_csv(data_dir / "raw" / "teleporady.csv")
+    missing = df["Województwo"].isna().to_numpy()
+    assert 0 < missing.mean() < 0.1
+
+    # Every provider is in one powiat, county names repeat across regions
+    mappings = build_column_mappings(
+        df, "Województwo", ["Nazwa świadczeniodawcy", "Powiat"]
+    )
+    filled = fill_missing_values_based_on_column_mapping(
+        df.copy(), reference_col=["Nazwa świadczeniodawcy", "Powiat"], mappings=mappings
+    )
+    provider_region = (
+        df.dropna(subset=["Województwo"])
+        .drop_duplicates("Nazwa świadczeniodawcy")
+        .set_index("Nazwa świadczeniodawcy")["Województwo"]
+    )
+    known = df["Nazwa świadczeniodawcy"].isin(provider_region.index).to_numpy()
+    np.testing.assert_array_equal(
+        filled["Województwo"].to_numpy()[missing & known],
+        provider_region.loc[df["Nazwa świadczeniodawcy"][missing & known]].to_numpy(),
+    )
+
+
+@pytest.mark.parametrize(
+    "seconds, baseline, status",
+    [
+        (1.0, None, "new"),
+        (1.2, 1.0, "ok"),
+        (1.3, 1.0, "regression"),
+        (0.005, 0.001, "ok"),
+    ],
+)
+def test_compare_with_baseline(seconds, baseline, status):
+    assert compare(seconds, baseline) == status
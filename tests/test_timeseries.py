@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+from helpers.timeseries import (
+    cagr,
+    rolling_mean,
+    share_of_total,
+    time_series_matrix,
+    trend_metrics,
+    year_over_year,
+)
+
+
+def yearly_frame():
+    rng = np.random.default_rng(0)
+    size = 300
+    return pd.DataFrame(
+        {
+            "Rok": rng.choice([2019, 2020, 2021, 2022, 2023], size=size),
+            "Województwo": rng.choice(["a", "b", "c"], size=size),
+            "Liczba porad AOS": rng.integers(0, 50, size=size),
+        }
+    )
+
+
+def test_matrix_matches_pivot_table():
+    df = yearly_frame()
+    matrix = time_series_matrix(df, "Województwo", "Liczba porad AOS")
+    expected = df.pivot_table(
+        index="Rok", columns="Województwo", values="Liczba porad AOS", aggfunc="sum"
+    )
+    pd.testing.assert_frame_equal(matrix, expected, check_dtype=False)
+    assert matrix.dtypes.unique().tolist() == [df["Liczba porad AOS"].dtype]
+
+    # Requested entities keep their order, entities without data are NaN
+    selected = time_series_matrix(
+        df, "Województwo", "Liczba porad AOS", entities=["c", "x"]
+    )
+    assert selected.columns.tolist() == ["c", "x"]
+    assert selected["x"].isna().all()
+    assert selected["c"].tolist() == expected["c"].tolist()
+
+
+def test_metrics_match_pandas():
+    matrix = pd.DataFrame(
+        {"a": [100.0, 110.0, np.nan, 133.1], "b": [0.0, 10.0, 20.0, 40.0]},
+        index=pd.Index([2020, 2021, 2022, 2023], name="Rok"),
+    )
+
+    expected_share = matrix.div(matrix.sum(axis=1), axis=0) * 100
+    pd.testing.assert_frame_equal(share_of_total(matrix), expected_share)
+
+    yoy = year_over_year(matrix)
+    assert np.isclose(yoy["a"].iloc[1], 10.0)
+    assert yoy["a"].isna().tolist() == [True, False, True, True]
+    assert yoy["b"].isna().tolist() == [True, True, False, False]
+
+    expected_rolling = matrix.rolling(3, min_periods=1).mean()
+    pd.testing.assert_frame_equal(rolling_mean(matrix, 3), expected_rolling)
+
+    rates = cagr(matrix)
+    assert np.isclose(rates["a"], 10.0)
+    assert np.isnan(rates["b"])
+
+    metrics = trend_metrics(matrix)
+    assert set(metrics) == {"value", "share", "yoy", "rolling", "cagr"}
@@ -0,0 +1,558 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import pytest
+from helpers import utils
+from helpers.utils import (
+    GROUPING_TOTAL_LABEL,
+    aggregate_count,
+    aggregate_sum,
+    analyze_dataframe,
+    build_column_mappings,
+    build_filter_index,
+    cache_key_digest,
+    check_files_schema,
+    clear_csv_cache,
+    combine_dataframes,
+    evict_csv_cache,
+    fill_missing_values_based_on_column_mapping,
+    filter_dataframe,
+    left_join_excel_sheets,
+    load_files,
+    load_filtered_files,
+    merge_profiles,
+    profile_dataframe,
+    read_csv,
+    read_file_columns,
+    stream_filtered_files,
+    write_excel_sheets,
+)
+
+
+def write_files(tmp_path, frames, **kwargs):
+    paths = []
+    for position, frame in enumerate(frames):
+        path = tmp_path / f"part_{position}.csv"
+        frame.to_csv(path, index=False, **kwargs)
+        paths.append(str(path))
+    return paths
+
+
+def cache_entries(tmp_path):
+    return sorted((tmp_path / ".cache").glob("*.parquet"))
+
+
+def test_read_csv_cache_hit_returns_the_parsed_frame(tmp_path):
+    path = tmp_path / "data.csv"
+    pd.DataFrame({"a": [1, 2], "b": ["x", None]}).to_csv(path, index=False)
+
+    first = read_csv(path)
+    assert len(cache_entries(tmp_path)) == 1
+    pd.testing.assert_frame_equal(read_csv(path), first)
+
+    # Other read arguments are cached separately
+    read_csv(path, usecols=["a"])
+    assert len(cache_entries(tmp_path)) == 2
+
+    # Chunked and uncached reads never write the cache
+    with read_csv(path, chunksize=1) as reader:
+        assert sum(len(chunk) for chunk in reader) == 2
+    read_csv(path, use_cache=False, dtype=str)
+    assert len(cache_entries(tmp_path)) == 2
+
+
+def test_read_csv_cache_is_invalidated_when_the_file_changes(tmp_path):
+    path = tmp_path / "data.csv"
+    pd.DataFrame({"a": [1, 2]}).to_csv(path, index=False)
+    read_csv(path)
+
+    pd.DataFrame({"a": [3, 4, 5]}).to_csv(path, index=False)
+    os.utime(path, ns=(0, 0))
+    assert read_csv(path)["a"].tolist() == [3, 4, 5]
+    # The entry of the previous version is replaced
+    assert len(cache_entries(tmp_path)) == 1
+
+    assert clear_csv_cache(path) == 1
+    assert cache_entries(tmp_path) == []
+
+
+def test_cache_key_is_stable_and_refuses_unserializable_arguments(tmp_path):
+    first = {"dtype": {"b": str, "a": np.dtype("int64")}, "usecols": {"b", "a"}}
+    second = {"usecols": {"a", "b"}, "dtype": {"a": np.dtype("int64"), "b": str}}
+    assert cache_key_digest(first) == cache_key_digest(second)
+    assert cache_key_digest(first) != cache_key_digest({"dtype": {"a": str}})
+    with pytest.raises(ValueError, match="not serializable"):
+        cache_key_digest({"converters": {"a": int.__add__}})
+
+    # Reads with converter functions bypass the cache
+    path = tmp_path / "data.csv"
+    pd.DataFrame({"a": [1, 2]}).to_csv(path, index=False)
+    result = read_csv(path, converters={"a": lambda value: int(value) * 10})
+    assert result["a"].tolist() == [10, 20]
+    assert cache_entries(tmp_path) == []
+
+    read_csv(path, dtype={"a": str})
+    read_csv(path, dtype={"a": str})
+    assert len(cache_entries(tmp_path)) == 1
+
+
+def test_evict_csv_cache_removes_least_recently_used(tmp_path):
+    paths = write_files(tmp_path, [pd.DataFrame({"a": range(100)})] * 3)
+    for path in paths:
+        read_csv(path)
+    entries = cache_entries(tmp_path)
+    for entry in entries:
+        os.utime(entry, (0, 0))
+
+    # A cache hit refreshes the entry of the first file
+    read_csv(paths[0])
+    total_bytes = sum(entry.stat().st_size for entry in entries)
+    removed = evict_csv_cache(tmp_path / ".cache", max_bytes=total_bytes - 1)
+    assert len(removed) == 1
+    assert len(cache_entries(tmp_path)) == 2
+    assert removed[0].name.split("-")[0] != utils._csv_cache_source_key(paths[0])
+
+
+def test_load_files_keeps_file_order(tmp_path):
+    frames = [pd.DataFrame({"a": [i, i + 1], "b": ["x", "y"]}) for i in range(0, 6, 2)]
+    paths = write_files(tmp_path, frames)
+    result = load_files(paths, max_workers=2)
+    pd.testing.assert_frame_equal(result, pd.concat(frames, ignore_index=True))
+
+
+def test_schema_check_uses_reader_arguments(tmp_path):
+    frames = [pd.DataFrame({"a": [1], "b": [2], "c": [3]}) for _ in range(2)]
+    paths = write_files(tmp_path, frames, sep=";")
+
+    assert read_file_columns(paths[0], sep=";") == ["a", "b", "c"]
+    assert read_file_columns(paths[0], sep=";", usecols=["a", "c"]) == ["a", "c"]
+    assert check_files_schema(paths, sep=";", nrows=1) == ["a", "b", "c"]
+
+    result = load_files(paths, sep=";", usecols=["a", "c"], use_cache=False)
+    assert list(result.columns) == ["a", "c"]
+    assert len(result) == 2
+
+
+def test_schema_mismatch_raises(tmp_path):
+    paths = write_files(
+        tmp_path, [pd.DataFrame({"a": [1], "b": [2]}), pd.DataFrame({"a": [1]})]
+    )
+    with pytest.raises(ValueError, match="Schema mismatch"):
+        load_files(paths)
+
+
+def test_unchecked_schema_takes_union_of_columns(tmp_path):
+    paths = write_files(
+        tmp_path, [pd.DataFrame({"a": [1], "b": [2]}), pd.DataFrame({"a": [3]})]
+    )
+    result = load_files(paths, check_schema=False)
+    assert list(result.columns) == ["a", "b"]
+    assert result["a"].tolist() == [1, 3]
+    assert result["b"].isna().tolist() == [False, True]
+
+
+def test_combine_dataframes_matches_concat():
+    frames = [
+        pd.DataFrame({"a": [1, 2], "b": ["x", None], "c": [1.5, 2.5]}),
+        pd.DataFrame({"a": [3], "b": ["z"], "c": [3.5]}),
+    ]
+    expected = pd.concat(frames, ignore_index=True)
+    pd.testing.assert_frame_equal(combine_dataframes(frames), expected)
+    # The inputs are left untouched unless they are consumed
+    assert [list(frame.columns) for frame in frames] == [["a", "b", "c"]] * 2
+
+    pd.testing.assert_frame_equal(combine_dataframes(frames, consume=True), expected)
+    assert [list(frame.columns) for frame in frames] == [[], []]
+
+
+def test_concurrent_cache_writes_and_eviction(tmp_path, monkeypatch):
+    path = tmp_path / "data.csv"
+    pd.DataFrame({"a": range(1000)}).to_csv(path, index=False)
+    artifact_path = utils.cache_artifact_path(path, {})
+    df = pd.DataFrame({"a": range(100000)})
+
+    # Threads writing the same artifact never share a temporary file
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        written = list(
+            pool.map(lambda _: utils.write_cache_artifact(df, artifact_path), range(8))
+        )
+    assert all(written)
+    assert list((tmp_path / ".cache").iterdir()) == [artifact_path]
+    pd.testing.assert_frame_equal(pd.read_parquet(artifact_path), df)
+
+    # Artifacts removed by another thread during eviction are skipped
+    vanished = tmp_path / ".cache" / "0000000000000000-0-0.parquet"
+    listed = utils._cache_artifacts
+    monkeypatch.setattr(
+        utils, "_cache_artifacts", lambda *args: listed(*args) + [vanished]
+    )
+    assert evict_csv_cache(tmp_path / ".cache", max_bytes=0) == [artifact_path]
+
+
+def test_failed_cache_write_names_the_artifact(tmp_path, capsys):
+    artifact_path = tmp_path / ".cache" / "source-0-0.measures"
+    df = pd.DataFrame({"a": [object(), object()]})
+    assert not utils.write_cache_artifact(df, artifact_path)
+    assert f"Skipping cache artifact {artifact_path}" in capsys.readouterr().out
+    assert not list((tmp_path / ".cache").iterdir())
+
+
+@pytest.mark.parametrize("constant_memory", [False, True])
+def test_write_excel_sheets_round_trip(tmp_path, constant_memory):
+    sheets = {
+        "Lvl_1": pd.DataFrame({"Kod": ["A", "B"], "Liczba": [1, None]}),
+        "Lvl_2": pd.DataFrame({"Kod": ["C"], "Liczba": [3.0]}),
+    }
+    file_path = tmp_path / "sheets.xlsx"
+    write_excel_sheets(file_path, sheets, constant_memory=constant_memory, index=False)
+    result = pd.read_excel(file_path, sheet_name=None)
+    assert list(result) == ["Lvl_1", "Lvl_2"]
+    for name, frame in sheets.items():
+        pd.testing.assert_frame_equal(result[name], frame, check_dtype=False)
+
+
+def test_constant_memory_without_xlsxwriter_falls_back(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "XLSXWRITER_AVAILABLE", False)
+    file_path = tmp_path / "sheets.xlsx"
+    with pytest.warns(UserWarning, match="xlsxwriter"):
+        write_excel_sheets(
+            file_path, {"Lvl_1": pd.DataFrame({"a": [1]})}, constant_memory=True
+        )
+    assert pd.read_excel(file_path, index_col=0)["a"].tolist() == [1]
+
+
+def raw_frames():
+    return [
+        pd.DataFrame(
+            {
+                "Rok": [2020 + i] * 4,
+                "Specjalność komórki": ["okulistyka", "chirurgia"] * 2,
+                "Liczba porad AOS": [i, i + 1, i + 2, i + 3],
+            }
+        )
+        for i in range(3)
+    ]
+
+
+def test_stream_filtered_files_matches_filtering_the_loaded_files(tmp_path):
+    frames = raw_frames()
+    paths = write_files(tmp_path, frames)
+    filter_dict = {"Specjalność komórki": "okulistyka", "Rok": {"ge": 2021}}
+
+    chunks = list(stream_filtered_files(paths, filter_dict, chunksize=3))
+    assert all(not chunk.empty for chunk in chunks)
+    expected = filter_dataframe(pd.concat(frames, ignore_index=True), filter_dict)
+    result = load_filtered_files(paths, filter_dict, chunksize=3)
+    pd.testing.assert_frame_equal(result, expected.reset_index(drop=True))
+
+
+def test_load_filtered_files_keeps_only_requested_columns(tmp_path):
+    paths = write_files(tmp_path, raw_frames())
+    filter_dict = {"Specjalność komórki": "okulistyka"}
+
+    result = load_filtered_files(paths, filter_dict, columns=["Rok"], chunksize=2)
+    assert list(result.columns) == ["Rok"]
+    assert result["Rok"].tolist() == [2020, 2020, 2021, 2021, 2022, 2022]
+
+    empty = load_filtered_files(paths, {"Rok": 1999}, columns=["Rok"])
+    assert empty.empty and list(empty.columns) == ["Rok"]
+
+    with pytest.raises(ValueError, match="No files"):
+        load_filtered_files([], filter_dict)
+
+
+def filter_frame():
+    return pd.DataFrame(
+        {
+            "Rok": [2016, 2017, 2018, 2019, 2020, None],
+            "Województwo": ["a", "b", None, "a", "c", "b"],
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "filter_dict, expected",
+    [
+        ({"Rok": 2018}, [2]),
+        ({"Rok": [2016, 2020]}, [0, 4]),
+        ({"Rok": {"ne": 2018}}, [0, 1, 3, 4, 5]),
+        ({"Województwo": {"not_in": ["a", "b"]}}, [2, 4]),
+        ({"Rok": {"gt": 2018}}, [3, 4]),
+        ({"Rok": {"ge": 2018, "lt": 2020}}, [2, 3]),
+        ({"Rok": {"le": 2017}}, [0, 1]),
+        ({"Rok": {"between": (2017, 2019)}}, [1, 2, 3]),
+        ({"Województwo": {"isna": True}}, [2]),
+        ({"Rok": {"notna": False}}, [5]),
+        ({"Rok": {"ge": 2017}, "Województwo": "a"}, [3]),
+    ],
+)
+def test_filter_operators(filter_dict, expected):
+    df = filter_frame()
+    assert filter_dataframe(df, filter_dict).index.tolist() == expected
+
+    # An index answers the equality and membership conditions with the same rows
+    index = build_filter_index(df, ["Rok", "Województwo"])
+    assert filter_dataframe(df, filter_dict, index=index).index.tolist() == expected
+
+
+def test_filter_unknown_operator_raises():
+    with pytest.raises(ValueError, match="Unsupported filter operator"):
+        filter_dataframe(filter_frame(), {"Rok": {"like": 2018}})
+
+
+def profile_frames():
+    return [
+        pd.DataFrame({"a": [1, 2, None], "b": ["x", "y", "x"]}),
+        pd.DataFrame({"a": [2.0, 3.0, 4.0], "b": [None, "z", "x"]}),
+    ]
+
+
+def test_chunked_analysis_matches_the_whole_frame():
+    frames = profile_frames()
+    expected = analyze_dataframe(pd.concat(frames, ignore_index=True))
+    result = analyze_dataframe(iter(frames))
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+    assert result["unique_values_count"].tolist() == [4, 3]
+    assert result["missing_values_total"].tolist() == [1, 1]
+
+
+def test_hll_merge_is_the_sketch_of_the_union():
+    rng = np.random.default_rng(0)
+    left = pd.DataFrame({"a": rng.integers(0, 30000, size=20000)})
+    right = pd.DataFrame({"a": rng.integers(20000, 50000, size=20000)})
+
+    merged = merge_profiles(
+        profile_dataframe(left, approximate=True),
+        profile_dataframe(right, approximate=True),
+    )
+    union = profile_dataframe(pd.concat([left, right]), approximate=True)
+    np.testing.assert_array_equal(
+        merged["columns"]["a"]["distinct"], union["columns"]["a"]["distinct"]
+    )
+
+    # The estimate is within a few standard errors of the exact count
+    estimate = analyze_dataframe([left, right], approximate=True)
+    exact = pd.concat([left, right])["a"].nunique()
+    assert abs(estimate["unique_values_count"].iloc[0] - exact) < 0.05 * exact
+
+
+def test_merge_profiles_rejects_different_modes():
+    frame = profile_frames()[0]
+    with pytest.raises(ValueError, match="distinct-count modes"):
+        merge_profiles(
+            profile_dataframe(frame), profile_dataframe(frame, approximate=True)
+        )
+    with pytest.raises(ValueError, match="No data"):
+        analyze_dataframe(iter([]))
+
+
+def write_join_workbook(tmp_path):
+    sheets = {
+        "base": pd.DataFrame({"Rok": [2020, 2021, 2022], "a": [1, 2, 3]}),
+        "unique": pd.DataFrame({"Rok": [2022, 2020], "a": [30, 10], "b": ["z", "x"]}),
+        "fan_out": pd.DataFrame({"Rok": [2021, 2021], "c": [5, 6]}),
+        "unrelated": pd.DataFrame({"Kod": ["H52"]}),
+    }
+    file_path = tmp_path / "sheets.xlsx"
+    write_excel_sheets(file_path, sheets, index=False)
+    return file_path, sheets
+
+
+def test_left_join_excel_sheets_matches_sequential_merges(tmp_path):
+    file_path, sheets = write_join_workbook(tmp_path)
+    result, errors = left_join_excel_sheets(file_path, on="Rok", return_errors=True)
+
+    # Colliding columns get the sheet name as a suffix
+    expected = (
+        sheets["base"]
+        .merge(sheets["unique"], how="left", on="Rok", suffixes=("", "_unique"))
+        .merge(sheets["fan_out"], how="left", on="Rok")
+    )
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+    assert [(error["sheet"], error["stage"]) for error in errors] == [
+        ("unrelated", "join")
+    ]
+
+    with pytest.warns(UserWarning, match="unrelated"):
+        left_join_excel_sheets(file_path, on="Rok")
+
+
+def test_left_join_excel_sheets_defaults_to_shared_columns(tmp_path):
+    file_path, sheets = write_join_workbook(tmp_path)
+    result, errors = left_join_excel_sheets(file_path, return_errors=True)
+
+    # Like pd.merge, all columns shared with the base are join keys
+    expected = sheets["base"]
+    for sheet in ["unique", "fan_out"]:
+        expected = expected.merge(sheets[sheet], how="left")
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+    assert len(errors) == 1
+
+
+def test_left_join_excel_sheets_with_base_and_parallel_reads(tmp_path):
+    file_path, sheets = write_join_workbook(tmp_path)
+    base_df = pd.DataFrame({"Rok": [2022, 2023]})
+    result, _ = left_join_excel_sheets(
+        file_path, base_df=base_df, on="Rok", max_workers=2, return_errors=True
+    )
+    assert result["Rok"].tolist() == [2022, 2023]
+    assert result["a"].tolist()[0] == 3 and pd.isna(result["a"].tolist()[1])
+    assert result["a_unique"].tolist()[0] == 30
+
+
+def aggregation_frame():
+    return pd.DataFrame(
+        {
+            "Rok": [2020, 2020, 2021, 2021, 2021, 2022],
+            "Województwo": ["a", "b", "a", "a", None, "b"],
+            "Płeć": ["K", "M", "K", "M", "K", None],
+            "Liczba porad AOS": [1, 2, 3, 4, 5, 6],
+            "Populacja": [10.0, 20.0, 30.0, 40.0, 50.0, 60.0],
+        }
+    )
+
+
+def test_aggregate_count_matches_groupby_size():
+    df = aggregation_frame()
+    result = aggregate_count(df, ["Rok", "Województwo"], ["Płeć"])
+    for group_col in ["Rok", "Województwo"]:
+        expected = df.groupby([group_col, "Płeć"]).size().unstack(fill_value=0)
+        block = result.loc[group_col]
+        np.testing.assert_array_equal(block.to_numpy(), expected.to_numpy())
+        assert block.index.tolist() == expected.index.tolist()
+        assert result.columns.tolist() == ["K", "M"]
+
+
+def test_aggregate_count_matches_pivot_index_and_dtype():
+    df = aggregation_frame()
+    for group_col in ["Rok", "Województwo"]:
+        expected = (
+            df.groupby([group_col, "Płeć"])
+            .size()
+            .reset_index(name="Count")
+            .pivot(index=group_col, columns="Płeć", values="Count")
+            .fillna(0)
+        )
+        expected.columns.name = None
+        result = aggregate_count(df, [group_col], ["Płeć"])
+        assert result.index.names == ["Column", group_col]
+        pd.testing.assert_frame_equal(result.loc[group_col], expected)
+
+
+def test_aggregate_count_honors_every_value_column():
+    df = aggregation_frame()
+    result = aggregate_count(df, ["Rok"], ["Województwo", "Płeć"])
+    expected = (
+        df.groupby(["Rok", "Województwo", "Płeć"])
+        .size()
+        .unstack(["Województwo", "Płeć"], fill_value=0)
+    )
+    assert result.columns.names == ["Województwo", "Płeć"]
+    pd.testing.assert_frame_equal(
+        result.loc["Rok"][expected.columns],
+        expected,
+        check_dtype=False,
+    )
+
+    counts = aggregate_count(df, ["Płeć"], header="Liczba")
+    assert counts.loc[("Płeć", "K"), "Liczba"] == 3
+    with pytest.raises(ValueError, match="group_columns"):
+        aggregate_count(df, [])
+
+
+def test_aggregate_sum_rollup_matches_groupbys():
+    df = aggregation_frame()
+    values = ["Liczba porad AOS", "Populacja"]
+    result = aggregate_sum(df, ["Rok", "Województwo"], values, rollup=True)
+
+    assert result.index.get_level_values("Column").unique().tolist() == [
+        "Rok, Województwo",
+        "Rok",
+        GROUPING_TOTAL_LABEL,
+    ]
+    expected = df.groupby(["Rok", "Województwo"])[values].sum()
+    finest = result.loc["Rok, Województwo"]
+    assert finest.index.tolist() == expected.index.tolist()
+    np.testing.assert_array_equal(finest.to_numpy(), expected.to_numpy())
+    np.testing.assert_array_equal(
+        result.loc["Rok"].to_numpy(), df.groupby("Rok")[values].sum().to_numpy()
+    )
+    # Rows with a missing grouping value only count in the grand total
+    assert result.loc[GROUPING_TOTAL_LABEL].iloc[0].tolist() == [21, 210.0]
+    assert result["Liczba porad AOS"].dtype == df["Liczba porad AOS"].dtype
+
+
+def test_aggregate_sum_grouping_sets_and_cube():
+    df = aggregation_frame()
+    values = ["Liczba porad AOS"]
+    result = aggregate_sum(
+        df, value_columns=values, header="Suma", grouping_sets=["Rok", []]
+    )
+    assert result.columns.tolist() == ["Suma_Liczba porad AOS"]
+    assert result.loc["Rok"]["Suma_Liczba porad AOS"].tolist() == [3, 12, 6]
+
+    cube = aggregate_sum(df, ["Rok", "Płeć"], values, cube=True)
+    assert cube.index.get_level_values("Column").unique().tolist() == [
+        "Rok, Płeć",
+        "Rok",
+        "Płeć",
+        GROUPING_TOTAL_LABEL,
+    ]
+    assert cube.loc["Płeć"]["Liczba porad AOS"].tolist() == [9, 6]
+
+    default = aggregate_sum(df, ["Rok", "Płeć"], values)
+    assert default.index.get_level_values("Column").unique().tolist() == [
+        "Rok",
+        "Płeć",
+    ]
+    with pytest.raises(ValueError, match="Only one of"):
+        aggregate_sum(df, ["Rok"], values, rollup=True, cube=True)
+    with pytest.raises(ValueError, match="must be numeric"):
+        aggregate_sum(df, ["Rok"], ["Płeć"])
+
+
+def mapping_frame():
+    return pd.DataFrame(
+        {
+            "Województwo": ["a", None, "b", None, None, "c", None],
+            "Nazwa świadczeniodawcy": ["p1", "p1", "p2", "p3", None, "p3", "p4"],
+            "Powiat": ["x", "y", "z", "z", "z", "w", "v"],
+        },
+        index=[10, 11, 12, 13, 14, 15, 16],
+    )
+
+
+def test_fill_missing_values_cascades_over_reference_columns():
+    df = fill_missing_values_based_on_column_mapping(
+        mapping_frame(), reference_col=["Nazwa świadczeniodawcy", "Powiat"]
+    )
+    # Providers fill rows 11 and 13, the county "z" fills row 14, p4 is unknown
+    assert df["Województwo"].tolist()[:6] == ["a", "a", "b", "c", "b", "c"]
+    assert pd.isna(df["Województwo"].iloc[6])
+
+
+def test_ambiguous_reference_values_are_not_used():
+    df = mapping_frame()
+    df.loc[16, ["Nazwa świadczeniodawcy", "Województwo"]] = ["p1", "d"]
+    mappings = build_column_mappings(df, "Województwo", "Nazwa świadczeniodawcy")
+    assert "p1" not in mappings["Nazwa świadczeniodawcy"].index
+    assert mappings["Nazwa świadczeniodawcy"].to_dict() == {"p2": "b", "p3": "c"}
+
+
+def test_mappings_built_from_chunks_match_the_whole_frame():
+    df = mapping_frame()
+    reference_cols = ["Nazwa świadczeniodawcy", "Powiat"]
+    chunks = [df.iloc[start : start + 2] for start in range(0, len(df), 2)]
+    mappings = build_column_mappings(iter(chunks), "Województwo", reference_cols)
+    expected = build_column_mappings(df, "Województwo", reference_cols)
+    for col in reference_cols:
+        pd.testing.assert_series_equal(
+            mappings[col].sort_index(), expected[col].sort_index()
+        )
+
+    # Lookups from all chunks fill a single chunk
+    result = fill_missing_values_based_on_column_mapping(
+        chunks[2].copy(), reference_col=reference_cols, mappings=mappings
+    )
+    assert result["Województwo"].tolist() == ["b", "c"]